@@ -0,0 +1,50 @@
+from beanie import Document, Indexed
+from pydantic import BaseModel, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from typing import Optional
+from datetime import datetime
+from app.models.user import Feedback
+
+
+# ---------- Resume Review Model ----------
+class ResumeReview(Document):
+    resume_id: Indexed(str, unique=True)
+    clerk_id: str
+    resume_url: str
+    image_url: Optional[str] = None
+    job_title: str
+    job_description: str
+    feedback: Feedback
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "resume_reviews"
+        indexes = [
+            IndexModel(
+                [("clerk_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="clerk_id_created_at",
+            ),
+        ]
+
+
+# ---------- List Projection ----------
+# List views only need the headline score, not the full Feedback body
+class ResumeReviewSummary(BaseModel):
+    id: str = Field(alias="_id")
+    resume_id: str
+    resume_url: str
+    image_url: Optional[str] = None
+    job_title: str
+    overall_score: Optional[float] = None
+    created_at: datetime
+
+    class Settings:
+        projection = {
+            "_id": {"$toString": "$_id"},
+            "resume_id": 1,
+            "resume_url": 1,
+            "image_url": 1,
+            "job_title": 1,
+            "overall_score": "$feedback.overallScore",
+            "created_at": 1,
+        }
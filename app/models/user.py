@@ -1,4 +1,4 @@
-from beanie import Document
+from beanie import Document, Indexed
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
 from datetime import datetime
@@ -26,7 +26,7 @@ class Feedback(BaseModel):
     
 # ---------- User Model ----------
 class User(Document):
-    clerk_id: str
+    clerk_id: Indexed(str, unique=True)
     email: Optional[EmailStr] = None
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -38,6 +38,9 @@ class User(Document):
     job_title: Optional[str] = None
     job_description: Optional[str] = None
     feedback: Optional[Feedback] = None
+    # Version of the last Clerk event applied (ms); deleted users are kept as tombstones
+    clerk_updated_at: Optional[int] = None
+    deleted_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -1,173 +1,312 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Request
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
 from datetime import datetime
-from app.services.generator import ResumeReviewGenerator
-from app.models.user import User, Feedback
-from app.services.cache import redis_client
-from app.utils.auth import authenticate_and_get_user_details
+from bson import ObjectId
+from app.models.user import User
+from app.models.review import ResumeReview, ResumeReviewSummary
+from app.services import serializer
+from app.services.cache import async_redis_client, async_redis_bytes_client, user_resumes_key
+from app.services.extraction import PdfLimitError
+from app.services.feedback_cache import get_feedback
+from app.services.ingest import ingest_upload, IngestedUpload, UploadRejected
+from app.services.llm import LLMUnavailableError
+from app.services.rate_limit import rate_limit, QuotaExceededError
+from app.services.jobs import enqueue_analysis, get_job, JobStatus
+from app.services.config import settings
+from app.services.pipeline import (
+    analyze, analyze_stream, analyze_batch_jobs, analyze_batch_resumes, ReviewError, UploadError,
+    quick_score, quick_score_jobs, quick_score_resumes,
+)
+from app.utils.auth import get_current_user
 from app.utils.db import init_db
-import uuid, json, logging
-import cloudinary.uploader
+import base64, json, logging
 
 logger = logging.getLogger("uvicorn.error")
 
-router = APIRouter(
-    prefix="/resume",
-    tags=["Resume Analysis"]
-)
 
 # Ensure DB is initialized before using
 async def ensure_db_initialized():
     try:
         await init_db()
-        logger.info("Beanie DB initialized.")
     except Exception as e:
         logger.warning(f"DB initialization failed: {repr(e)}")
 
 
-@router.post("/analyze", response_model=dict)
+async def _ingest(resume: UploadFile) -> IngestedUpload:
+    try:
+        return await ingest_upload(resume)
+    except UploadRejected as e:
+        logger.warning(f"Rejected upload {resume.filename}: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+def _review_status(error: ReviewError) -> int:
+    # Same codes as ingest rejections: over-limit PDFs are the client's to fix
+    if isinstance(error.__cause__, LLMUnavailableError):
+        return 503
+    if isinstance(error.__cause__, QuotaExceededError):
+        return 429
+    if isinstance(error.__cause__, PdfLimitError):
+        return 413
+    return 500
+
+
+router = APIRouter(
+    prefix="/resume",
+    tags=["Resume Analysis"],
+    dependencies=[Depends(ensure_db_initialized)],
+)
+
+
+@router.post("/analyze", response_model=dict, dependencies=[Depends(rate_limit("analyze"))])
 async def analyze_resume(
-    request: Request,
+    response: Response,
+    user_details: dict = Depends(get_current_user),
     jobTitle: str = Form(...),
     jobDescription: str = Form(...),
     resume: UploadFile = File(...),
+    mode: Literal["sync", "async", "quick"] = Query("sync"),
 ):
     try:
-        await ensure_db_initialized()
-
         logger.info("Start resume analysis")
 
-        user_details = authenticate_and_get_user_details(request)
         clerk_id = user_details.get("user_id")
         logger.info(f"Authenticated user: {clerk_id}")
 
-        resume_bytes = await resume.read()
-        logger.info(f"Resume file read: {len(resume_bytes)} bytes")
+        upload = await _ingest(resume)
 
-        # Generate feedback
-        try:
-            feedback_data = ResumeReviewGenerator.review_resume(
-                file_bytes=resume_bytes,
-                content_type=resume.content_type,
-                job_title=jobTitle,
-                job_description=jobDescription,
+        if mode == "quick":
+            # Local keyword/ATS score only: no LLM call, no upload, nothing saved
+            return {
+                "jobTitle": jobTitle,
+                "ATS": await quick_score(upload.data, upload.content_type, jobDescription),
+                "message": "Resume scored locally."
+            }
+
+        if mode == "async":
+            job_id = await enqueue_analysis(
+                clerk_id, jobTitle, jobDescription, upload.data, upload.content_type, upload.filename
             )
-            feedback_obj = Feedback(**feedback_data)
-        except Exception as review_error:
-            logger.exception("Resume review failed")
-            raise HTTPException(status_code=500, detail=f"Resume review error: {review_error}")
+            response.status_code = 202
+            return {
+                "id": job_id,
+                "status": JobStatus.QUEUED,
+                "status_url": f"/api/resume/jobs/{job_id}",
+                "message": "Resume queued for analysis."
+            }
 
-        # Upload to Cloudinary
         try:
-            resume_result = cloudinary.uploader.upload(
-                resume_bytes,
-                resource_type="auto",
-                public_id=f"resumes/{uuid.uuid4()}_{resume.filename}",
-                type="upload"
+            result = await analyze(
+                clerk_id, jobTitle, jobDescription, upload.data, upload.content_type, upload.filename
             )
-            resume_url = resume_result["secure_url"]
-        except Exception as upload_error:
-            logger.exception("Cloudinary upload failed")
+        except ReviewError as review_error:
+            status_code = _review_status(review_error)
+            if status_code != 500:
+                raise HTTPException(status_code=status_code, detail=str(review_error))
+            raise HTTPException(status_code=500, detail=f"Resume review error: {review_error}")
+        except UploadError as upload_error:
             raise HTTPException(status_code=500, detail=f"Cloudinary upload failed: {upload_error}")
 
-        image_url = resume_url.replace("/upload/", "/upload/pg_1,f_png/")
-        resume_id = str(uuid.uuid4())
-
-        # Cache in Redis
-        cache_data = {
-            "clerk_id": clerk_id,
-            "job_title": jobTitle,
-            "job_description": jobDescription,
-            "resume_url": resume_url,
-            "image_url": image_url,
-            "feedback": feedback_obj.dict(),
-        }
-        redis_client.setex(f"resume:{resume_id}", 60 * 60 * 24, json.dumps(cache_data))
-
-        # Save/update in MongoDB
-        user = await User.find_one({"clerk_id": clerk_id})
-        if not user:
-            user = User(
-                clerk_id=clerk_id,
-                resume_url=resume_url,
-                image_url=image_url,
-                job_title=jobTitle,
-                job_description=jobDescription,
-                feedback=feedback_obj,
-            )
-            await user.insert()
-        else:
-            user.resume_url = resume_url
-            user.image_url = image_url
-            user.job_title = jobTitle
-            user.job_description = jobDescription
-            user.feedback = feedback_obj
-            user.updated_at = datetime.utcnow()
-            await user.save()
-
         return {
-            "id": resume_id,
-            "resume_url": resume_url,
-            "image_url": image_url,
+            **result,
             "message": "Resume analyzed, uploaded, cached, and saved."
         }
 
+    except HTTPException:
+        raise
+    except PdfLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.exception("Error analyzing resume")
         raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
 
 
-@router.get("/resume-feedback/{resume_id}", response_model=dict)
-async def get_resume_feedback(resume_id: str):
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/analyze/stream", dependencies=[Depends(rate_limit("analyze"))])
+async def analyze_resume_stream(
+    user_details: dict = Depends(get_current_user),
+    jobTitle: str = Form(...),
+    jobDescription: str = Form(...),
+    resume: UploadFile = File(...),
+):
+    clerk_id = user_details.get("user_id")
+    upload = await _ingest(resume)
+    logger.info(f"Start streaming resume analysis for {clerk_id}: {upload.size} bytes")
+
+    async def events():
+        try:
+            async for event, data in analyze_stream(
+                clerk_id, jobTitle, jobDescription, upload.data, upload.content_type, upload.filename
+            ):
+                yield _sse(event, data)
+        except ReviewError as e:
+            # Headers are already sent, so the status travels in the event
+            yield _sse("error", {"detail": f"Resume review error: {e}", "status": _review_status(e)})
+        except UploadError as e:
+            yield _sse("error", {"detail": f"Cloudinary upload failed: {e}"})
+        except Exception as e:
+            logger.exception("Error streaming resume analysis")
+            yield _sse("error", {"detail": f"Error: {repr(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/analyze/batch", response_model=dict, dependencies=[Depends(rate_limit("batch"))])
+async def analyze_resume_batch(
+    user_details: dict = Depends(get_current_user),
+    jobs: str = Form(..., description='JSON list of {"jobTitle": ..., "jobDescription": ...}'),
+    resume: UploadFile = File(...),
+    mode: Literal["llm", "quick"] = Query("llm"),
+):
     try:
-        await ensure_db_initialized()
-        redis_key = f"resume:{resume_id}"
-        data = redis_client.get(redis_key)
-        if not data:
-            raise HTTPException(status_code=404, detail="Resume not found or expired.")
+        parsed_jobs = json.loads(jobs)
+        if not isinstance(parsed_jobs, list) or not all(
+            isinstance(j, dict) and j.get("jobTitle") and j.get("jobDescription") for j in parsed_jobs
+        ):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="jobs must be a JSON list of objects with jobTitle and jobDescription")
+    if not 0 < len(parsed_jobs) <= settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch must contain 1-{settings.BATCH_MAX_ITEMS} jobs")
 
-        if isinstance(data, bytes):
-            data = data.decode("utf-8")
+    try:
+        logger.info(f"Batch analysis of {len(parsed_jobs)} jobs for {user_details.get('user_id')}")
 
-        result = json.loads(data)
-        return {
-            "image_url": result.get("image_url"),
-            "resume_url": result.get("resume_url"),
-            "feedback": result.get("feedback"),
-        }
+        upload = await _ingest(resume)
+        if mode == "quick":
+            return await quick_score_jobs(upload.data, upload.content_type, parsed_jobs)
+        return await analyze_batch_jobs(upload.data, upload.content_type, upload.filename, parsed_jobs)
 
+    except UploadError as upload_error:
+        raise HTTPException(status_code=500, detail=f"Cloudinary upload failed: {upload_error}")
+    except HTTPException:
+        raise
+    except PdfLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.exception("Error in batch resume analysis")
+        raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
+
+
+@router.post("/analyze/batch-resumes", response_model=dict, dependencies=[Depends(rate_limit("batch"))])
+async def analyze_resumes_batch(
+    user_details: dict = Depends(get_current_user),
+    jobTitle: str = Form(...),
+    jobDescription: str = Form(...),
+    resumes: List[UploadFile] = File(...),
+    mode: Literal["llm", "quick"] = Query("llm"),
+):
+    if not 0 < len(resumes) <= settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch must contain 1-{settings.BATCH_MAX_ITEMS} resumes")
+
+    try:
+        logger.info(f"Batch analysis of {len(resumes)} resumes for {user_details.get('user_id')}")
+
+        uploads = [await _ingest(r) for r in resumes]
+        files = [(u.data, u.content_type, u.filename) for u in uploads]
+        if mode == "quick":
+            return await quick_score_resumes(files, jobTitle, jobDescription)
+        return await analyze_batch_resumes(files, jobTitle, jobDescription)
+
+    except HTTPException:
+        raise
+    except PdfLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.exception("Error in batch resume analysis")
+        raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
+
+
+@router.get("/jobs/{job_id}", response_model=dict)
+async def get_analysis_job(job_id: str):
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job
+
+
+@router.get("/resume-feedback/{resume_id}", response_model=dict)
+async def get_resume_feedback(resume_id: str, request: Request):
+    try:
+        entry = await get_feedback(resume_id)
     except Exception as e:
         logger.exception("Error retrieving resume feedback")
         raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
 
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Resume not found or expired.")
+
+    headers = {"ETag": entry.etag, "Cache-Control": settings.FEEDBACK_CACHE_CONTROL}
+    if entry.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def _cached_page(clerk_id: str, offset: int, limit: int, max_rounds: int = 3) -> list:
+    # Newest first from the per-user index, then one MGET for the page. Index entries
+    # whose resume key has expired are dropped lazily and the page is re-read, so the
+    # offsets of later pages don't shift past entries the client never saw.
+    index_key = user_resumes_key(clerk_id)
+    for _ in range(max_rounds):
+        resume_ids = await async_redis_client.zrevrange(index_key, offset, offset + limit - 1)
+        values = await async_redis_bytes_client.mget([f"resume:{rid}" for rid in resume_ids]) if resume_ids else []
+
+        resumes, expired = [], []
+        for resume_id, data in zip(resume_ids, values):
+            if not data:
+                expired.append(resume_id)
+                continue
+            resume = serializer.loads(data)
+            resumes.append({
+                "resume_id": resume_id,
+                "resume_url": resume.get("resume_url"),
+                "image_url": resume.get("image_url"),
+                "job_title": resume.get("job_title"),
+                "feedback": resume.get("feedback"),
+            })
+
+        if not expired:
+            break
+        await async_redis_client.zrem(index_key, *expired)
+    return resumes
+
 
 @router.get("/user-resumes", response_model=list[dict])
-async def get_user_resumes(request: Request):
+async def get_user_resumes(
+    user_details: dict = Depends(get_current_user),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
     try:
-        await ensure_db_initialized()
-        user_details = authenticate_and_get_user_details(request)
         clerk_id = user_details.get("user_id")
 
-        resumes = []
-        for key in redis_client.scan_iter("resume:*"):
-            data = redis_client.get(key)
-            if not data:
-                continue
-            if isinstance(data, bytes):
-                data = data.decode("utf-8")
-            resume = json.loads(data)
-            if resume.get("clerk_id") == clerk_id:
-                resume_id = key.decode("utf-8").split(":")[-1] if isinstance(key, bytes) else key.split(":")[-1]
-                resumes.append({
-                    "resume_id": resume_id,
-                    "resume_url": resume.get("resume_url"),
-                    "image_url": resume.get("image_url"),
-                    "job_title": resume.get("job_title"),
-                    "feedback": resume.get("feedback"),
-                })
+        resumes = await _cached_page(clerk_id, offset, limit)
+
+        # Redis only indexes the last 24 h, the newest slice of the history, so it serves
+        # a page only when it covers all of it. Anything shorter comes entirely from
+        # MongoDB, which holds every review, so no page mixes the two sources.
+        if len(resumes) < limit:
+            reviews = await ResumeReview.find(ResumeReview.clerk_id == clerk_id)\
+                .sort([("created_at", -1), ("_id", -1)]).skip(offset).limit(limit).to_list()
+            resumes = [{
+                "resume_id": review.resume_id,
+                "resume_url": review.resume_url,
+                "image_url": review.image_url,
+                "job_title": review.job_title,
+                "feedback": review.feedback.dict(),
+            } for review in reviews]
 
-        # If nothing in Redis, fallback to MongoDB
-        if not resumes:
-            user = await User.find_one({"clerk_id": clerk_id})
+        # Users analyzed before the history collection existed only have their latest review
+        if not resumes and offset == 0:
+            user = await User.find_one({"clerk_id": clerk_id, "deleted_at": None})
             if user:
                 resumes.append({
                     "resume_id": str(user.id),
@@ -182,3 +321,50 @@ async def get_user_resumes(request: Request):
     except Exception as e:
         logger.exception("Error retrieving user resumes")
         raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
+
+
+def _encode_cursor(summary: ResumeReviewSummary) -> str:
+    raw = f"{summary.created_at.isoformat()}|{summary.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    try:
+        created_at, review_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), ObjectId(review_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/history", response_model=dict)
+async def get_review_history(
+    user_details: dict = Depends(get_current_user),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    clerk_id = user_details.get("user_id")
+    query = {"clerk_id": clerk_id}
+    if cursor:
+        created_at, review_id = _decode_cursor(cursor)
+        # Keyset pagination on (created_at, _id) walks the compound index without skipping
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": review_id}},
+        ]
+
+    try:
+        summaries = await ResumeReview.find(query)\
+            .sort([("created_at", -1), ("_id", -1)])\
+            .limit(limit + 1)\
+            .project(ResumeReviewSummary)\
+            .to_list()
+    except Exception as e:
+        logger.exception("Error retrieving review history")
+        raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
+
+    has_more = len(summaries) > limit
+    summaries = summaries[:limit]
+    return {
+        "items": [summary.model_dump() for summary in summaries],
+        "next_cursor": _encode_cursor(summaries[-1]) if has_more else None,
+    }
@@ -0,0 +1,133 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
+from app.models.review import ResumeReview, ResumeReviewSummary
+from app.models.user import User
+from app.services.cache import get_job_description, job_description_key
+from app.services.config import settings
+from app.services.executors import run_cpu
+from app.services.extraction import PdfLimitError
+from app.services.generator import ResumeReviewGenerator
+from app.services.ingest import ingest_upload, UploadRejected
+from app.services.metrics import stage
+from app.services.rate_limit import rate_limit
+from app.services.search_index import search_documents, RESUMES, JOBS
+from app.utils.auth import get_current_user
+from app.utils.db import init_db, get_collection
+import asyncio, logging
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def ensure_db_initialized():
+    try:
+        await init_db()
+    except Exception as e:
+        logger.warning(f"DB initialization failed: {repr(e)}")
+
+
+def search_enabled():
+    # The index lives on local disk, so it is opt-in; without it there is nothing to search
+    if not settings.SEARCH_INDEX_ENABLED:
+        raise HTTPException(status_code=503, detail="Search is not enabled on this deployment")
+
+
+router = APIRouter(
+    prefix="/search",
+    tags=["Search"],
+    dependencies=[Depends(search_enabled), Depends(ensure_db_initialized), Depends(get_current_user), Depends(rate_limit("search"))],
+)
+
+
+async def _is_recruiter(clerk_id: str) -> bool:
+    user = await get_collection(User.Settings.name).find_one(
+        {"clerk_id": clerk_id, "roles": {"$in": settings.SEARCH_RECRUITER_ROLES}}, {"_id": 1}
+    )
+    return user is not None
+
+
+async def _own_reviews(clerk_id: str) -> list:
+    # (resume_id, job_description) for every review this user has run
+    cursor = get_collection(ResumeReview.Settings.name).find(
+        {"clerk_id": clerk_id}, {"_id": 0, "resume_id": 1, "job_description": 1}
+    )
+    return [(doc["resume_id"], doc["job_description"]) async for doc in cursor]
+
+
+async def _review_summaries(resume_ids: list) -> list:
+    return await ResumeReview.find({"resume_id": {"$in": resume_ids}}).project(ResumeReviewSummary).to_list()
+
+
+async def search_scope(user_details: dict = Depends(get_current_user)) -> Optional[list]:
+    # Recruiters search every indexed document (None); anyone else only their own reviews
+    clerk_id = user_details.get("user_id")
+    try:
+        if await _is_recruiter(clerk_id):
+            return None
+        return await _own_reviews(clerk_id)
+    except Exception as e:
+        logger.warning(f"Search scope lookup failed: {repr(e)}")
+        raise HTTPException(status_code=503, detail="Search is temporarily unavailable")
+
+
+def result_count(k: int = Query(10, ge=1)) -> int:
+    # The upper bound is read from settings per request, not when the routes are declared
+    if k > settings.SEARCH_MAX_RESULTS:
+        raise HTTPException(status_code=422, detail=f"k must be at most {settings.SEARCH_MAX_RESULTS}")
+    return k
+
+
+async def _search(index: str, text: str, k: int, within: Optional[set] = None) -> list:
+    try:
+        async with stage("search"):
+            return await run_cpu(search_documents, index, text, k, within)
+    except Exception as e:
+        logger.exception("Error searching the index")
+        raise HTTPException(status_code=500, detail=f"Error: {repr(e)}")
+
+
+@router.post("/resumes", response_model=list[dict])
+async def search_resumes(
+    jobDescription: str = Form(...),
+    k: int = Depends(result_count),
+    scope: Optional[list] = Depends(search_scope),
+):
+    within = None if scope is None else {resume_id for resume_id, _ in scope}
+    matches = await _search(RESUMES, jobDescription, k, within)
+    if not matches:
+        return []
+
+    summaries = await _review_summaries([resume_id for resume_id, _ in matches])
+    by_id = {summary.resume_id: summary for summary in summaries}
+
+    # Reviews deleted from Mongo since they were indexed are dropped from the results
+    return [
+        {**by_id[resume_id].model_dump(exclude={"id"}), "score": score}
+        for resume_id, score in matches if resume_id in by_id
+    ]
+
+
+@router.post("/jobs", response_model=list[dict])
+async def search_jobs(
+    resume: UploadFile = File(...),
+    k: int = Depends(result_count),
+    scope: Optional[list] = Depends(search_scope),
+):
+    try:
+        upload = await ingest_upload(resume)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    try:
+        resume_text = await ResumeReviewGenerator.resume_text(upload.data, upload.content_type)
+    except PdfLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    within = None if scope is None else {job_description_key(description)[0] for _, description in scope}
+    matches = await _search(JOBS, resume_text, k, within)
+    descriptions = await asyncio.gather(*(get_job_description(digest) for digest, _ in matches))
+
+    return [
+        {"job_description_hash": digest, "job_description": description, "score": score}
+        for (digest, score), description in zip(matches, descriptions)
+    ]
@@ -1,18 +1,24 @@
 import os
+import time
 import logging
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
-from slowapi.middleware import SlowAPIMiddleware
-import cloudinary
 from dotenv import load_dotenv
 
 from app.services.config import settings
-from app.utils.db import init_db
+from app.utils.db import init_db, close_db, db_health, pool_stats
+from app.services.executors import shutdown_executors
+from app.services.llm import llm_metrics, CircuitBreaker
+from app.services.rate_limit import ip_rate_limit
+from app.services.cache import get_review_cache_stats
+from app.services.feedback_cache import get_feedback_cache_stats
+from app.services.singleflight import get_singleflight_stats
+from app.services import metrics
 from app.routers.resume import router as resume_router
 from app.routers.clerk import router as clerk_router
+from app.routers.search import router as search_router
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +26,23 @@ load_dotenv()
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn.error")
+logger.addFilter(metrics.RequestIdFilter())
+
+
+# Create the shared Mongo client once per process; api/index.py on Vercel may skip the
+# lifespan, in which case the routers' dependency initializes it lazily on first request
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        logger.info("🚀 Initializing database (startup)...")
+        await init_db()
+        logger.info("✅ Database initialized successfully.")
+    except Exception as e:
+        logger.error(f"❌ Database initialization failed: {repr(e)}")
+    yield
+    shutdown_executors()
+    await close_db()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -28,50 +51,111 @@ app = FastAPI(
     version="0.1.0",
     redoc_url="/redoc",
     docs_url="/docs",
+    lifespan=lifespan,
 )
 
 # Include routers immediately so they appear in Swagger Docs
 app.include_router(resume_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
 app.include_router(clerk_router)
 
-# Rate limiting
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+# Reject oversized uploads from Content-Length before the multipart body is spooled
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    if request.method == "POST" and request.url.path.startswith("/api/resume/analyze"):
+        max_files = settings.BATCH_MAX_ITEMS if request.url.path.endswith("/batch-resumes") else 1
+        max_body = settings.PDF_MAX_BYTES * max_files + 1024 * 1024
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body:
+            return JSONResponse(status_code=413, content={"detail": f"Request body exceeds {max_body} bytes"})
+    return await call_next(request)
+
+
+# Request ids tie together every log line and span of one request
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = metrics.new_request_id(request.headers.get("x-request-id"))
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUESTS.observe(
+            time.perf_counter() - start, request.method, getattr(route, "path", "unmatched"), str(status)
+        )
+
+
+# CORS Middleware; Starlette builds the middleware stack on startup, so the allowed
+# origins are read from settings then rather than at import
+class SettingsCORSMiddleware(CORSMiddleware):
+    def __init__(self, app, **kwargs):
+        super().__init__(app, allow_origins=settings.ALLOWED_ORIGINS, **kwargs)
+
 
-# CORS Middleware
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
+    SettingsCORSMiddleware,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Cloudinary config
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
 
 # Root endpoint
-@app.get("/")
-@limiter.limit("100/minute")
-def read_root(request: Request):
+@app.get("/", dependencies=[Depends(ip_rate_limit("default"))])
+def read_root():
     return {"message": "Welcome to AI Resume Reviewer"}
 
 
-# Initialize DB at startup (local runs only)
-@app.on_event("startup")
-async def start_db():
+for gauge in (
+    metrics.Gauge("llm_in_flight", "LLM calls in flight", lambda: llm_metrics().get("in_flight", 0)),
+    metrics.Gauge(
+        "llm_circuit_open", "1 while the LLM circuit breaker is open",
+        lambda: int(llm_metrics()["breaker_state"] == CircuitBreaker.OPEN),
+    ),
+    metrics.Gauge("feedback_cache_hit_ratio", "Feedback read cache hit ratio", lambda: get_feedback_cache_stats()["hit_rate"]),
+    metrics.Gauge("singleflight_coalesced", "Reviews served by another in-flight call",
+                  lambda: get_singleflight_stats()["coalesced_local"] + get_singleflight_stats()["coalesced_remote"]),
+    metrics.Gauge("mongo_pool_in_use", "MongoDB connections checked out", lambda: pool_stats.snapshot()["in_use"]),
+):
+    metrics.register(gauge)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/llm")
+def read_llm_metrics():
+    return llm_metrics()
+
+
+@app.get("/metrics/cache")
+async def read_cache_metrics():
+    return {
+        "feedback": get_feedback_cache_stats(),
+        "review": await get_review_cache_stats(),
+        "singleflight": get_singleflight_stats(),
+    }
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def health_db():
     try:
-        logger.info("🚀 Initializing database (startup)...")
         await init_db()
-        logger.info("✅ Database initialized successfully.")
+        return await db_health()
     except Exception as e:
-        logger.error(f"❌ Database initialization failed: {repr(e)}")
+        logger.error(f"❌ Database health check failed: {repr(e)}")
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {repr(e)}")
 
 
 # Local run entrypoint
@@ -1,5 +1,111 @@
-import redis
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Callable, Optional
 from app.services.config import settings
+from app.services import serializer
+from app.services.metrics import CACHE_REQUESTS
 
-redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
-    
\ No newline at end of file
+logger = logging.getLogger("uvicorn.error")
+
+
+class _LazyClient:
+    # Builds the client (and imports redis) on first use, so importing this module is free
+    def __init__(self, factory: Callable):
+        self._factory = factory
+        self._client = None
+
+    def resolve(self):
+        if self._client is None:
+            self._client = self._factory()
+        return self._client
+
+    def use(self, client) -> None:
+        # Swap in another client (a local stand-in in tests); None rebuilds from settings
+        self._client = client
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+
+def _client(**kwargs):
+    import redis.asyncio as aioredis
+
+    return aioredis.Redis.from_url(settings.REDIS_URL, **kwargs)
+
+
+async_redis_client = _LazyClient(lambda: _client(decode_responses=True))
+# resume:* and jd:* values are versioned binary payloads (see serializer.py)
+async_redis_bytes_client = _LazyClient(_client)
+
+
+def lazy_script(script: str) -> Callable:
+    # register_script needs the client, so defer it to the first call as well,
+    # and register again if the client has been replaced since
+    registered = (None, None)
+
+    async def call(**kwargs):
+        nonlocal registered
+        client = async_redis_client.resolve()
+        if registered[0] is not client:
+            registered = (client, client.register_script(script))
+        return await registered[1](**kwargs)
+
+    return call
+
+
+# Resolved when an error is being handled; by then the client has imported redis anyway
+@lru_cache(maxsize=1)
+def redis_errors() -> tuple:
+    from redis.exceptions import RedisError
+
+    return (RedisError,)
+
+
+REVIEW_CACHE_PREFIX = "review"
+USER_RESUMES_PREFIX = "user_resumes"
+JOB_DESCRIPTION_PREFIX = "jd"
+REVIEW_CACHE_HITS = "review_cache:hits"
+REVIEW_CACHE_MISSES = "review_cache:misses"
+
+
+# Sorted set of a user's resume ids scored by creation time
+def user_resumes_key(clerk_id: str) -> str:
+    return f"{USER_RESUMES_PREFIX}:{clerk_id}"
+
+
+# Job descriptions are shared by many resumes, so they're stored once per content hash
+def job_description_key(job_description: str) -> tuple[str, str]:
+    digest = hashlib.sha256(job_description.encode("utf-8")).hexdigest()[:32]
+    return digest, f"{JOB_DESCRIPTION_PREFIX}:{digest}"
+
+
+async def get_job_description(digest: str) -> Optional[str]:
+    data = await async_redis_bytes_client.get(f"{JOB_DESCRIPTION_PREFIX}:{digest}")
+    return serializer.loads(data)["text"] if data else None
+
+
+# ---------- Review cache ----------
+async def get_cached_review(key: str, count: bool = True) -> Optional[dict]:
+    try:
+        data = await async_redis_client.get(f"{REVIEW_CACHE_PREFIX}:{key}")
+        if count:
+            CACHE_REQUESTS.inc("review", "hit" if data else "miss")
+            await async_redis_client.incr(REVIEW_CACHE_HITS if data else REVIEW_CACHE_MISSES)
+    except redis_errors() as e:
+        logger.warning(f"Review cache lookup failed: {repr(e)}")
+        return None
+    return json.loads(data) if data else None
+
+
+async def set_cached_review(key: str, feedback: dict) -> None:
+    try:
+        await async_redis_client.setex(f"{REVIEW_CACHE_PREFIX}:{key}", settings.REVIEW_CACHE_TTL, json.dumps(feedback))
+    except redis_errors() as e:
+        logger.warning(f"Review cache write failed: {repr(e)}")
+
+
+async def get_review_cache_stats() -> dict:
+    hits, misses = await async_redis_client.mget(REVIEW_CACHE_HITS, REVIEW_CACHE_MISSES)
+    return {"hits": int(hits or 0), "misses": int(misses or 0)}
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+from pymongo import UpdateOne
+from app.models.user import User
+from app.services.cache import async_redis_client
+from app.services.config import settings
+from app.utils.db import get_collection
+
+logger = logging.getLogger("uvicorn.error")
+
+WEBHOOK_DEDUP_PREFIX = "webhook:svix"
+USER_EVENTS = ("user.created", "user.updated", "user.deleted")
+# Profile fields written from Clerk; a deletion clears them and leaves a tombstone
+PROFILE_FIELDS = ("email", "first_name", "last_name", "phone_number", "profile_image_url")
+DUPLICATE_KEY = 11000
+
+
+class InvalidEvent(ValueError):
+    pass
+
+
+# ---------- Dedup ----------
+# Svix redelivers on timeouts and Clerk replays whole histories, so each svix-id is
+# claimed once; a failed write releases the claim so the retry is processed.
+async def claim_event(svix_id: str) -> bool:
+    try:
+        return bool(await async_redis_client.set(
+            f"{WEBHOOK_DEDUP_PREFIX}:{svix_id}", 1, nx=True, ex=settings.CLERK_WEBHOOK_DEDUP_TTL
+        ))
+    except Exception as e:
+        # Without Redis the upsert is still idempotent, just not free
+        logger.warning(f"Webhook dedup unavailable: {repr(e)}")
+        return True
+
+
+async def release_event(svix_id: str) -> None:
+    try:
+        await async_redis_client.delete(f"{WEBHOOK_DEDUP_PREFIX}:{svix_id}")
+    except Exception as e:
+        logger.warning(f"Failed to release webhook claim {svix_id}: {repr(e)}")
+
+
+# ---------- Event -> Mongo operation ----------
+def _primary(items: list, primary_id: Optional[str], field: str) -> Optional[str]:
+    for item in items or []:
+        if item.get("id") == primary_id:
+            return item.get(field)
+    return (items or [{}])[0].get(field)
+
+
+def event_version(event: dict) -> int:
+    # Clerk's own clock in ms: the user's updated_at, else when the event was emitted.
+    # Deletions carry no updated_at, so they're stamped with the event time.
+    data = event.get("data") or {}
+    if event.get("type") == "user.deleted":
+        return int(event.get("timestamp") or time.time() * 1000)
+    return int(data.get("updated_at") or event.get("timestamp") or 0)
+
+
+def user_operation(event: dict):
+    # One atomic write per event, applied only if nothing newer has been written for this
+    # user. When the stored version is newer, the filter misses and the upsert collides
+    # with the unique clerk_id, which _write retries once and then reports as a stale
+    # event rather than an error.
+    # Deletes leave a versioned tombstone, so a late or replayed update can't resurrect the user.
+    event_type = event.get("type")
+    data = event.get("data") or {}
+    clerk_id = data.get("id")
+    if not clerk_id:
+        raise InvalidEvent("Missing user id")
+
+    version = event_version(event)
+    now = datetime.utcnow()
+    guard = {"clerk_id": clerk_id, "clerk_updated_at": {"$not": {"$gt": version}}}
+
+    if event_type == "user.deleted":
+        return UpdateOne(
+            guard,
+            {
+                "$set": {"clerk_updated_at": version, "deleted_at": now, "updated_at": now},
+                "$unset": {field: "" for field in PROFILE_FIELDS},
+                "$setOnInsert": {"created_at": now, "roles": []},
+            },
+            upsert=True,
+        )
+
+    email = _primary(data.get("email_addresses"), data.get("primary_email_address_id"), "email_address")
+    if not email:
+        raise InvalidEvent("Missing email address")
+
+    return UpdateOne(
+        guard,
+        {
+            "$set": {
+                "email": email,
+                "first_name": data.get("first_name"),
+                "last_name": data.get("last_name"),
+                "phone_number": _primary(data.get("phone_numbers"), data.get("primary_phone_number_id"), "phone_number"),
+                "profile_image_url": data.get("profile_image_url") or data.get("image_url"),
+                "clerk_updated_at": version,
+                "updated_at": now,
+            },
+            "$unset": {"deleted_at": ""},
+            "$setOnInsert": {"created_at": now, "roles": []},
+        },
+        upsert=True,
+    )
+
+
+# ---------- Writers ----------
+async def _write(operations: list) -> list:
+    # Returns an error (or None) per operation. Version guards make the result independent
+    # of arrival order, so the batch runs unordered and one bad write doesn't stop the rest.
+    from pymongo.errors import BulkWriteError
+
+    errors = [None] * len(operations)
+    pending, stale = list(range(len(operations))), {}
+    # A duplicate key is a stale event (the guard missed a newer user) or a lost race
+    # between two first-time upserts, which Mongo doesn't retry because the filter isn't
+    # pure equality. One more run tells them apart: the user exists by then, so the
+    # write either applies or misses again as stale.
+    for _ in range(2):
+        duplicates = []
+        try:
+            await get_collection(User.Settings.name).bulk_write([operations[i] for i in pending], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                index = pending[error["index"]]
+                if error.get("code") == DUPLICATE_KEY:
+                    duplicates.append(index)
+                    stale[index] = error.get("op", {}).get("q", {}).get("clerk_id")
+                else:
+                    errors[index] = RuntimeError(error.get("errmsg", "write failed"))
+        pending = duplicates
+        if not pending:
+            break
+    for index in pending:
+        logger.info(f"Skipped stale Clerk event: {stale[index]}")
+    return errors
+
+
+class BulkWriter:
+    # Micro-batches concurrent webhook deliveries into one bulk_write. Each caller
+    # still waits for its batch to land, so a 2xx is only returned once written.
+
+    def __init__(self, max_size: int, max_wait: float):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, operation) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operation, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._write_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _write_batch(self, batch: list) -> None:
+        try:
+            errors = await _write([operation for operation, _ in batch])
+        except Exception as e:
+            errors = [e] * len(batch)
+        for (_, future), error in zip(batch, errors):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+_bulk_writer: Optional[BulkWriter] = None
+
+
+def _get_bulk_writer() -> BulkWriter:
+    global _bulk_writer
+    if _bulk_writer is None:
+        _bulk_writer = BulkWriter(settings.CLERK_WEBHOOK_BATCH_SIZE, settings.CLERK_WEBHOOK_BATCH_WAIT)
+    return _bulk_writer
+
+
+async def apply_event(event: dict) -> None:
+    operation = user_operation(event)
+    if settings.CLERK_WEBHOOK_BATCH:
+        await _get_bulk_writer().submit(operation)
+    else:
+        error, = await _write([operation])
+        if error is not None:
+            raise error
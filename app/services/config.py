@@ -1,4 +1,5 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 
@@ -6,17 +7,89 @@ class Settings(BaseSettings):
     PORT: int = 8000
     DEBUG: bool = False
     GEMINI_API_KEY: str
+    GEMINI_API_ENDPOINT: Optional[str] = None
+    LLM_TIMEOUT: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_BREAKER_THRESHOLD: int = 5
+    LLM_BREAKER_RESET: float = 30.0
+    LLM_PREFIX_CACHE: bool = True
+    LLM_PREFIX_CACHE_TTL: float = 60 * 60
+    LLM_PREFIX_CACHE_REFRESH: float = 5 * 60
+    LLM_PREFIX_CACHE_RETRY: float = 10 * 60
     ALLOWED_ORIGINS: str = ""
     REDIS_URL: str
     CLERK_SECRET_KEY : str
     JWT_SECRET_KEY : str
+    JWT_KEY: Optional[str] = None
+    CLERK_JWKS_URL: str = "https://api.clerk.com/v1/jwks"
+    CLERK_AUTHORIZED_PARTIES: str = ""
+    CLERK_WEBHOOK_DEDUP_TTL: int = 60 * 60 * 24 * 3
+    CLERK_WEBHOOK_BATCH: bool = False
+    CLERK_WEBHOOK_BATCH_SIZE: int = 500
+    CLERK_WEBHOOK_BATCH_WAIT: float = 0.05
+    AUTH_JWKS_TTL: int = 60 * 60
+    AUTH_JWKS_MIN_REFRESH: int = 30
+    AUTH_TOKEN_CACHE_TTL: int = 30
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000
+    AUTH_CLOCK_SKEW: int = 5
     MONGO_URI: str
     DB_NAME: str
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_MS: int = 60_000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5_000
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
+    REVIEW_CACHE_TTL: int = 60 * 60 * 24 * 7
+    TRUSTED_PROXIES: str = ""
+    RATE_LIMITS: str = "default=100/minute,analyze=10/minute,batch=2/minute,search=30/minute"
+    LLM_DAILY_TOKEN_QUOTA: int = 200_000
+    LLM_OUTPUT_TOKEN_ESTIMATE: int = 1_500
+    SINGLEFLIGHT_LOCK_TTL: float = 30.0
+    SINGLEFLIGHT_WAIT_TIMEOUT: float = 90.0
+    SINGLEFLIGHT_POLL_INTERVAL: float = 0.5
+    METRICS_ENABLED: bool = True
+    TRACING_ENABLED: bool = False
+    FEEDBACK_CACHE_SIZE: int = 2048
+    FEEDBACK_CACHE_TTL: int = 60 * 60
+    FEEDBACK_CACHE_CONTROL: str = "public, max-age=86400, immutable"
+    ANALYZE_CONCURRENCY: int = 8
+    PDF_EXECUTOR: str = "thread"
+    PDF_WORKERS: int = 2
+    PDF_BACKEND: str = "pypdfium2"
+    PDF_MAX_BYTES: int = 10 * 1024 * 1024
+    PDF_MAX_PAGES: int = 20
+    PDF_MAX_CHARS: int = 100_000
+    PDF_PARALLEL_MIN_PAGES: int = 8
+    PDF_PAGE_WORKERS: int = 2
+    PDF_PAGE_CACHE_SIZE: int = 128
+    IO_WORKERS: int = 16
+    PROMPT_TOKEN_BUDGET: int = 6000
+    PROMPT_JD_TOKEN_BUDGET: int = 1500
+    PROMPT_MIN_RESUME_TOKENS: int = 1500
+    SCORING_GROUNDING: bool = True
+    SCORING_MAX_KEYWORDS: int = 40
+    # Opt-in: needs a writable, persistent SEARCH_INDEX_DIR, which serverless deployments lack
+    SEARCH_INDEX_ENABLED: bool = False
+    SEARCH_INDEX_DIR: str = "data/search-index"
+    SEARCH_INDEX_DIM: int = 128
+    SEARCH_MAX_RESULTS: int = 100
+    SEARCH_RECRUITER_ROLES: str = "recruiter"
+    BATCH_MAX_ITEMS: int = 50
+    BATCH_CONCURRENCY: int = 5
+    JOB_WORKERS: int = 4
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_DELAY: float = 2.0
+    JOB_RETRY_MAX_DELAY: float = 60.0
+    JOB_POLL_TIMEOUT: int = 5
+    JOB_STALE_SECONDS: int = 15 * 60
+    JOB_REQUEUE_INTERVAL: float = 60.0
     
-    @field_validator("ALLOWED_ORIGINS")
+    @field_validator("ALLOWED_ORIGINS", "CLERK_AUTHORIZED_PARTIES", "TRUSTED_PROXIES", "SEARCH_RECRUITER_ROLES")
     def parse_allowed_origins(cls, v: str) -> List[str]:
         return v.split(",") if v else []
     
@@ -25,4 +98,17 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = True
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
+
+
+class _LazySettings:
+    # Reading .env and validating happens on first use rather than at import,
+    # so modules can be imported (and tools run) without a full environment.
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
\ No newline at end of file
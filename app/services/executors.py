@@ -0,0 +1,68 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional
+from app.services.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+_cpu_pool: Optional[Executor] = None
+_io_pool: Optional[Executor] = None
+_page_pool: Optional[Executor] = None
+_analyze_semaphore: Optional[asyncio.Semaphore] = None
+
+
+# ---------- Pools ----------
+def get_cpu_pool() -> Executor:
+    # PDF extraction is CPU-bound; a process pool sidesteps the GIL on long-running
+    # workers, while the thread pool is the safe default for serverless runtimes.
+    global _cpu_pool
+    if _cpu_pool is None:
+        if settings.PDF_EXECUTOR == "process":
+            _cpu_pool = ProcessPoolExecutor(max_workers=settings.PDF_WORKERS)
+        else:
+            _cpu_pool = ThreadPoolExecutor(max_workers=settings.PDF_WORKERS, thread_name_prefix="pdf")
+        logger.info(f"PDF executor started: {settings.PDF_EXECUTOR} x{settings.PDF_WORKERS}")
+    return _cpu_pool
+
+
+def get_io_pool() -> Executor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=settings.IO_WORKERS, thread_name_prefix="io")
+    return _io_pool
+
+
+def get_page_pool() -> Executor:
+    # Per-page PDF extraction for long documents; always processes since pdfium isn't thread-safe
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = ProcessPoolExecutor(max_workers=settings.PDF_PAGE_WORKERS)
+    return _page_pool
+
+
+def analyze_slot() -> asyncio.Semaphore:
+    global _analyze_semaphore
+    if _analyze_semaphore is None:
+        _analyze_semaphore = asyncio.Semaphore(settings.ANALYZE_CONCURRENCY)
+    return _analyze_semaphore
+
+
+# ---------- Helpers ----------
+async def run_cpu(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_io(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors() -> None:
+    global _cpu_pool, _io_pool, _page_pool
+    for pool in (_cpu_pool, _io_pool, _page_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _cpu_pool = _io_pool = _page_pool = None
@@ -0,0 +1,194 @@
+import hashlib
+import io
+import logging
+import re
+from collections import OrderedDict
+from threading import Lock
+from app.services.config import settings
+from app.services.executors import get_page_pool
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class PdfLimitError(ValueError):
+    pass
+
+
+# ---------- Backends ----------
+# Each backend returns the text of pages [start, stop). They are module-level
+# functions so page ranges can be shipped to the process pool.
+def _pdfium_page_count(file_bytes: bytes) -> int:
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def _pdfium_pages(file_bytes: bytes, start: int, stop: int) -> list:
+    import pypdfium2 as pdfium
+    pages = []
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_bounded().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return pages
+
+
+def _pdfplumber_page_count(file_bytes: bytes) -> int:
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        return len(pdf.pages)
+
+
+def _pdfplumber_pages(file_bytes: bytes, start: int, stop: int) -> list:
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+BACKENDS = {
+    "pypdfium2": (_pdfium_page_count, _pdfium_pages),
+    "pdfplumber": (_pdfplumber_page_count, _pdfplumber_pages),
+}
+
+
+# ---------- Page cache ----------
+_page_cache: "OrderedDict[tuple, list]" = OrderedDict()
+_page_cache_lock = Lock()
+
+
+def _cache_get(key: tuple):
+    with _page_cache_lock:
+        pages = _page_cache.get(key)
+        if pages is not None:
+            _page_cache.move_to_end(key)
+        return pages
+
+
+def _cache_put(key: tuple, pages: list) -> None:
+    with _page_cache_lock:
+        _page_cache[key] = pages
+        _page_cache.move_to_end(key)
+        while len(_page_cache) > settings.PDF_PAGE_CACHE_SIZE:
+            _page_cache.popitem(last=False)
+
+
+# ---------- Extraction ----------
+def _extract_pages(file_bytes: bytes, backend: str) -> list:
+    count_pages, read_pages = BACKENDS[backend]
+    page_count = count_pages(file_bytes)
+    if page_count > settings.PDF_MAX_PAGES:
+        raise PdfLimitError(f"PDF has {page_count} pages; the limit is {settings.PDF_MAX_PAGES}")
+
+    if page_count < settings.PDF_PARALLEL_MIN_PAGES or settings.PDF_PAGE_WORKERS <= 1:
+        return read_pages(file_bytes, 0, page_count)
+
+    # Long documents: split into contiguous page ranges, one per worker process
+    # (pdfium is not thread-safe, so threads wouldn't help here)
+    step = -(-page_count // settings.PDF_PAGE_WORKERS)
+    pool = get_page_pool()
+    futures = [
+        pool.submit(read_pages, file_bytes, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    return [page for future in futures for page in future.result()]
+
+
+def extract_pages(file_bytes: bytes, backend: str = None) -> list:
+    if len(file_bytes) > settings.PDF_MAX_BYTES:
+        raise PdfLimitError(f"PDF is {len(file_bytes)} bytes; the limit is {settings.PDF_MAX_BYTES}")
+
+    backend = backend or settings.PDF_BACKEND
+    cache_key = (hashlib.sha256(file_bytes).hexdigest(), backend)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        pages = _extract_pages(file_bytes, backend)
+    except PdfLimitError:
+        raise
+    except Exception as e:
+        if backend == "pdfplumber":
+            raise
+        logger.warning(f"{backend} extraction failed, falling back to pdfplumber: {repr(e)}")
+        backend, pages = "pdfplumber", _extract_pages(file_bytes, "pdfplumber")
+
+    # Scanned or oddly laid out PDFs can come back empty from pdfium; pdfplumber's
+    # layout analysis is slower but recovers more of those
+    if backend != "pdfplumber" and not any(page.strip() for page in pages):
+        logger.info("No text from %s, retrying with pdfplumber", backend)
+        pages = _extract_pages(file_bytes, "pdfplumber")
+
+    _cache_put(cache_key, pages)
+    return pages
+
+
+# ---------- Page furniture ----------
+# Running headers and footers sit in the first or last few lines of most pages. Only
+# those edge lines are compared across pages, so body text that repeats (the same
+# job title at two employers, "Responsibilities:") is never touched.
+EDGE_LINES = 3
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _edge_key(line: str) -> str:
+    # "Jane Doe - Page 2" and "Jane Doe - Page 3" are the same footer
+    return _DIGITS_RE.sub("#", " ".join(line.split()).lower())
+
+
+def _edge_indexes(lines: list) -> set:
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:EDGE_LINES] + filled[-EDGE_LINES:])
+
+
+def strip_page_furniture(pages: list) -> list:
+    # Drops page numbers and keeps only the first copy of a header/footer line that
+    # appears at the edge of at least half the pages (and at least two)
+    split = [page.split("\n") for page in pages]
+    edges = [_edge_indexes(lines) for lines in split]
+
+    counts = {}
+    for lines, indexes in zip(split, edges):
+        for key in {_edge_key(lines[i]) for i in indexes}:
+            counts[key] = counts.get(key, 0) + 1
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {key for key, count in counts.items() if count >= threshold}
+
+    seen, stripped = set(), []
+    for lines, indexes in zip(split, edges):
+        kept = []
+        for i, line in enumerate(lines):
+            if i in indexes:
+                if _PAGE_NUMBER_RE.match(line.strip()):
+                    continue
+                key = _edge_key(line)
+                if key in repeated:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            kept.append(line)
+        stripped.append("\n".join(kept))
+    return stripped
+
+
+def extract_text(file_bytes: bytes, backend: str = None) -> str:
+    parts, length = [], 0
+    for page in strip_page_furniture(extract_pages(file_bytes, backend)):
+        if not page:
+            continue
+        parts.append(page)
+        length += len(page) + 1
+        if length >= settings.PDF_MAX_CHARS:
+            logger.warning(f"PDF text truncated at {settings.PDF_MAX_CHARS} characters")
+            break
+    return ("\n".join(parts) + "\n")[:settings.PDF_MAX_CHARS] if parts else ""
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from cachetools import TTLCache
+from app.models.review import ResumeReview
+from app.services import serializer
+from app.services.cache import async_redis_bytes_client
+from app.services.config import settings
+from app.services.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger("uvicorn.error")
+
+
+@dataclass
+class FeedbackEntry:
+    body: bytes
+    etag: str
+
+
+# Feedback is immutable once written, so a rendered response body can be reused as-is.
+# Sized from settings on first use rather than at import.
+@lru_cache(maxsize=1)
+def _get_local() -> TTLCache:
+    return TTLCache(maxsize=settings.FEEDBACK_CACHE_SIZE, ttl=settings.FEEDBACK_CACHE_TTL)
+
+
+stats = {"memory_hits": 0, "redis_hits": 0, "mongo_hits": 0, "misses": 0}
+
+
+def _entry(payload: dict) -> FeedbackEntry:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return FeedbackEntry(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+async def _load(resume_id: str) -> Optional[dict]:
+    data = await async_redis_bytes_client.get(f"resume:{resume_id}")
+    if data:
+        stats["redis_hits"] += 1
+        CACHE_REQUESTS.inc("feedback", "redis")
+        result = serializer.loads(data)
+        return {
+            "image_url": result.get("image_url"),
+            "resume_url": result.get("resume_url"),
+            "feedback": result.get("feedback"),
+        }
+
+    # Redis copies expire after a day; the history collection keeps them for good
+    review = await ResumeReview.find_one(ResumeReview.resume_id == resume_id)
+    if review:
+        stats["mongo_hits"] += 1
+        CACHE_REQUESTS.inc("feedback", "mongo")
+        return {
+            "image_url": review.image_url,
+            "resume_url": review.resume_url,
+            "feedback": review.feedback.dict(),
+        }
+    return None
+
+
+async def get_feedback(resume_id: str) -> Optional[FeedbackEntry]:
+    entry = _get_local().get(resume_id)
+    if entry is not None:
+        stats["memory_hits"] += 1
+        CACHE_REQUESTS.inc("feedback", "memory")
+        return entry
+
+    payload = await _load(resume_id)
+    if payload is None:
+        stats["misses"] += 1
+        CACHE_REQUESTS.inc("feedback", "miss")
+        return None
+
+    entry = _entry(payload)
+    _get_local()[resume_id] = entry
+    return entry
+
+
+def get_feedback_cache_stats() -> dict:
+    total = sum(stats.values())
+    return {
+        **stats,
+        "size": len(_get_local()),
+        "hit_rate": round((stats["memory_hits"] + stats["redis_hits"]) / total, 4) if total else 0.0,
+        "memory_hit_rate": round(stats["memory_hits"] / total, 4) if total else 0.0,
+    }
@@ -1,69 +1,201 @@
-import os
-import io
 import json
 import logging
-import re
+import hashlib
+import time
+import unicodedata
+from typing import AsyncIterator, Callable, Optional
 from dotenv import load_dotenv
-import pdfplumber
-import google.generativeai as genai
-from app.services.prompts import RESUME_PROMPT, json_structure
+from pydantic import ValidationError
+from app.services.llm import get_llm_client, LLMUnavailableError
+from app.services.llm_schema import FEEDBACK_SCHEMA, section_schema
+from app.services.rate_limit import charge_quota
+from app.services import singleflight
+from app.services.metrics import stage, LLM_TOKENS, LLM_SECONDS
+from app.services.prompts import RESUME_INSTRUCTIONS, RESUME_REQUEST, json_structure
+from app.services.cache import get_cached_review, set_cached_review
+from app.services.executors import run_cpu
+from app.services.extraction import extract_text, PdfLimitError
+from app.services.config import settings
+from app.services.scoring import score_resume, grounding
+from app.services.prompt_builder import count_tokens, compact_job_description, compact_resume, PromptStats
+from app.models.user import Feedback
 
 load_dotenv()
 logger = logging.getLogger("uvicorn.error")
 
+# Stable across requests: sent through Gemini context caching when available
+PROMPT_PREFIX = RESUME_INSTRUCTIONS.replace("${AIResponseFormat}", json_structure)
 
-class ResumeReviewGenerator:
 
-    @classmethod
-    def _get_llm(cls):
-        gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_api_key:
-            raise ValueError("GEMINI_API_KEY not set in environment variables.")
-        genai.configure(api_key=gemini_api_key)
-        return genai
+# ---------- Incremental JSON parsing ----------
+class IncrementalJSONParser:
+    # Tracks the top-level object of a streamed LLM response and hands back each
+    # member as soon as its closing comma/brace arrives, without re-scanning the buffer.
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self.finished = False
+
+    def feed(self, chunk: str) -> dict:
+        self.buffer += chunk
+        completed = {}
+
+        for i in range(self._pos, len(self.buffer)):
+            ch = self.buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if self.finished or (self._depth == 0 and ch != "{"):
+                # Skip fences or chatter around the object
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = i + 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.update(self._close_member(i))
+                    self.finished = True
+            elif ch == "," and self._depth == 1:
+                completed.update(self._close_member(i))
+                self._member_start = i + 1
+
+        self._pos = len(self.buffer)
+        return completed
+
+    def _close_member(self, end: int) -> dict:
+        member = self.buffer[self._member_start:end].strip()
+        if not member:
+            return {}
+        try:
+            return json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            logger.warning("Skipping unparsable streamed member: %s", member[:100].replace("\n", " "))
+            return {}
+
+    def result(self) -> dict:
+        return ResumeReviewGenerator.parse_llm_response(self.buffer)
+
+
+class ResumeReviewGenerator:
+    MODEL_NAME = "gemini-2.5-flash-lite"
 
     @classmethod
     def extract_text_from_pdf(cls, file_bytes: bytes) -> str:
-        text = ""
         try:
-            with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            return extract_text(file_bytes)
+        except PdfLimitError:
+            raise
         except Exception as e:
             logger.exception("Failed to extract text from PDF")
             raise ValueError(f"Failed to extract text from PDF: {e}")
-        return text
 
     @classmethod
     def generate_prompt(cls, job_title: str, job_description: str) -> str:
-        return RESUME_PROMPT.replace("${jobTitle}", job_title)\
-                            .replace("${jobDescription}", job_description)\
-                            .replace("${AIResponseFormat}", json_structure)
+        job_description = compact_job_description(job_description, settings.PROMPT_JD_TOKEN_BUDGET)
+        return RESUME_REQUEST.replace("${jobTitle}", job_title)\
+                             .replace("${jobDescription}", job_description)
+
+    @classmethod
+    def ground_prompt(cls, prompt: str, resume_text: str, job_description: str) -> str:
+        # Hand the model the measured keyword overlap instead of letting it guess
+        if not settings.SCORING_GROUNDING:
+            return prompt
+        result = score_resume(resume_text, job_description, settings.SCORING_MAX_KEYWORDS)
+        return f"{prompt}\n\n{grounding(result)}"
 
     @classmethod
-    def call_gemini(cls, prompt: str, resume_text: str) -> str:
-        client = cls._get_llm()
-        model = client.GenerativeModel("gemini-2.5-flash-lite")
+    def fit_to_budget(cls, prompt: str, resume_text: str, job_description: str) -> tuple[str, PromptStats]:
+        # The resume gets whatever the instructions and job description leave of the budget
+        prompt_tokens = count_tokens(PROMPT_PREFIX) + count_tokens(prompt)
+        resume_budget = max(settings.PROMPT_TOKEN_BUDGET - prompt_tokens, settings.PROMPT_MIN_RESUME_TOKENS)
+        compacted = compact_resume(resume_text, resume_budget)
+
+        raw_prompt_tokens = prompt_tokens - count_tokens(
+            compact_job_description(job_description, settings.PROMPT_JD_TOKEN_BUDGET)
+        ) + count_tokens(job_description)
+        stats = PromptStats(
+            raw_tokens=raw_prompt_tokens + count_tokens(resume_text),
+            prompt_tokens=prompt_tokens + count_tokens(compacted),
+        )
+        return compacted, stats
+
+    @classmethod
+    def generation_config(cls, schema: Optional[dict] = None) -> dict:
+        # Structured output: Gemini is constrained to the Feedback schema, so no regex scraping
+        return {"response_mime_type": "application/json", "response_schema": schema or FEEDBACK_SCHEMA}
+
+    @classmethod
+    def report_usage(cls, response, seconds: float) -> None:
+        # Per-request token savings from the cached prefix, and latency split by prefix mode
+        usage = getattr(response, "usage_metadata", None)
+        cached = getattr(usage, "cached_content_token_count", 0) or 0
+        mode = "cached" if cached else "inline"
+        LLM_SECONDS.observe(seconds, mode)
+        if usage:
+            LLM_TOKENS.inc("input", amount=usage.prompt_token_count)
+            LLM_TOKENS.inc("output", amount=usage.candidates_token_count)
+            LLM_TOKENS.inc("cached", amount=cached)
+            logger.info(
+                "LLM call (%s prefix): %d input tokens, %d served from cache, %.0f ms",
+                mode, usage.prompt_token_count, cached, seconds * 1000,
+            )
+
+    @classmethod
+    async def call_gemini(cls, prompt: str, resume_text: str, schema: Optional[dict] = None) -> str:
+        client = get_llm_client(cls.MODEL_NAME)
         full_content = f"{prompt}\n\nResume:\n{resume_text}"
 
         try:
-            response = model.generate_content(
-                contents=full_content
-            )
+            start = time.perf_counter()
+            async with stage("llm"):
+                response = await client.generate(
+                    full_content, prefix=PROMPT_PREFIX, generation_config=cls.generation_config(schema)
+                )
+            cls.report_usage(response, time.perf_counter() - start)
             return response.text
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.exception("Error calling Gemini model")
             raise RuntimeError(f"LLM generation failed: {e}")
 
+    @classmethod
+    async def stream_gemini(cls, prompt: str, resume_text: str) -> AsyncIterator[str]:
+        client = get_llm_client(cls.MODEL_NAME)
+        full_content = f"{prompt}\n\nResume:\n{resume_text}"
+
+        try:
+            async with stage("llm_stream"):
+                async for chunk in client.stream(
+                    full_content, prefix=PROMPT_PREFIX, generation_config=cls.generation_config()
+                ):
+                    yield chunk
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            logger.exception("Error streaming from Gemini model")
+            raise RuntimeError(f"LLM generation failed: {e}")
+
     @classmethod
     def parse_llm_response(cls, llm_response: str) -> dict:
-        cleaned_response = re.search(r"\{.*\}|\[.*\]", llm_response, re.DOTALL)
-        if cleaned_response:
-            json_string = cleaned_response.group(0)
-        else:
-            json_string = llm_response.strip()
+        # JSON mode returns a bare object; tolerate stray fences or chatter around it
+        start, end = llm_response.find("{"), llm_response.rfind("}")
+        json_string = llm_response[start:end + 1] if 0 <= start < end else llm_response.strip()
 
         try:
             data = json.loads(json_string)
@@ -76,17 +208,158 @@ class ResumeReviewGenerator:
             raise ValueError(f"Error parsing LLM response: {e}")
 
     @classmethod
-    def review_resume(cls, file_bytes: bytes, content_type: str, job_title: str, job_description: str) -> dict:
+    async def parse_feedback(cls, llm_response: str, prompt: str, resume_text: str) -> dict:
+        # Fast path: parse and validate in one pass
+        try:
+            return Feedback.model_validate_json(llm_response).model_dump()
+        except ValidationError as e:
+            errors = e.errors()
+
+        data = cls.parse_llm_response(llm_response)
+        if not isinstance(data, dict):
+            raise ValueError("LLM response is not a JSON object")
+        try:
+            return Feedback.model_validate(data).model_dump()
+        except ValidationError as e:
+            errors = e.errors()
+
+        # Only re-ask for the sections that failed instead of re-running the whole review
+        failing = sorted({str(error["loc"][0]) for error in errors if error["loc"] and error["loc"][0] in Feedback.model_fields})
+        if not failing:
+            raise ValueError(f"LLM response failed validation: {errors[:3]}")
+        logger.warning("Repairing invalid feedback sections: %s", ", ".join(failing))
+
+        for section in failing:
+            data[section] = await cls.repair_section(section, prompt, resume_text)
+        return Feedback.model_validate(data).model_dump()
+
+    @classmethod
+    async def repair_section(cls, section: str, prompt: str, resume_text: str):
+        repair_prompt = (
+            f"{prompt}\n\nReturn only the value of the \"{section}\" field of that JSON object, "
+            f"as valid JSON matching its schema."
+        )
+        schema = section_schema(section)
+        response = await cls.call_gemini(repair_prompt, resume_text, schema=schema)
+        if schema["type"] == "OBJECT":
+            return cls.parse_llm_response(response)
+        return json.loads(response)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = unicodedata.normalize("NFKC", text or "")
+        return " ".join(text.split())
+
+    @classmethod
+    def prompt_version(cls) -> str:
+        # Any change to the prompt template, output schema, model or the settings that shape
+        # what is sent (grounding, token budgets) yields a new version, so previously
+        # cached reviews are never served for a different prompt.
+        digest = hashlib.sha256()
+        grounding_flag = f"grounded:{settings.SCORING_MAX_KEYWORDS}" if settings.SCORING_GROUNDING else "plain"
+        budgets = f"{settings.PROMPT_TOKEN_BUDGET}:{settings.PROMPT_JD_TOKEN_BUDGET}:{settings.PROMPT_MIN_RESUME_TOKENS}"
+        for part in (RESUME_INSTRUCTIONS, RESUME_REQUEST, json_structure, cls.MODEL_NAME, grounding_flag, budgets):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def cache_key(cls, resume_text: str, job_title: str, job_description: str) -> str:
+        digest = hashlib.sha256()
+        for part in (cls.prompt_version(), resume_text, job_title, job_description):
+            digest.update(cls._normalize(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    async def resume_text(cls, file_bytes: bytes, content_type: str) -> str:
         if content_type == "application/pdf":
-            resume_text = cls.extract_text_from_pdf(file_bytes)
+            async with stage("extract"):
+                resume_text = await run_cpu(cls.extract_text_from_pdf, file_bytes)
             logger.info("Extracted %d characters from PDF", len(resume_text))
         else:
             resume_text = file_bytes.decode("utf-8", errors="ignore")
             logger.info("Decoded %d characters from text resume", len(resume_text))
+        return resume_text
 
-        prompt = cls.generate_prompt(job_title, job_description)
-        llm_response = cls.call_gemini(prompt, resume_text)
+    @classmethod
+    async def review_resume(cls, file_bytes: bytes, content_type: str, job_title: str, job_description: str) -> dict:
+        resume_text = await cls.resume_text(file_bytes, content_type)
+
+        return await cls.review_text(resume_text, job_title, job_description)
+
+    @classmethod
+    async def review_text(
+        cls, resume_text: str, job_title: str, job_description: str, prompt: Optional[str] = None
+    ) -> dict:
+        # prompt can be passed in when many resumes are reviewed against the same job
+        key = cls.cache_key(resume_text, job_title, job_description)
+        cached = await get_cached_review(key)
+        if cached is not None:
+            logger.info("Review cache hit: %s", key[:12])
+            return cached
+
+        # Identical reviews already running (double clicks, client retries) share one LLM call
+        return await singleflight.do(
+            key,
+            lambda: cls._generate_review(key, resume_text, job_title, job_description, prompt),
+            lambda: get_cached_review(key, count=False),
+        )
+
+    @classmethod
+    async def _generate_review(
+        cls, key: str, resume_text: str, job_title: str, job_description: str, prompt: Optional[str]
+    ) -> dict:
+        # Another process may have finished this review while we waited for the lock
+        cached = await get_cached_review(key, count=False)
+        if cached is not None:
+            return cached
+
+        prompt = prompt or cls.generate_prompt(job_title, job_description)
+        prompt = cls.ground_prompt(prompt, resume_text, job_description)
+        resume_text, stats = cls.fit_to_budget(prompt, resume_text, job_description)
+        logger.info("Prompt tokens: %d (saved %d of %d)", stats.prompt_tokens, stats.tokens_saved, stats.raw_tokens)
+        await charge_quota(stats.prompt_tokens)
+        llm_response = await cls.call_gemini(prompt, resume_text)
         logger.info("Received LLM response (first 200 chars): %s", llm_response[:200].replace('\n', ' '))
 
-        feedback = cls.parse_llm_response(llm_response)
+        feedback = await cls.parse_feedback(llm_response, prompt, resume_text)
+        await set_cached_review(key, feedback)
         return feedback
+
+    @classmethod
+    async def review_resume_stream(
+        cls,
+        file_bytes: bytes,
+        content_type: str,
+        job_title: str,
+        job_description: str,
+        stream_fn: Optional[Callable[[str, str], AsyncIterator[str]]] = None,
+    ) -> AsyncIterator[tuple]:
+        # Yields ("extracted", {...}), ("section", {...}) per top-level Feedback member
+        # and finally ("feedback", dict). stream_fn lets tests plug in a fake LLM.
+        resume_text = await cls.resume_text(file_bytes, content_type)
+        yield "extracted", {"characters": len(resume_text)}
+
+        key = cls.cache_key(resume_text, job_title, job_description)
+        cached = await get_cached_review(key)
+        if cached is not None:
+            logger.info("Review cache hit: %s", key[:12])
+            for name, value in cached.items():
+                yield "section", {"name": name, "value": value}
+            yield "feedback", cached
+            return
+
+        prompt = cls.generate_prompt(job_title, job_description)
+        prompt = cls.ground_prompt(prompt, resume_text, job_description)
+        resume_text, stats = cls.fit_to_budget(prompt, resume_text, job_description)
+        logger.info("Prompt tokens: %d (saved %d of %d)", stats.prompt_tokens, stats.tokens_saved, stats.raw_tokens)
+        await charge_quota(stats.prompt_tokens)
+        parser = IncrementalJSONParser()
+        async for chunk in (stream_fn or cls.stream_gemini)(prompt, resume_text):
+            for name, value in parser.feed(chunk).items():
+                yield "section", {"name": name, "value": value}
+
+        feedback = await cls.parse_feedback(parser.buffer, prompt, resume_text)
+        await set_cached_review(key, feedback)
+        yield "feedback", feedback
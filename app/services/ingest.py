@@ -0,0 +1,96 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import UploadFile
+from app.services.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+# Linearized PDFs declare their page count up front: << /Linearized 1 ... /N 3 ... >>
+_LINEARIZED_PAGES_RE = re.compile(rb"/Linearized\s.{0,200}?/N\s+(\d+)", re.DOTALL)
+_ENCRYPT_RE = re.compile(rb"/Encrypt\s")
+
+
+class UploadRejected(ValueError):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class IngestedUpload:
+    # One immutable buffer shared by the extractor, the hash and the Cloudinary upload
+    data: bytes
+    content_type: str
+    filename: str
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def _sniff(head: bytes) -> str:
+    # Trust the bytes, not the client's content_type
+    if PDF_MAGIC in head[:1024]:
+        return "application/pdf"
+    if b"\x00" in head:
+        raise UploadRejected(415, "Unsupported file type; upload a PDF or plain-text resume")
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the chunk is fine
+        if e.start < len(head) - 3:
+            raise UploadRejected(415, "Unsupported file type; upload a PDF or plain-text resume")
+    return "text/plain"
+
+
+def _inspect_pdf(head: bytes, tail: bytes) -> Optional[int]:
+    # The encryption dictionary is referenced from the trailer, which sits at the end of the
+    # file (or at the start for linearized files), so this never parses the page tree
+    if _ENCRYPT_RE.search(tail) or _ENCRYPT_RE.search(head):
+        raise UploadRejected(422, "Encrypted or password-protected PDFs are not supported")
+
+    match = _LINEARIZED_PAGES_RE.search(head)
+    if match:
+        pages = int(match.group(1))
+        if pages > settings.PDF_MAX_PAGES:
+            raise UploadRejected(413, f"PDF has {pages} pages; the limit is {settings.PDF_MAX_PAGES}")
+        return pages
+    return None
+
+
+async def ingest_upload(upload: UploadFile) -> IngestedUpload:
+    max_bytes = settings.PDF_MAX_BYTES
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadRejected(413, f"File is {upload.size} bytes; the limit is {max_bytes}")
+
+    chunks, size, content_type = [], 0, None
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadRejected(413, f"File exceeds the {max_bytes} byte limit")
+        if content_type is None:
+            content_type = _sniff(chunk)
+            if content_type == "application/pdf":
+                # Linearization and trailer-at-start data live in the first chunk
+                _inspect_pdf(chunk, b"")
+        chunks.append(chunk)
+
+    if not chunks:
+        raise UploadRejected(400, "Uploaded file is empty")
+
+    # Joining once leaves a single buffer; the chunk list is dropped right after
+    data = b"".join(chunks)
+    del chunks
+    if content_type == "application/pdf":
+        _inspect_pdf(data[:CHUNK_SIZE], data[-4096:])
+
+    logger.info(f"Ingested {upload.filename}: {size} bytes as {content_type}")
+    return IngestedUpload(data=data, content_type=content_type, filename=upload.filename or "resume")
@@ -0,0 +1,219 @@
+import asyncio
+import base64
+import logging
+import random
+import time
+import uuid
+from typing import Optional
+from app.services.cache import async_redis_client
+from app.services.config import settings
+from app.services.extraction import PdfLimitError
+from app.services.pipeline import analyze, ReviewError
+from app.services.rate_limit import quota_owner, QuotaExceededError
+
+logger = logging.getLogger("uvicorn.error")
+
+JOB_QUEUE = "jobs:analyze"
+JOB_PROCESSING = "jobs:analyze:processing"
+JOB_DELAYED = "jobs:analyze:delayed"
+JOB_TTL = 60 * 60 * 24
+JOB_IDLE_MIN_DELAY = 0.05
+JOB_IDLE_MAX_DELAY = 1.0
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+# ---------- Producer ----------
+async def enqueue_analysis(
+    clerk_id: str,
+    job_title: str,
+    job_description: str,
+    resume_bytes: bytes,
+    content_type: str,
+    filename: str,
+    redis=None,
+) -> str:
+    redis = redis or async_redis_client
+    job_id = str(uuid.uuid4())
+    now = time.time()
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_job_key(job_id), mapping={
+            "status": JobStatus.QUEUED,
+            "clerk_id": clerk_id,
+            "job_title": job_title,
+            "job_description": job_description,
+            "content_type": content_type or "",
+            "filename": filename or "resume",
+            # The shared client decodes responses, so the upload is kept as base64 text
+            "file": base64.b64encode(resume_bytes).decode("ascii"),
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        })
+        pipe.expire(_job_key(job_id), JOB_TTL)
+        pipe.rpush(JOB_QUEUE, job_id)
+        await pipe.execute()
+
+    logger.info(f"Queued analysis job {job_id}")
+    return job_id
+
+
+async def get_job(job_id: str, redis=None) -> Optional[dict]:
+    redis = redis or async_redis_client
+    fields = ["status", "attempts", "error", "resume_id", "created_at", "updated_at"]
+    values = await redis.hmget(_job_key(job_id), fields)
+    job = dict(zip(fields, values))
+    if not job["status"]:
+        return None
+
+    return {
+        "id": job_id,
+        "status": job["status"],
+        "attempts": int(job["attempts"] or 0),
+        "error": job["error"],
+        "resume_id": job["resume_id"],
+        "feedback_url": f"/api/resume/resume-feedback/{job['resume_id']}" if job["resume_id"] else None,
+        "created_at": float(job["created_at"]) if job["created_at"] else None,
+        "updated_at": float(job["updated_at"]) if job["updated_at"] else None,
+    }
+
+
+# ---------- Worker ----------
+def _backoff(attempt: int) -> float:
+    delay = settings.JOB_RETRY_BASE_DELAY * (2 ** (attempt - 1))
+    return min(delay, settings.JOB_RETRY_MAX_DELAY) * random.uniform(0.5, 1.0)
+
+
+async def _promote_delayed(redis) -> None:
+    due = await redis.zrangebyscore(JOB_DELAYED, 0, time.time())
+    for job_id in due:
+        # ZREM decides which worker owns the retry
+        if await redis.zrem(JOB_DELAYED, job_id):
+            await redis.rpush(JOB_QUEUE, job_id)
+
+
+async def _requeue_stale(redis) -> None:
+    # Jobs left in the processing list by a crashed worker are put back on the queue
+    cutoff = time.time() - settings.JOB_STALE_SECONDS
+    for job_id in await redis.lrange(JOB_PROCESSING, 0, -1):
+        started_at = await redis.hget(_job_key(job_id), "updated_at")
+        if started_at is None or float(started_at) < cutoff:
+            if await redis.lrem(JOB_PROCESSING, 1, job_id):
+                await redis.hset(_job_key(job_id), mapping={"status": JobStatus.QUEUED, "updated_at": time.time()})
+                await redis.rpush(JOB_QUEUE, job_id)
+                logger.warning(f"Requeued stale analysis job {job_id}")
+
+
+async def process_job(job_id: str, redis=None, analyze_fn=analyze) -> None:
+    redis = redis or async_redis_client
+    key = _job_key(job_id)
+    job = await redis.hgetall(key)
+    if not job or "file" not in job:
+        logger.warning(f"Dropping unknown analysis job {job_id}")
+        return
+
+    quota_owner.set(job["clerk_id"])
+    attempts = int(job.get("attempts", 0)) + 1
+    await redis.hset(key, mapping={"status": JobStatus.RUNNING, "attempts": attempts, "updated_at": time.time()})
+
+    try:
+        # The job id doubles as the resume id, so results land on resume:{job_id}
+        result = await analyze_fn(
+            job["clerk_id"],
+            job["job_title"],
+            job["job_description"],
+            base64.b64decode(job["file"]),
+            job["content_type"],
+            job["filename"],
+            resume_id=job_id,
+        )
+    except ReviewError as e:
+        # Quota and PDF limits won't change on a retry
+        if attempts < settings.JOB_MAX_ATTEMPTS and not isinstance(e.__cause__, (QuotaExceededError, PdfLimitError)):
+            delay = _backoff(attempts)
+            logger.warning(f"Analysis job {job_id} failed (attempt {attempts}), retrying in {delay:.1f}s: {e}")
+            await redis.hset(key, mapping={"status": JobStatus.QUEUED, "error": str(e), "updated_at": time.time()})
+            await redis.zadd(JOB_DELAYED, {job_id: time.time() + delay})
+            return
+        await _fail(redis, job_id, e)
+        return
+    except Exception as e:
+        await _fail(redis, job_id, e)
+        return
+
+    await redis.hset(key, mapping={
+        "status": JobStatus.DONE,
+        "resume_id": result["id"],
+        "error": "",
+        "updated_at": time.time(),
+    })
+    await redis.hdel(key, "file")
+    logger.info(f"Analysis job {job_id} done")
+
+
+async def _fail(redis, job_id: str, error: Exception) -> None:
+    logger.error(f"Analysis job {job_id} failed: {repr(error)}")
+    key = _job_key(job_id)
+    await redis.hset(key, mapping={"status": JobStatus.FAILED, "error": str(error), "updated_at": time.time()})
+    await redis.hdel(key, "file")
+
+
+async def _idle(stop: asyncio.Event, seconds: float) -> None:
+    # Sleeps unless stop is set first, so shutdown isn't held up by an idle worker
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _worker_loop(worker_id: int, redis, stop: asyncio.Event, analyze_fn) -> None:
+    idle_polls = 0
+    while not stop.is_set():
+        await _promote_delayed(redis)
+        job_id = await redis.blmove(JOB_QUEUE, JOB_PROCESSING, settings.JOB_POLL_TIMEOUT, "LEFT", "RIGHT")
+        if not job_id:
+            # BLMOVE can return at once (a server without blocking support, or a timeout
+            # of 0); back off so an empty queue never spins the event loop
+            await _idle(stop, min(JOB_IDLE_MIN_DELAY * (2 ** idle_polls), JOB_IDLE_MAX_DELAY))
+            idle_polls = min(idle_polls + 1, 10)
+            continue
+        idle_polls = 0
+        try:
+            await process_job(job_id, redis=redis, analyze_fn=analyze_fn)
+        except Exception:
+            logger.exception(f"Worker {worker_id} crashed on job {job_id}")
+        finally:
+            await redis.lrem(JOB_PROCESSING, 1, job_id)
+
+
+async def _requeue_loop(redis, stop: asyncio.Event) -> None:
+    # Runs for the worker's lifetime, so jobs of a worker that died after this one
+    # started are recovered too, not only those found at startup
+    while not stop.is_set():
+        try:
+            await _requeue_stale(redis)
+        except Exception:
+            logger.exception("Requeueing stale analysis jobs failed")
+        await _idle(stop, settings.JOB_REQUEUE_INTERVAL)
+
+
+async def run_worker(concurrency: Optional[int] = None, redis=None, stop: Optional[asyncio.Event] = None, analyze_fn=analyze) -> None:
+    redis = redis or async_redis_client
+    stop = stop or asyncio.Event()
+    concurrency = concurrency or settings.JOB_WORKERS
+
+    logger.info(f"Analysis worker started with {concurrency} slots")
+    await asyncio.gather(
+        _requeue_loop(redis, stop),
+        *(_worker_loop(i, redis, stop, analyze_fn) for i in range(concurrency)),
+    )
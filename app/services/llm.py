@@ -0,0 +1,394 @@
+import asyncio
+import bisect
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from app.services.config import settings
+from app.services.executors import run_io
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# google.generativeai pulls in grpc and protobuf; import it with the first client, not the app
+@lru_cache(maxsize=1)
+def retryable_errors() -> tuple:
+    from google.api_core import exceptions as google_exceptions
+
+    return (
+        asyncio.TimeoutError,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.TooManyRequests,
+    )
+
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+
+
+class LLMUnavailableError(RuntimeError):
+    pass
+
+
+# ---------- Circuit breaker ----------
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            # Let a single probe through; everyone else keeps failing fast
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        # A probe that ended without an answer (cancelled, stream abandoned) frees the
+        # slot without counting as a success or a failure, so the next caller probes
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            logger.warning(f"LLM circuit breaker open after {self.failures} consecutive failures")
+
+
+# ---------- Prompt prefix cache ----------
+class GeminiContextCache:
+    # Thin wrapper over genai.caching so PrefixCache can be exercised with a fake backend
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def create(self, prefix: str, ttl: float):
+        import datetime
+        import google.generativeai as genai
+
+        return genai.caching.CachedContent.create(
+            model=f"models/{self.model_name}",
+            system_instruction=prefix,
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+
+    def refresh(self, handle, ttl: float) -> None:
+        import datetime
+
+        handle.update(ttl=datetime.timedelta(seconds=ttl))
+
+    def model(self, handle):
+        import google.generativeai as genai
+
+        return genai.GenerativeModel.from_cached_content(cached_content=handle)
+
+    def tokens(self, handle) -> int:
+        usage = getattr(handle, "usage_metadata", None)
+        return getattr(usage, "total_token_count", 0) or 0
+
+
+class PrefixCache:
+    # Registers the static instruction block once and extends its TTL shortly before it
+    # expires. Any failure (model without caching support, prefix below the provider's
+    # minimum size, quota) disables it for retry_after seconds and callers go inline.
+
+    def __init__(self, backend, ttl: float, refresh_margin: float, retry_after: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._lock = asyncio.Lock()
+        self._prefix = None
+        self._handle = None
+        self._model = None
+        self._expires_at = 0.0
+        self._disabled_until = 0.0
+        self.tokens = 0
+        self.created = 0
+        self.refreshed = 0
+        self.errors = 0
+
+    def _fresh(self, prefix: str) -> bool:
+        return self._model is not None and self._prefix == prefix \
+            and time.monotonic() < self._expires_at - self.refresh_margin
+
+    async def model_for(self, prefix: str):
+        if self._fresh(prefix):
+            return self._model
+        if time.monotonic() < self._disabled_until:
+            return None
+
+        async with self._lock:
+            if self._fresh(prefix):
+                return self._model
+            try:
+                # The genai caching calls are blocking, keep them off the event loop
+                if self._handle is not None and self._prefix == prefix and time.monotonic() < self._expires_at:
+                    await asyncio.to_thread(self.backend.refresh, self._handle, self.ttl)
+                    self.refreshed += 1
+                else:
+                    self._handle = await asyncio.to_thread(self.backend.create, prefix, self.ttl)
+                    self._prefix = prefix
+                    self._model = self.backend.model(self._handle)
+                    self.tokens = self.backend.tokens(self._handle)
+                    self.created += 1
+                    logger.info(f"Registered cached prompt prefix ({self.tokens} tokens)")
+                self._expires_at = time.monotonic() + self.ttl
+            except Exception as e:
+                self.errors += 1
+                self._handle = self._model = None
+                self._disabled_until = time.monotonic() + self.retry_after
+                logger.warning(f"Prompt prefix caching unavailable, sending prompts inline: {repr(e)}")
+                return None
+        return self._model
+
+    def invalidate(self) -> None:
+        # The provider may drop a cache early; recreate it on the next request
+        self._model = None
+        self._expires_at = 0.0
+
+    def metrics(self) -> dict:
+        return {
+            "active": self._model is not None and time.monotonic() < self._expires_at,
+            "tokens": self.tokens,
+            "created": self.created,
+            "refreshed": self.refreshed,
+            "errors": self.errors,
+        }
+
+
+# ---------- Client ----------
+class ThreadedModel:
+    # google-generativeai's async client can't run over the REST transport (it awaits a
+    # plain response), so with a custom endpoint the sync client runs on the I/O pool
+    def __init__(self, model):
+        self.model = model
+
+    async def generate_content_async(self, contents, stream: bool = False, **kwargs):
+        response = await run_io(self.model.generate_content, contents, stream=stream, **kwargs)
+        return self._iterate(response) if stream else response
+
+    @staticmethod
+    async def _iterate(response):
+        chunks, done = iter(response), object()
+        while (chunk := await run_io(next, chunks, done)) is not done:
+            yield chunk
+
+
+class LLMClient:
+    def __init__(
+        self,
+        model_name: str,
+        api_key: str,
+        timeout: float,
+        max_concurrency: int,
+        max_retries: int,
+        breaker: CircuitBreaker,
+        api_endpoint: Optional[str] = None,
+        prefix_cache: Optional[PrefixCache] = None,
+    ):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = breaker
+        self.prefix_cache = prefix_cache
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Configured once per process so the underlying channel and its connections are reused
+        import google.generativeai as genai
+
+        client_options = {"api_endpoint": api_endpoint} if api_endpoint else None
+        genai.configure(
+            api_key=api_key,
+            client_options=client_options,
+            transport="rest" if api_endpoint else None,
+        )
+        self.model = genai.GenerativeModel(model_name)
+        if api_endpoint:
+            self.model = ThreadedModel(self.model)
+
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def _observe(self, seconds: float) -> None:
+        self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+
+    def _check_breaker(self) -> bool:
+        # Returns True when this call is the half-open probe and so must hand the slot back
+        probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise LLMUnavailableError("LLM service is temporarily unavailable, please retry shortly.")
+        return probe
+
+    async def _resolve(self, contents, prefix: Optional[str]):
+        # Prefer the cached-prefix model; otherwise send the prefix inline with the request
+        if prefix is None:
+            return self.model, contents
+        if self.prefix_cache is not None:
+            model = await self.prefix_cache.model_for(prefix)
+            if model is not None:
+                return model, contents
+        return self.model, f"{prefix}\n\n{contents}"
+
+    def _backoff(self, attempt: int) -> float:
+        return min(settings.LLM_RETRY_BASE_DELAY * (2 ** attempt), settings.LLM_RETRY_MAX_DELAY) * random.uniform(0.5, 1.0)
+
+    async def generate(self, contents, prefix: Optional[str] = None, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            probe = self._check_breaker()
+            try:
+                model, request_contents = await self._resolve(contents, prefix)
+                async with self._semaphore:
+                    self.in_flight += 1
+                    self.calls += 1
+                    start = time.perf_counter()
+                    try:
+                        response = await asyncio.wait_for(
+                            model.generate_content_async(
+                                contents=request_contents, request_options={"timeout": self.timeout}, **kwargs
+                            ),
+                            timeout=self.timeout,
+                        )
+                    except retryable_errors() as e:
+                        self.failures += 1
+                        self.breaker.record_failure()
+                        if attempt == self.max_retries:
+                            raise
+                        self.retries += 1
+                        logger.warning(f"Retryable LLM error (attempt {attempt + 1}): {repr(e)}")
+                    except Exception:
+                        self.failures += 1
+                        self.breaker.record_failure()
+                        if model is not self.model:
+                            self.prefix_cache.invalidate()
+                        raise
+                    else:
+                        self.breaker.record_success()
+                        return response
+                    finally:
+                        self.in_flight -= 1
+                        self._observe(time.perf_counter() - start)
+            except BaseException:
+                # Cancelled while resolving, queued on the semaphore or mid-call
+                if probe:
+                    self.breaker.release_trial()
+                raise
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def stream(self, contents, prefix: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        # Streams can't be replayed once chunks have been handed out, so there is no retry here
+        probe = self._check_breaker()
+        try:
+            model, contents = await self._resolve(contents, prefix)
+            async with self._semaphore:
+                self.in_flight += 1
+                self.calls += 1
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        model.generate_content_async(
+                            contents=contents, stream=True, request_options={"timeout": self.timeout}, **kwargs
+                        ),
+                        timeout=self.timeout,
+                    )
+                    async for chunk in response:
+                        if chunk.text:
+                            yield chunk.text
+                except Exception:
+                    self.failures += 1
+                    self.breaker.record_failure()
+                    raise
+                else:
+                    self.breaker.record_success()
+                finally:
+                    self.in_flight -= 1
+                    self._observe(time.perf_counter() - start)
+        except BaseException:
+            # Cancelled, or the consumer closed the generator (GeneratorExit) mid-stream
+            if probe:
+                self.breaker.release_trial()
+            raise
+
+    def metrics(self) -> dict:
+        buckets, cumulative = {}, 0
+        for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], self.latency_counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "model": self.model_name,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "breaker_state": self.breaker.state,
+            "prefix_cache": self.prefix_cache.metrics() if self.prefix_cache else None,
+            "latency_seconds": {"buckets": buckets, "sum": round(self.latency_sum, 3), "count": cumulative},
+        }
+
+
+def llm_deadline() -> float:
+    # Longest a generate() call can take: every attempt timing out plus the largest backoffs
+    retries = settings.LLM_MAX_RETRIES
+    backoff = sum(min(settings.LLM_RETRY_BASE_DELAY * (2 ** attempt), settings.LLM_RETRY_MAX_DELAY) for attempt in range(retries))
+    return settings.LLM_TIMEOUT * (retries + 1) + backoff
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client(model_name: str) -> LLMClient:
+    global _client
+    if _client is None:
+        if not settings.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not set in environment variables.")
+        _client = LLMClient(
+            model_name=model_name,
+            api_key=settings.GEMINI_API_KEY,
+            timeout=settings.LLM_TIMEOUT,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_retries=settings.LLM_MAX_RETRIES,
+            breaker=CircuitBreaker(settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_RESET),
+            api_endpoint=settings.GEMINI_API_ENDPOINT,
+            prefix_cache=PrefixCache(
+                GeminiContextCache(model_name),
+                ttl=settings.LLM_PREFIX_CACHE_TTL,
+                refresh_margin=settings.LLM_PREFIX_CACHE_REFRESH,
+                retry_after=settings.LLM_PREFIX_CACHE_RETRY,
+            ) if settings.LLM_PREFIX_CACHE else None,
+        )
+    return _client
+
+
+def llm_metrics() -> dict:
+    return _client.metrics() if _client else {"breaker_state": CircuitBreaker.CLOSED, "calls": 0}
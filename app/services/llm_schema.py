@@ -0,0 +1,67 @@
+import copy
+from typing import Optional, Type
+from pydantic import BaseModel
+from app.models.user import Feedback
+
+# Gemini's response_schema is an OpenAPI subset: no $ref, no anyOf, no titles/defaults,
+# uppercase type names and explicit properties on every object.
+_TYPES = {
+    "object": "OBJECT",
+    "array": "ARRAY",
+    "string": "STRING",
+    "number": "NUMBER",
+    "integer": "INTEGER",
+    "boolean": "BOOLEAN",
+}
+
+# Feedback.recommendation is a free-form dict in the model; this is the shape the prompt asks for
+RECOMMENDATION_SCHEMA = {
+    "type": "OBJECT",
+    "nullable": True,
+    "properties": {
+        "roles": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "responsibilities": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+}
+
+# Free-form dict fields have no properties to derive, so their shape is given by field name
+FIELD_SCHEMAS = {"recommendation": RECOMMENDATION_SCHEMA}
+
+
+def _convert(node: dict, defs: dict, name: Optional[str] = None) -> dict:
+    if name in FIELD_SCHEMAS:
+        return copy.deepcopy(FIELD_SCHEMAS[name])
+
+    if "$ref" in node:
+        return _convert(defs[node["$ref"].split("/")[-1]], defs, name)
+
+    if "anyOf" in node:
+        options = [option for option in node["anyOf"] if option.get("type") != "null"]
+        converted = _convert(options[0], defs, name)
+        if len(options) < len(node["anyOf"]):
+            converted["nullable"] = True
+        return converted
+
+    schema = {"type": _TYPES[node["type"]]}
+    if node["type"] == "object":
+        properties = node.get("properties")
+        if not properties:
+            # Gemini rejects objects without properties; fail at import, not on the first call
+            raise ValueError(f"Field {name!r} is a free-form object; add its shape to FIELD_SCHEMAS")
+        schema["properties"] = {field: _convert(prop, defs, field) for field, prop in properties.items()}
+        schema["required"] = list(node.get("required", []))
+    elif node["type"] == "array":
+        schema["items"] = _convert(node["items"], defs, name)
+    return schema
+
+
+def gemini_schema(model: Type[BaseModel]) -> dict:
+    json_schema = model.model_json_schema()
+    return _convert(json_schema, json_schema.get("$defs", {}))
+
+
+FEEDBACK_SCHEMA = gemini_schema(Feedback)
+
+
+def section_schema(section: str) -> dict:
+    return FEEDBACK_SCHEMA["properties"][section]
@@ -0,0 +1,163 @@
+import bisect
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable, Optional
+from app.services.config import settings
+
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer("ai-resume-reviewer")
+except ImportError:
+    _tracer = None
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+# ---------- Minimal Prometheus-compatible registry ----------
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        self._values = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            counts, total = self._values.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[labels] = (counts, total + value)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += count
+                bucket_labels = _labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    # Read on scrape from a callback, so components keep their own counters
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        self.name, self.help, self.callback = name, help, callback
+
+    def render(self) -> list:
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+_registry = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# ---------- Application metrics ----------
+STAGE_SECONDS = register(Histogram(
+    "resume_stage_duration_seconds", "Duration of each analyze pipeline stage", ("stage",)
+))
+STAGE_ERRORS = register(Counter(
+    "resume_stage_errors_total", "Errors raised by each analyze pipeline stage", ("stage",)
+))
+LLM_TOKENS = register(Counter(
+    "llm_tokens_total", "LLM tokens by direction", ("direction",)
+))
+LLM_SECONDS = register(Histogram(
+    "llm_request_duration_seconds", "LLM request latency by how the prompt prefix was sent", ("prefix",)
+))
+CACHE_REQUESTS = register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+))
+HTTP_REQUESTS = register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+))
+
+
+# ---------- Stages ----------
+@contextmanager
+def _span(name: str):
+    if _tracer is None or not settings.TRACING_ENABLED:
+        yield
+        return
+    with _tracer.start_as_current_span(name) as span:
+        span.set_attribute("request.id", request_id_var.get())
+        yield
+
+
+@asynccontextmanager
+async def stage(name: str):
+    start = time.perf_counter()
+    with _span(name):
+        try:
+            yield
+        except BaseException:
+            STAGE_ERRORS.inc(name)
+            raise
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - start, name)
+
+
+# ---------- Request ids ----------
+class RequestIdFilter(logging.Filter):
+    # Prefix log lines with the current request id so one request's lines can be grepped together
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        record.request_id = request_id
+        if request_id != "-" and not getattr(record, "_request_id_tagged", False):
+            record.msg = f"[{request_id}] {record.msg}"
+            record._request_id_tagged = True
+        return True
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    request_id = incoming if incoming and len(incoming) <= 64 else uuid.uuid4().hex[:16]
+    request_id_var.set(request_id)
+    return request_id
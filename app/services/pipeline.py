@@ -0,0 +1,420 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from app.models.user import User, Feedback
+from app.models.review import ResumeReview
+from app.services import serializer
+from app.services.cache import async_redis_bytes_client, job_description_key, user_resumes_key
+from app.services.config import settings
+from app.services.executors import analyze_slot, run_cpu
+from app.services.metrics import stage
+from app.services.generator import ResumeReviewGenerator
+from app.services.scoring import score_pairs
+from app.services.search_index import index_document, RESUMES, JOBS
+from app.services.storage import upload_resume, delete_resume
+from app.utils.db import get_collection
+
+logger = logging.getLogger("uvicorn.error")
+
+RESUME_TTL = 60 * 60 * 24
+
+
+class ReviewError(Exception):
+    pass
+
+
+class UploadError(Exception):
+    pass
+
+
+async def _timed(name: str, coro, timings: dict):
+    start = time.perf_counter()
+    try:
+        async with stage(name):
+            return await coro
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000)
+        logger.info(f"Stage {name} finished in {timings[name]} ms")
+
+
+async def _review(resume_bytes: bytes, content_type: str, job_title: str, job_description: str) -> Feedback:
+    async with analyze_slot():
+        feedback_data = await ResumeReviewGenerator.review_resume(
+            file_bytes=resume_bytes,
+            content_type=content_type,
+            job_title=job_title,
+            job_description=job_description,
+        )
+    return Feedback(**feedback_data)
+
+
+# Keep references to fire-and-forget cleanups so they aren't garbage collected mid-flight
+_background_tasks = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _discard_upload(upload_task: asyncio.Task):
+    # The blocking upload can't be interrupted once it is running, so wait for it
+    # and remove the asset instead of leaving it orphaned.
+    try:
+        upload_result = await upload_task
+    except BaseException:
+        return
+    await delete_resume(upload_result)
+
+
+async def review_and_upload(
+    resume_bytes: bytes, content_type: str, filename: str, job_title: str, job_description: str
+) -> tuple[Feedback, dict]:
+    timings = {}
+    start = time.perf_counter()
+    review_task = asyncio.create_task(
+        _timed("review", _review(resume_bytes, content_type, job_title, job_description), timings)
+    )
+    upload_task = asyncio.create_task(_timed("upload", upload_resume(resume_bytes, filename), timings))
+
+    try:
+        await asyncio.wait({review_task, upload_task}, return_when=asyncio.FIRST_EXCEPTION)
+
+        if review_task.done() and review_task.exception():
+            logger.error("Resume review failed", exc_info=review_task.exception())
+            _spawn(_discard_upload(upload_task))
+            raise ReviewError(review_task.exception()) from review_task.exception()
+
+        if upload_task.done() and upload_task.exception():
+            logger.error("Cloudinary upload failed", exc_info=upload_task.exception())
+            review_task.cancel()
+            raise UploadError(upload_task.exception()) from upload_task.exception()
+    except asyncio.CancelledError:
+        # Client went away: stop the review and clean up whatever got uploaded
+        review_task.cancel()
+        _spawn(_discard_upload(upload_task))
+        raise
+
+    wall = round((time.perf_counter() - start) * 1000)
+    logger.info(
+        f"Review and upload finished in {wall} ms "
+        f"(review {timings.get('review')} ms, upload {timings.get('upload')} ms, "
+        f"saved {timings.get('review', 0) + timings.get('upload', 0) - wall} ms)"
+    )
+    return review_task.result(), upload_task.result()
+
+
+async def save_review(
+    resume_id: str,
+    clerk_id: str,
+    job_title: str,
+    job_description: str,
+    resume_url: str,
+    feedback_obj: Feedback,
+) -> str:
+    image_url = resume_url.replace("/upload/", "/upload/pg_1,f_png/")
+
+    # Cache in Redis
+    jd_hash, jd_key = job_description_key(job_description)
+    cache_data = {
+        "clerk_id": clerk_id,
+        "job_title": job_title,
+        "job_description_hash": jd_hash,
+        "resume_url": resume_url,
+        "image_url": image_url,
+        "feedback": feedback_obj.dict(),
+    }
+    now = time.time()
+    index_key = user_resumes_key(clerk_id)
+    async with stage("redis_write"), async_redis_bytes_client.pipeline(transaction=False) as pipe:
+        pipe.setex(f"resume:{resume_id}", RESUME_TTL, serializer.dumps(cache_data))
+        pipe.setex(jd_key, RESUME_TTL, serializer.dumps({"text": job_description}))
+        pipe.zadd(index_key, {resume_id: now})
+        pipe.zremrangebyscore(index_key, "-inf", now - RESUME_TTL)
+        pipe.expire(index_key, RESUME_TTL)
+        await pipe.execute()
+
+    created_at = datetime.utcnow()
+    async with stage("mongo_write"):
+        await _save_to_mongo(
+            resume_id, clerk_id, job_title, job_description, resume_url, image_url, feedback_obj, created_at
+        )
+
+    return image_url
+
+
+async def _save_to_mongo(
+    resume_id: str,
+    clerk_id: str,
+    job_title: str,
+    job_description: str,
+    resume_url: str,
+    image_url: str,
+    feedback_obj: Feedback,
+    created_at: datetime,
+) -> None:
+    # Append to the review history, then keep the latest review on the user in one upsert
+    await ResumeReview(
+        resume_id=resume_id,
+        clerk_id=clerk_id,
+        resume_url=resume_url,
+        image_url=image_url,
+        job_title=job_title,
+        job_description=job_description,
+        feedback=feedback_obj,
+        created_at=created_at,
+    ).insert()
+
+    await get_collection(User.Settings.name).update_one(
+        {"clerk_id": clerk_id},
+        {
+            "$set": {
+                "resume_url": resume_url,
+                "image_url": image_url,
+                "job_title": job_title,
+                "job_description": job_description,
+                "feedback": feedback_obj.dict(),
+                "updated_at": created_at,
+            },
+            "$setOnInsert": {"created_at": created_at, "roles": []},
+        },
+        upsert=True,
+    )
+
+
+async def _index_review(resume_id: str, resume_bytes: bytes, content_type: str, job_description: str) -> None:
+    # Feeds recruiter search off the response path; the page cache makes re-extraction cheap
+    try:
+        resume_text = await ResumeReviewGenerator.resume_text(resume_bytes, content_type)
+        async with stage("index"):
+            await run_cpu(index_document, RESUMES, resume_id, resume_text)
+            await run_cpu(index_document, JOBS, job_description_key(job_description)[0], job_description)
+    except Exception as e:
+        logger.warning(f"Indexing resume {resume_id} failed: {repr(e)}")
+
+
+def index_review(resume_id: str, resume_bytes: bytes, content_type: str, job_description: str) -> None:
+    if settings.SEARCH_INDEX_ENABLED:
+        _spawn(_index_review(resume_id, resume_bytes, content_type, job_description))
+
+
+# Full analyze pipeline shared by the HTTP endpoint and the queue worker
+async def analyze(
+    clerk_id: str,
+    job_title: str,
+    job_description: str,
+    resume_bytes: bytes,
+    content_type: str,
+    filename: str,
+    resume_id: Optional[str] = None,
+) -> dict:
+    feedback_obj, resume_result = await review_and_upload(
+        resume_bytes, content_type, filename, job_title, job_description
+    )
+    resume_url = resume_result["secure_url"]
+    resume_id = resume_id or str(uuid.uuid4())
+
+    image_url = await save_review(resume_id, clerk_id, job_title, job_description, resume_url, feedback_obj)
+    index_review(resume_id, resume_bytes, content_type, job_description)
+    return {
+        "id": resume_id,
+        "resume_url": resume_url,
+        "image_url": image_url,
+    }
+
+
+# Streaming variant of analyze: yields (event, data) pairs as stages complete
+async def analyze_stream(
+    clerk_id: str,
+    job_title: str,
+    job_description: str,
+    resume_bytes: bytes,
+    content_type: str,
+    filename: str,
+    stream_fn=None,
+) -> AsyncIterator[tuple]:
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_review() -> dict:
+        feedback = None
+        async with analyze_slot():
+            async for event, data in ResumeReviewGenerator.review_resume_stream(
+                resume_bytes, content_type, job_title, job_description, stream_fn=stream_fn
+            ):
+                if event == "feedback":
+                    feedback = data
+                else:
+                    await queue.put((event, data))
+        return feedback
+
+    review_task = asyncio.create_task(run_review())
+    upload_task = asyncio.create_task(upload_resume(resume_bytes, filename))
+    for task in (review_task, upload_task):
+        task.add_done_callback(lambda t: queue.put_nowait(("_done", t)))
+
+    pending = {review_task, upload_task}
+    completed = False
+    try:
+        while pending:
+            event, data = await queue.get()
+            if event != "_done":
+                yield event, data
+                continue
+
+            pending.discard(data)
+            if data.cancelled():
+                continue
+            if data is review_task and data.exception():
+                logger.error("Streaming review failed", exc_info=data.exception())
+                raise ReviewError(data.exception()) from data.exception()
+            if data is upload_task:
+                if data.exception():
+                    logger.error("Cloudinary upload failed", exc_info=data.exception())
+                    raise UploadError(data.exception()) from data.exception()
+                yield "upload", {"resume_url": data.result()["secure_url"]}
+        completed = True
+    finally:
+        # On failure or client disconnect, stop the review and remove any uploaded asset
+        if not completed:
+            review_task.cancel()
+            _spawn(_discard_upload(upload_task))
+
+    feedback_obj = Feedback(**review_task.result())
+    resume_url = upload_task.result()["secure_url"]
+    resume_id = str(uuid.uuid4())
+    image_url = await save_review(resume_id, clerk_id, job_title, job_description, resume_url, feedback_obj)
+    index_review(resume_id, resume_bytes, content_type, job_description)
+
+    yield "complete", {
+        "id": resume_id,
+        "resume_url": resume_url,
+        "image_url": image_url,
+        "feedback": feedback_obj.dict(),
+    }
+
+
+# ---------- Batch analysis ----------
+def _rank(results: list) -> list:
+    scored = [r for r in results if r.get("feedback")]
+    scored.sort(key=lambda r: r["feedback"]["overallScore"], reverse=True)
+    return [r["index"] for r in scored]
+
+
+async def _bounded_reviews(items: list, review) -> list:
+    # Fan out LLM calls with bounded concurrency; one failing item doesn't sink the batch
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(index: int, item):
+        async with semaphore:
+            try:
+                feedback = Feedback(**await review(item))
+                return {"index": index, "feedback": feedback.dict()}
+            except Exception as e:
+                logger.warning(f"Batch item {index} failed: {repr(e)}")
+                return {"index": index, "error": str(e)}
+
+    return await asyncio.gather(*(run(i, item) for i, item in enumerate(items)))
+
+
+async def analyze_batch_jobs(resume_bytes: bytes, content_type: str, filename: str, jobs: list) -> dict:
+    # One resume against many jobs: parse and upload once, review per job
+    timings = {}
+    upload_task = asyncio.create_task(_timed("upload", upload_resume(resume_bytes, filename), timings))
+    try:
+        resume_text = await _timed(
+            "extract", ResumeReviewGenerator.resume_text(resume_bytes, content_type), timings
+        )
+        results = await _timed("review", _bounded_reviews(
+            jobs,
+            lambda job: ResumeReviewGenerator.review_text(resume_text, job["jobTitle"], job["jobDescription"]),
+        ), timings)
+    except BaseException:
+        _spawn(_discard_upload(upload_task))
+        raise
+
+    try:
+        resume_result = await upload_task
+    except Exception as e:
+        raise UploadError(e) from e
+
+    for result in results:
+        result["jobTitle"] = jobs[result["index"]]["jobTitle"]
+
+    logger.info(f"Batch of {len(jobs)} jobs finished: {timings}")
+    return {
+        "resume_url": resume_result["secure_url"],
+        "results": results,
+        "ranking": _rank(results),
+    }
+
+
+async def analyze_batch_resumes(resumes: list, job_title: str, job_description: str) -> dict:
+    # Many resumes against one job: the prompt is built once and shared
+    prompt = ResumeReviewGenerator.generate_prompt(job_title, job_description)
+
+    async def review(resume: tuple) -> dict:
+        resume_bytes, content_type, _ = resume
+        resume_text = await ResumeReviewGenerator.resume_text(resume_bytes, content_type)
+        return await ResumeReviewGenerator.review_text(resume_text, job_title, job_description, prompt=prompt)
+
+    start = time.perf_counter()
+    results, uploads = await asyncio.gather(
+        _bounded_reviews(resumes, review),
+        asyncio.gather(*(upload_resume(b, name) for b, _, name in resumes), return_exceptions=True),
+    )
+
+    for result, upload in zip(results, uploads):
+        result["filename"] = resumes[result["index"]][2]
+        if isinstance(upload, Exception):
+            result["upload_error"] = str(upload)
+        else:
+            result["resume_url"] = upload["secure_url"]
+
+    logger.info(f"Batch of {len(resumes)} resumes finished in {round((time.perf_counter() - start) * 1000)} ms")
+    return {
+        "jobTitle": job_title,
+        "results": results,
+        "ranking": _rank(results),
+    }
+
+
+# ---------- Quick score: local keyword matcher, no LLM and no upload ----------
+async def _score(resume_texts: list, job_descriptions: list) -> list:
+    async with stage("score"):
+        scores = await run_cpu(score_pairs, resume_texts, job_descriptions, settings.SCORING_MAX_KEYWORDS)
+    return [score.dict() for score in scores]
+
+
+def _rank_scores(results: list) -> list:
+    return [r["index"] for r in sorted(results, key=lambda r: r["ATS"]["score"], reverse=True)]
+
+
+async def quick_score(resume_bytes: bytes, content_type: str, job_description: str) -> dict:
+    resume_text = await ResumeReviewGenerator.resume_text(resume_bytes, content_type)
+    return (await _score([resume_text], [job_description]))[0]
+
+
+async def quick_score_jobs(resume_bytes: bytes, content_type: str, jobs: list) -> dict:
+    resume_text = await ResumeReviewGenerator.resume_text(resume_bytes, content_type)
+    scores = await _score([resume_text] * len(jobs), [job["jobDescription"] for job in jobs])
+    results = [
+        {"index": i, "jobTitle": job["jobTitle"], "ATS": score}
+        for i, (job, score) in enumerate(zip(jobs, scores))
+    ]
+    return {"results": results, "ranking": _rank_scores(results)}
+
+
+async def quick_score_resumes(resumes: list, job_title: str, job_description: str) -> dict:
+    resume_texts = await asyncio.gather(*(
+        ResumeReviewGenerator.resume_text(resume_bytes, content_type) for resume_bytes, content_type, _ in resumes
+    ))
+    scores = await _score(list(resume_texts), [job_description] * len(resumes))
+    results = [
+        {"index": i, "filename": resume[2], "ATS": score}
+        for i, (resume, score) in enumerate(zip(resumes, scores))
+    ]
+    return {"jobTitle": job_title, "results": results, "ranking": _rank_scores(results)}
@@ -0,0 +1,104 @@
+import re
+from dataclasses import dataclass
+
+# Rough offline tokenizer: words and punctuation, with long words costing ~1 token per 4 chars.
+# It only has to be deterministic and close enough to Gemini's count to enforce a budget.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+
+SECTION_HEADINGS = (
+    "summary", "profile", "objective", "experience", "work experience", "employment",
+    "education", "skills", "technical skills", "projects", "certifications", "awards",
+    "achievements", "publications", "languages", "volunteering", "references",
+    "hobbies", "interests", "personal details", "declaration",
+)
+LOW_VALUE_SECTIONS = ("references", "hobbies", "interests", "personal details", "declaration")
+
+JD_BOILERPLATE_RE = re.compile(
+    r"equal opportunity|eeo|without regard to|reasonable accommodation|privacy (policy|notice)"
+    r"|benefits include|we offer|perks|about (us|the company)|apply now|click apply",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PromptStats:
+    raw_tokens: int
+    prompt_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.raw_tokens - self.prompt_tokens
+
+
+def count_tokens(text: str) -> int:
+    return sum((len(token) + 3) // 4 for token in _TOKEN_RE.findall(text or ""))
+
+
+def _clean_lines(text: str) -> list:
+    # PDF headers, footers and page numbers are already gone (extraction.strip_page_furniture);
+    # lines that legitimately repeat, like a job title held twice, are kept
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in (text or "").replace("\r", "\n").split("\n")]
+
+    cleaned = []
+    for line in lines:
+        if not line and (not cleaned or not cleaned[-1]):
+            continue
+        cleaned.append(line)
+    return cleaned
+
+
+def _truncate_lines(lines: list, budget: int) -> list:
+    kept, used = [], 0
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def _heading(line: str):
+    name = line.lower().rstrip(":").strip()
+    return name if name in SECTION_HEADINGS else None
+
+
+def _drop_low_value_sections(lines: list) -> list:
+    kept, skipping = [], False
+    for line in lines:
+        heading = _heading(line)
+        if heading:
+            skipping = heading in LOW_VALUE_SECTIONS
+        if not skipping:
+            kept.append(line)
+    return kept
+
+
+def compact_resume(resume_text: str, budget: int) -> str:
+    lines = _clean_lines(resume_text)
+    if count_tokens("\n".join(lines)) > budget:
+        lines = _drop_low_value_sections(lines)
+    if count_tokens("\n".join(lines)) > budget:
+        lines = _truncate_lines(lines, budget)
+    return "\n".join(lines).strip()
+
+
+def compact_job_description(job_description: str, budget: int) -> str:
+    lines = _clean_lines(job_description)
+
+    # Job postings repeat bullets across "requirements"/"nice to have" blocks
+    seen, unique = set(), []
+    for line in lines:
+        key = line.lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        unique.append(line)
+    lines = unique
+
+    if count_tokens("\n".join(lines)) > budget:
+        lines = [line for line in lines if not JD_BOILERPLATE_RE.search(line)]
+    if count_tokens("\n".join(lines)) > budget:
+        lines = _truncate_lines(lines, budget)
+    return "\n".join(lines).strip()
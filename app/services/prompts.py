@@ -1,4 +1,6 @@
-RESUME_PROMPT = """
+# Static prefix: identical for every request, so it can be registered once with Gemini
+# context caching. Only RESUME_REQUEST changes per call.
+RESUME_INSTRUCTIONS = """
                 You are an expert in ATS (Applicant Tracking Systems) and professional resume analysis. 
                 Your task is to provide a highly detailed, objective evaluation of the provided resume 
                 against the target job.
@@ -17,15 +19,18 @@ RESUME_PROMPT = """
                 as well as 3–6 key responsibilities that the candidate could add or emphasize in their resume 
                 to better match the job description.
 
-
-                Job Title: ${jobTitle}
-                Job Description: ${jobDescription}
+                The job title, job description and resume follow these instructions.
 
                 Return **only** a JSON object that strictly matches this schema:
                 ${AIResponseFormat}
                 No extra text, no Markdown, no backticks—just valid JSON.
                 """
 
+RESUME_REQUEST = """
+                Job Title: ${jobTitle}
+                Job Description: ${jobDescription}
+                """
+
 json_structure = """
                 {
                 "overallScore": 0,
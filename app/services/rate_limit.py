@@ -0,0 +1,161 @@
+import ipaddress
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from app.services.cache import async_redis_client, lazy_script
+from app.services.config import settings
+from app.utils.auth import get_current_user
+
+logger = logging.getLogger("uvicorn.error")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 60 * 60 * 24}
+
+# Sliding window over a sorted set of request timestamps. Trim, count and add happen in
+# one script so a check costs a single round-trip and stays exact across processes.
+# Redis TIME is used so workers with skewed clocks still share one window.
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    return {0, count, tonumber(oldest[2]) + window - now}
+end
+redis.call('ZADD', key, now, ARGV[3])
+redis.call('PEXPIRE', key, window)
+return {1, count + 1, 0}
+"""
+
+# Daily token quota: reject if the charge would cross the limit, otherwise add it
+QUOTA_LUA = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local cost = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+if used + cost > limit then
+    return {0, used}
+end
+used = redis.call('INCRBY', KEYS[1], cost)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return {1, used}
+"""
+
+_sliding_window = lazy_script(SLIDING_WINDOW_LUA)
+_quota = lazy_script(QUOTA_LUA)
+
+# Who LLM calls in the current request/job are charged to
+quota_owner: ContextVar[Optional[str]] = ContextVar("quota_owner", default=None)
+
+
+class QuotaExceededError(RuntimeError):
+    pass
+
+
+def _parse_limits(spec: str) -> dict:
+    # "default=100/minute,analyze=10/minute"
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, rate = item.split("=")
+        count, period = rate.split("/")
+        limits[route.strip()] = (int(count), PERIODS[period.strip().rstrip("s")])
+    return limits
+
+
+@lru_cache(maxsize=1)
+def _limits() -> dict:
+    return _parse_limits(settings.RATE_LIMITS)
+
+
+# Addresses or CIDR ranges of our own load balancers, e.g. "10.0.0.0/8,127.0.0.1"
+@lru_cache(maxsize=1)
+def _trusted_proxies() -> tuple:
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False) for proxy in settings.TRUSTED_PROXIES)
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies())
+
+
+def _client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    # X-Forwarded-For is client-controlled, so it only counts when a trusted proxy sent
+    # it, and then only up to the first hop our proxies didn't add themselves
+    if not _is_trusted(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for", "")
+    for hop in reversed([hop.strip() for hop in forwarded.split(",") if hop.strip()]):
+        if not _is_trusted(hop):
+            return hop
+        peer = hop
+    return peer
+
+
+async def check_rate_limit(route: str, identity: str) -> None:
+    limits = _limits()
+    limit, window = limits.get(route) or limits["default"]
+    try:
+        allowed, count, retry_ms = await _sliding_window(
+            keys=[f"ratelimit:{route}:{identity}"],
+            args=[window * 1000, limit, uuid.uuid4().hex],
+        )
+    except Exception as e:
+        # Fail open: an unavailable limiter shouldn't take the API down with it
+        logger.warning(f"Rate limiter unavailable: {repr(e)}")
+        return
+
+    if not allowed:
+        retry_after = max(1, int(retry_ms) // 1000 + 1)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded: {limit} per {window}s",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def rate_limit(route: str):
+    # Keyed by Clerk user; the auth dependency is cached per request so this doesn't verify twice
+    async def dependency(user_details: dict = Depends(get_current_user)):
+        clerk_id = user_details.get("user_id")
+        quota_owner.set(clerk_id)
+        await check_rate_limit(route, f"user:{clerk_id}")
+    return dependency
+
+
+def ip_rate_limit(route: str):
+    async def dependency(request: Request):
+        await check_rate_limit(route, f"ip:{_client_ip(request)}")
+    return dependency
+
+
+async def charge_quota(tokens: int) -> None:
+    owner = quota_owner.get()
+    if not owner or settings.LLM_DAILY_TOKEN_QUOTA <= 0:
+        return
+
+    day = datetime.now(timezone.utc).strftime("%Y%m%d")
+    cost = tokens + settings.LLM_OUTPUT_TOKEN_ESTIMATE
+    try:
+        allowed, used = await _quota(
+            keys=[f"quota:{owner}:{day}"],
+            args=[cost, settings.LLM_DAILY_TOKEN_QUOTA, 60 * 60 * 48],
+        )
+    except Exception as e:
+        # Same policy as check_rate_limit: fail open rather than fail every review
+        logger.warning(f"Quota store unavailable: {repr(e)}")
+        return
+    if not allowed:
+        raise QuotaExceededError(
+            f"Daily LLM quota exceeded ({used}/{settings.LLM_DAILY_TOKEN_QUOTA} tokens used)"
+        )
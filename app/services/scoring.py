@@ -0,0 +1,193 @@
+import re
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from typing import List, Sequence
+
+# Deterministic keyword/ATS matcher. Everything here is pure CPU work on already
+# extracted text, so a single pair scores in well under a millisecond and batches
+# are scored as one set of NumPy matrix operations.
+
+# Keeps tech tokens like c++, c#, node.js, ci/cd and .net intact
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*|\.net")
+MAX_NGRAM = 3
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be been before being
+below between both but by can could did do does doing down during each etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just may me might
+more most must my no nor not now of off on once only or other our ours out over own per same she
+should so some such than that the their them then there these they this those through to too
+under until up upon us very via was we were what when where which while who whom why will with
+within without would you your yours
+ability able across apply candidate candidates company role position team teams work working
+year years experience experienced strong good great excellent including include includes
+responsibilities responsibility requirements required requirement preferred plus bonus ideal
+looking join new well using use used knowledge understanding skills skill job jobs day days
+""".split())
+
+# Precomputed skills vocabulary; matches here weigh more than generic keywords
+SKILLS = frozenset("""
+python java javascript typescript go golang rust c c++ c# ruby php kotlin swift scala r matlab
+perl bash shell powershell sql nosql html css sass graphql rest grpc json xml yaml
+react angular vue svelte next.js node.js express django flask fastapi spring .net rails laravel
+pandas numpy scipy scikit-learn tensorflow pytorch keras spark hadoop kafka airflow dbt
+tableau power-bi excel looker snowflake bigquery redshift databricks
+postgresql postgres mysql mongodb redis elasticsearch cassandra dynamodb sqlite oracle
+aws azure gcp docker kubernetes terraform ansible jenkins gitlab github git linux unix nginx
+ci/cd devops mlops microservices serverless lambda helm prometheus grafana
+agile scrum kanban jira confluence figma sketch
+machine-learning deep-learning nlp llm computer-vision data-analysis data-science statistics
+etl api apis testing pytest selenium cypress jest tdd
+security oauth jwt networking tcp/ip
+leadership communication mentoring stakeholder management negotiation
+""".split()) | frozenset({
+    "machine learning", "deep learning", "natural language processing", "computer vision",
+    "data analysis", "data science", "data engineering", "data modeling", "data visualization",
+    "power bi", "google cloud", "amazon web services", "spring boot", "ruby on rails",
+    "unit testing", "test automation", "continuous integration", "continuous delivery",
+    "project management", "product management", "stakeholder management", "system design",
+    "distributed systems", "object oriented", "version control", "rest api", "rest apis",
+    "problem solving", "customer service", "business intelligence", "cloud computing",
+    "information security", "incident response", "a/b testing", "user research",
+})
+SKILL_WEIGHT = 2.0
+
+# BM25 parameters for the resume side. Length is normalised against a fixed typical
+# resume (keyword terms after stopwords) rather than the batch mean, so a pair scores
+# the same alone or in any batch.
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_RESUME_TERMS = 300.0
+
+
+@dataclass
+class KeywordScore:
+    score: float
+    coverage: float
+    similarity: float
+    matched: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    def dict(self) -> dict:
+        return asdict(self)
+
+
+def _words(text: str) -> list:
+    return _WORD_RE.findall((text or "").lower())
+
+
+# Batch-resumes scores many resumes against one JD; don't re-tokenize it each time
+@lru_cache(maxsize=256)
+def extract_keywords(text: str) -> tuple:
+    # Skill phrases (up to MAX_NGRAM words) win over their single words, everything
+    # else that isn't a stopword or a bare number counts as a generic keyword.
+    words = _words(text)
+    terms, i = [], 0
+    while i < len(words):
+        for n in range(min(MAX_NGRAM, len(words) - i), 1, -1):
+            phrase = " ".join(words[i:i + n])
+            if phrase in SKILLS:
+                terms.append(phrase)
+                i += n
+                break
+        else:
+            word = words[i]
+            if word in SKILLS or (len(word) > 2 and word not in STOPWORDS and not word.isdigit()):
+                terms.append(word)
+            i += 1
+    return tuple(terms)
+
+
+def _count_matrix(docs: Sequence[tuple], vocab: dict):
+    import numpy as np
+
+    counts = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    rows, cols = [], []
+    for row, terms in enumerate(docs):
+        for term in terms:
+            col = vocab.get(term)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    if rows:
+        np.add.at(counts, (np.asarray(rows), np.asarray(cols)), 1.0)
+    return counts
+
+
+def score_pairs(resumes: Sequence[str], job_descriptions: Sequence[str], max_keywords: int = 40) -> List[KeywordScore]:
+    import numpy as np
+
+    if len(resumes) != len(job_descriptions):
+        raise ValueError("resumes and job_descriptions must have the same length")
+    if not resumes:
+        return []
+
+    resume_terms = [extract_keywords(text) for text in resumes]
+    job_terms = [extract_keywords(text) for text in job_descriptions]
+
+    # Only job description terms matter, so they define the vocabulary
+    vocab = {}
+    for terms in job_terms:
+        for term in terms:
+            vocab.setdefault(term, len(vocab))
+    if not vocab:
+        return [KeywordScore(score=0.0, coverage=0.0, similarity=0.0) for _ in resumes]
+    terms_by_col = np.array(list(vocab), dtype=object)
+
+    jobs = _count_matrix(job_terms, vocab)
+    docs = _count_matrix(resume_terms, vocab)
+
+    # Fixed weights from the skills vocabulary; nothing depends on what else is in the batch
+    skill = np.fromiter((term in SKILLS for term in vocab), dtype=bool, count=len(vocab))
+    weights = np.where(skill, SKILL_WEIGHT, 1.0)
+
+    required = jobs > 0
+    present = docs > 0
+    query_weight = required * weights
+    total = query_weight.sum(axis=1)
+    total[total == 0] = 1.0
+
+    # Coverage: weighted share of job keywords that appear in the resume at all
+    coverage = (query_weight * present).sum(axis=1) / total
+
+    # BM25 over the resume, normalised by the best achievable score for that JD
+    lengths = np.fromiter((len(terms) for terms in resume_terms), dtype=np.float32, count=len(resume_terms))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / AVG_RESUME_TERMS)
+    saturated = docs * (BM25_K1 + 1) / (docs + norm[:, None])
+    similarity = (query_weight * saturated).sum(axis=1) / (total * (BM25_K1 + 1))
+
+    scores = np.round(100 * (0.6 * coverage + 0.4 * similarity), 1)
+
+    # Most important terms first, then in the order the JD mentions them. Ordered per
+    # row, so the listing doesn't depend on the rest of the batch either
+    importance = weights * jobs
+    results = []
+    for row in range(len(resumes)):
+        first = {}
+        for term in job_terms[row]:
+            first.setdefault(vocab[term], len(first))
+        row_order = np.array(sorted(first, key=lambda col: (-importance[row, col], first[col])), dtype=np.intp)
+        hit = present[row, row_order]
+        results.append(KeywordScore(
+            score=float(scores[row]),
+            coverage=round(float(coverage[row]), 3),
+            similarity=round(float(similarity[row]), 3),
+            matched=terms_by_col[row_order[hit]][:max_keywords].tolist(),
+            missing=terms_by_col[row_order[~hit]][:max_keywords].tolist(),
+        ))
+    return results
+
+
+def score_resume(resume_text: str, job_description: str, max_keywords: int = 40) -> KeywordScore:
+    return score_pairs([resume_text], [job_description], max_keywords)[0]
+
+
+def grounding(result: KeywordScore, limit: int = 20) -> str:
+    # Appended to the LLM prompt so the ATS section starts from measured keyword overlap
+    lines = [
+        "Deterministic keyword analysis (use it to ground the ATS section):",
+        f"- Keyword match score: {result.score:.0f}/100 (coverage {result.coverage:.0%})",
+        f"- Matched keywords: {', '.join(result.matched[:limit]) or 'none'}",
+        f"- Missing keywords: {', '.join(result.missing[:limit]) or 'none'}",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,205 @@
+import fcntl
+import json
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+from app.services.config import settings
+from app.services.scoring import extract_keywords, SKILLS, SKILL_WEIGHT
+
+# Rows are scanned in slices so a search never materialises the whole matrix
+SEARCH_CHUNK_ROWS = 1 << 18
+ID_BYTES = 64
+
+
+# ---------- Hashing vectorizer ----------
+def embed(text: str, dim: Optional[int] = None):
+    # Signed feature hashing over the scorer's keywords: offline, stateless and the
+    # same vector in every process, so the index can be appended to incrementally.
+    import numpy as np
+
+    dim = dim or settings.SEARCH_INDEX_DIM
+    counts = Counter(extract_keywords(text))
+    vector = np.zeros(dim, dtype=np.float32)
+    if not counts:
+        return vector
+
+    columns, weights = [], []
+    for term, tf in counts.items():
+        h = zlib.crc32(term.encode("utf-8"))
+        weight = (1.0 + math.log(tf)) * (SKILL_WEIGHT if term in SKILLS else 1.0)
+        columns.append(h % dim)
+        weights.append(weight if h & 0x80000000 else -weight)
+    np.add.at(vector, np.asarray(columns), np.asarray(weights, dtype=np.float32))
+
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+# ---------- Memory-mapped index ----------
+class VectorIndex:
+    # One file of float32 rows, one of fixed-width ids and a small JSON header with
+    # the row count. Appends take an flock so API processes and queue workers can
+    # share a directory; readers remap when the header shows new rows.
+
+    def __init__(self, directory: str, name: str, dim: int):
+        self.dim = dim
+        base = os.path.join(directory, name)
+        self.vectors_path = f"{base}.vec"
+        self.ids_path = f"{base}.ids"
+        self.meta_path = f"{base}.json"
+        self.lock_path = f"{base}.lock"
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        self._count = 0
+        self._capacity = 0
+        self._vectors = None
+        self._ids = None
+        self._rows = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "capacity": 0, "dim": self.dim}
+        if meta["dim"] != self.dim:
+            raise ValueError(f"{self.meta_path} was built with dim={meta['dim']}, expected {self.dim}")
+        return meta
+
+    def _write_meta(self):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"count": self._count, "capacity": self._capacity, "dim": self.dim}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _map(self, capacity: int):
+        import numpy as np
+
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self.ids_path, dtype=f"S{ID_BYTES}", mode="r+", shape=(capacity,))
+        self._capacity = capacity
+
+    def _refresh(self):
+        # Cheap stat per call; only remap and re-read ids when another process appended
+        try:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        meta = self._read_meta()
+        if meta["capacity"] != self._capacity:
+            self._map(meta["capacity"])
+        for row in range(self._count, meta["count"]):
+            self._rows[self._ids[row].decode("ascii")] = row
+        self._count = meta["count"]
+        self._meta_mtime = mtime
+
+    def _grow(self, needed: int):
+        capacity = max(1024, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+        for path, row_bytes in ((self.vectors_path, 4 * self.dim), (self.ids_path, ID_BYTES)):
+            with open(path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        self._map(capacity)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    def add(self, doc_id: str, vector) -> None:
+        # Re-adding an id overwrites its row, so retried jobs don't duplicate entries
+        key = doc_id.encode("ascii")
+        if len(key) > ID_BYTES:
+            raise ValueError(f"Index ids are limited to {ID_BYTES} bytes")
+        with self._lock, self._file_lock():
+            self._refresh()
+            row = self._rows.get(doc_id)
+            if row is None:
+                row = self._count
+                self._grow(row + 1)
+                self._ids[row] = key
+                self._rows[doc_id] = row
+                self._count += 1
+            self._vectors[row] = vector
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta()
+            self._meta_mtime = os.stat(self.meta_path).st_mtime_ns
+
+    def search(self, vector, k: int, within: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        # Exact cosine search (rows are unit length): one BLAS matvec per slice and
+        # argpartition to keep the running top-k, so recall is 1.0 by construction.
+        # within restricts the search to those ids (a caller's own documents).
+        import numpy as np
+
+        with self._lock:
+            self._refresh()
+            count, vectors, ids = self._count, self._vectors, self._ids
+            if within is not None:
+                rows = np.fromiter(sorted({self._rows[i] for i in within if i in self._rows}), dtype=np.int64)
+        if not count or k <= 0:
+            return []
+
+        if within is not None:
+            scores = np.asarray(vectors[rows] @ vector) if len(rows) else np.empty(0, dtype=np.float32)
+            order = np.argsort(-scores, kind="stable")[:k]
+            return [(ids[rows[i]].decode("ascii"), round(float(scores[i]), 4)) for i in order]
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            scores = vectors[start:min(start + SEARCH_CHUNK_ROWS, count)] @ vector
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+            else:
+                top = np.arange(len(scores))
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(-best_scores, kind="stable")
+        return [(ids[best_rows[i]].decode("ascii"), round(float(best_scores[i]), 4)) for i in order]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+RESUMES = "resumes"
+JOBS = "jobs"
+
+
+def get_index(name: str) -> VectorIndex:
+    with _indexes_lock:
+        if name not in _indexes:
+            _indexes[name] = VectorIndex(settings.SEARCH_INDEX_DIR, name, settings.SEARCH_INDEX_DIM)
+        return _indexes[name]
+
+
+# Module-level entry points so they can run on the CPU executor
+def index_document(name: str, doc_id: str, text: str) -> None:
+    get_index(name).add(doc_id, embed(text))
+
+
+def search_documents(name: str, text: str, k: int, within: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+    return get_index(name).search(embed(text), k, within)
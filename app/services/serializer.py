@@ -0,0 +1,32 @@
+import json
+import zlib
+from typing import Union
+
+# Cached values start with a version byte so the format can evolve without a migration.
+# Entries written before versioning are plain JSON objects and start with "{".
+VERSION_JSON = b"\x01"
+VERSION_ZLIB = b"\x02"
+LEGACY_JSON = b"{"
+
+COMPRESS_THRESHOLD = 1024
+
+
+def dumps(obj: dict) -> bytes:
+    body = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(body) >= COMPRESS_THRESHOLD:
+        return VERSION_ZLIB + zlib.compress(body, 6)
+    return VERSION_JSON + body
+
+
+def loads(data: Union[bytes, str]) -> dict:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    version, body = data[:1], data[1:]
+    if version == LEGACY_JSON:
+        return json.loads(data)
+    if version == VERSION_JSON:
+        return json.loads(body)
+    if version == VERSION_ZLIB:
+        return json.loads(zlib.decompress(body))
+    raise ValueError(f"Unknown cache payload version: {version!r}")
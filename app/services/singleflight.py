@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+from app.services.cache import async_redis_client, lazy_script
+from app.services.config import settings
+from app.services.llm import llm_deadline
+
+logger = logging.getLogger("uvicorn.error")
+
+# Delete the lock only if we still own it
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+# Push the expiry out only if we still own the lock
+RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_release = lazy_script(RELEASE_LUA)
+_renew = lazy_script(RENEW_LUA)
+
+_inflight: dict = {}
+stats = {"leaders": 0, "coalesced_local": 0, "coalesced_remote": 0, "lock_timeouts": 0, "locks_lost": 0}
+
+
+def _wait_timeout() -> float:
+    # A leader can legitimately spend the whole LLM deadline (retries included) plus the
+    # repair call, so don't give up on it sooner than that
+    return max(settings.SINGLEFLIGHT_WAIT_TIMEOUT, 2 * llm_deadline())
+
+
+async def _keep_alive(lock_key: str, token: str) -> None:
+    # The lock TTL only has to cover a crashed leader; while fn runs it's renewed every
+    # third of the TTL, so a slow LLM call never lets a second leader in
+    ttl_ms = int(settings.SINGLEFLIGHT_LOCK_TTL * 1000)
+    while True:
+        await asyncio.sleep(settings.SINGLEFLIGHT_LOCK_TTL / 3)
+        try:
+            renewed = await _renew(keys=[lock_key], args=[token, ttl_ms])
+        except Exception as e:
+            logger.warning(f"Single-flight lock renewal failed: {repr(e)}")
+            continue
+        if not renewed:
+            stats["locks_lost"] += 1
+            logger.warning(f"Single-flight lock {lock_key} expired while its leader was running")
+            return
+
+
+async def _wait_for_remote(lock_key: str, read_result: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+    # Another process holds the lock: poll for its result until the lock goes away
+    deadline = time.monotonic() + _wait_timeout()
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.SINGLEFLIGHT_POLL_INTERVAL)
+        result = await read_result()
+        if result is not None:
+            return result
+        if not await async_redis_client.exists(lock_key):
+            return await read_result()
+    stats["lock_timeouts"] += 1
+    return None
+
+
+async def _run_once(key: str, fn: Callable[[], Awaitable[dict]], read_result) -> dict:
+    lock_key = f"singleflight:{key}"
+    token = uuid.uuid4().hex
+
+    while True:
+        try:
+            acquired = await async_redis_client.set(
+                lock_key, token, nx=True, px=int(settings.SINGLEFLIGHT_LOCK_TTL * 1000)
+            )
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable, running without it: {repr(e)}")
+            stats["leaders"] += 1
+            return await fn()
+
+        if acquired:
+            stats["leaders"] += 1
+            keep_alive = asyncio.create_task(_keep_alive(lock_key, token))
+            try:
+                return await fn()
+            finally:
+                keep_alive.cancel()
+                await _release(keys=[lock_key], args=[token])
+
+        result = await _wait_for_remote(lock_key, read_result)
+        if result is not None:
+            stats["coalesced_remote"] += 1
+            return result
+        # The other process failed or timed out without a result; try to lead ourselves
+
+
+async def do(key: str, fn: Callable[[], Awaitable[dict]], read_result: Callable[[], Awaitable[Optional[dict]]]) -> dict:
+    # Identical concurrent calls in this process await one future; across processes a short
+    # Redis lock elects a leader and the others read its result through read_result.
+    while True:
+        future = _inflight.get(key)
+        if future is None:
+            break
+        stats["coalesced_local"] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The leader's request was cancelled; take over rather than failing too
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _run_once(key, fn, read_result)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # waiters re-raise it; don't warn when there are none
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+
+def get_singleflight_stats() -> dict:
+    return {**stats, "in_flight": len(_inflight)}
@@ -0,0 +1,45 @@
+import uuid
+import logging
+from functools import lru_cache
+from app.services.config import settings
+from app.services.executors import run_io
+
+logger = logging.getLogger("uvicorn.error")
+
+
+# The SDK is imported and configured on the first upload, not at app startup
+@lru_cache(maxsize=1)
+def _uploader():
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET
+    )
+    return cloudinary.uploader
+
+
+# The Cloudinary SDK is blocking, so uploads run on the shared I/O pool
+async def upload_resume(resume_bytes: bytes, filename: str) -> dict:
+    return await run_io(
+        _uploader().upload,
+        resume_bytes,
+        resource_type="auto",
+        public_id=f"resumes/{uuid.uuid4()}_{filename}",
+        type="upload",
+    )
+
+
+async def delete_resume(upload_result: dict) -> None:
+    try:
+        await run_io(
+            _uploader().destroy,
+            upload_result["public_id"],
+            resource_type=upload_result.get("resource_type", "image"),
+            type="upload",
+        )
+        logger.info(f"Deleted orphaned Cloudinary asset: {upload_result['public_id']}")
+    except Exception as e:
+        logger.warning(f"Failed to delete Cloudinary asset {upload_result.get('public_id')}: {repr(e)}")
@@ -1,29 +1,140 @@
-from fastapi import HTTPException
-from clerk_backend_api import Clerk, AuthenticateRequestOptions
-import os
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+import logging
+import time
+from functools import lru_cache
+from typing import Optional
+from cachetools import TTLCache
+from fastapi import HTTPException, Request
+from app.services.config import settings
+from app.services.metrics import stage
 
-load_dotenv()
+logger = logging.getLogger("uvicorn.error")
 
-clerk_sdk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
 
-def authenticate_and_get_user_details(request):
+# ---------- JWKS cache ----------
+class JWKSCache:
+    def __init__(self, url: str, secret_key: str, ttl: int, min_refresh_interval: int):
+        self.url = url
+        self.secret_key = secret_key
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self) -> None:
+        import httpx
+        import jwt
+
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(self.url, headers={"Authorization": f"Bearer {self.secret_key}"})
+            response.raise_for_status()
+        self._keys = {
+            jwk["kid"]: jwt.PyJWK(jwk).key
+            for jwk in response.json().get("keys", [])
+            if jwk.get("kid")
+        }
+        self._fetched_at = time.monotonic()
+        logger.info(f"Fetched {len(self._keys)} signing keys from JWKS")
+
+    async def get_key(self, kid: str):
+        age = time.monotonic() - self._fetched_at
+        # Refresh on expiry, or when an unknown kid shows up after a key rotation
+        # (throttled so garbage kids can't make us hammer the JWKS endpoint)
+        if age > self.ttl or (kid not in self._keys and age > self.min_refresh_interval):
+            async with self._lock:
+                age = time.monotonic() - self._fetched_at
+                if age > self.ttl or (kid not in self._keys and age > self.min_refresh_interval):
+                    await self._refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            import jwt
+
+            raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+        return key
+
+
+# Built on the first authenticated request; public routes never pay for them
+@lru_cache(maxsize=1)
+def _get_jwks_cache() -> JWKSCache:
+    return JWKSCache(
+        url=settings.CLERK_JWKS_URL,
+        secret_key=settings.CLERK_SECRET_KEY,
+        ttl=settings.AUTH_JWKS_TTL,
+        min_refresh_interval=settings.AUTH_JWKS_MIN_REFRESH,
+    )
+
+
+# Verified claims keyed by token hash, kept only briefly and never past the token's own expiry
+@lru_cache(maxsize=1)
+def _get_verified_tokens() -> TTLCache:
+    return TTLCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE, ttl=settings.AUTH_TOKEN_CACHE_TTL)
+
+_static_key = None
+
+
+def _get_static_key():
+    # Clerk's "JWT public key" allows networkless verification without the JWKS endpoint
+    global _static_key
+    if _static_key is None and settings.JWT_KEY:
+        import jwt
+
+        _static_key = jwt.algorithms.RSAAlgorithm.from_jwk(settings.JWT_KEY) if settings.JWT_KEY.lstrip().startswith("{") \
+            else settings.JWT_KEY.replace("\\n", "\n")
+    return _static_key
+
+
+def _get_token(request: Request) -> Optional[str]:
+    auth_header = request.headers.get("authorization", "")
+    if auth_header.lower().startswith("bearer "):
+        return auth_header[7:].strip()
+    return request.cookies.get("__session")
+
+
+async def verify_token(token: str) -> dict:
+    import jwt
+
+    verified_tokens = _get_verified_tokens()
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = verified_tokens.get(token_hash)
+    if claims and claims.get("exp", 0) > time.time():
+        return claims
+
+    header = jwt.get_unverified_header(token)
+    key = _get_static_key() or await _get_jwks_cache().get_key(header.get("kid"))
+    claims = jwt.decode(
+        token,
+        key=key,
+        algorithms=["RS256"],
+        leeway=settings.AUTH_CLOCK_SKEW,
+        options={"require": ["exp", "iat", "sub"]},
+    )
+
+    authorized_parties = settings.CLERK_AUTHORIZED_PARTIES or settings.ALLOWED_ORIGINS
+    azp = claims.get("azp")
+    if azp and authorized_parties and azp not in authorized_parties:
+        raise jwt.InvalidTokenError(f"Unauthorized party: {azp}")
+
+    verified_tokens[token_hash] = claims
+    return claims
+
+
+async def get_current_user(request: Request) -> dict:
+    import jwt
+
+    token = _get_token(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing session token")
+
     try:
-        request_state = clerk_sdk.authenticate_request(
-            request,
-            AuthenticateRequestOptions(
-                authorized_parties=["http://localhost:5173", "http://localhost:5174", "http://192.168.29.19:5173", "https://ai-resume-reviewerer-frontend.vercel.app"],
-                jwt_key=os.getenv("JWT_KEY")
-            )
-        )
-
-        if not request_state.is_signed_in:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user_id = request_state.payload.get("sub")
-        return {"user_id": user_id}
-
-    except HTTPException:
-        raise
+        async with stage("auth"):
+            claims = await verify_token(token)
+    except jwt.PyJWTError as e:
+        raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
     except Exception as e:
+        logger.exception("Token verification failed")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    return {"user_id": claims.get("sub")}
@@ -1,46 +1,134 @@
-import os
+import asyncio
 import logging
+import time
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from beanie import init_beanie
 from app.models.user import User
-from dotenv import load_dotenv
-import asyncio
-
-load_dotenv()
+from app.models.review import ResumeReview
+from app.services.config import settings
 
 logger = logging.getLogger("uvicorn.error")
 
-_client = None
-_db_initialized = False
 
+# ---------- Pool statistics ----------
+class PoolStats(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.pool_cleared = 0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def pool_cleared(self, event):
+        self.pool_cleared += 1
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failed += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_in += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "open": self.created - self.closed,
+            "in_use": self.checked_out - self.checked_in,
+            "created": self.created,
+            "closed": self.closed,
+            "checkouts": self.checked_out,
+            "checkout_failed": self.checkout_failed,
+            "pool_cleared": self.pool_cleared,
+            "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+        }
+
+
+pool_stats = PoolStats()
+
+_client: Optional[AsyncIOMotorClient] = None
+_client_loop = None
+_init_lock: Optional[asyncio.Lock] = None
+_lock_loop = None
 
+
+def get_client() -> AsyncIOMotorClient:
+    if _client is None:
+        raise RuntimeError("Database not initialized")
+    return _client
+
+
+# Called once from the app lifespan; on serverless entry points the lifespan may not run,
+# so route dependencies call it lazily and the lock makes concurrent first requests share one init.
 async def init_db():
-    global _client, _db_initialized
-
-    if _db_initialized:
-        # Double-check if event loop is still running
-        try:
-            loop = asyncio.get_running_loop()
-            if loop.is_closed():
-                _db_initialized = False
-        except RuntimeError:
-            _db_initialized = False
-
-    if not _db_initialized:
-        mongo_uri = os.getenv("MONGO_URI")
-        db_name = os.getenv("DB_NAME")
-
-        if not mongo_uri or not db_name:
+    global _client, _client_loop, _init_lock, _lock_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client_loop is loop:
+        return
+
+    if _lock_loop is not loop:
+        _init_lock, _lock_loop = asyncio.Lock(), loop
+
+    async with _init_lock:
+        if _client is not None and _client_loop is loop:
+            return
+
+        if not settings.MONGO_URI or not settings.DB_NAME:
             raise ValueError("Missing MONGO_URI or DB_NAME in environment variables")
 
         logger.info("Connecting to MongoDB...")
+        start = time.perf_counter()
 
-        # Create new client for this loop
-        _client = AsyncIOMotorClient(mongo_uri)
-        db = _client[db_name]
+        # A client is bound to the loop it was created on, so a new loop needs a new client
+        client = AsyncIOMotorClient(
+            settings.MONGO_URI,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=[pool_stats],
+        )
 
         logger.info("Initializing Beanie with models...")
-        await init_beanie(database=db, document_models=[User])
+        await init_beanie(database=client[settings.DB_NAME], document_models=[User, ResumeReview])
+
+        _client, _client_loop = client, loop
+        logger.info(f"Database initialized in {round((time.perf_counter() - start) * 1000)} ms.")
+
+
+def get_collection(name: str):
+    return get_client()[settings.DB_NAME][name]
+
+
+async def close_db():
+    global _client, _client_loop
+    if _client is not None:
+        _client.close()
+        _client = _client_loop = None
+        logger.info("MongoDB client closed.")
+
 
-        _db_initialized = True
-        logger.info("Database initialized successfully.")
+async def db_health() -> dict:
+    start = time.perf_counter()
+    await get_client().admin.command("ping")
+    return {
+        "status": "ok",
+        "ping_ms": round((time.perf_counter() - start) * 1000, 2),
+        "pool": pool_stats.snapshot(),
+    }
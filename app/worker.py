@@ -0,0 +1,32 @@
+import asyncio
+import logging
+import signal
+from dotenv import load_dotenv
+from app.services.executors import shutdown_executors
+from app.services.jobs import run_worker
+from app.utils.db import init_db
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("uvicorn.error")
+
+
+async def main():
+    await init_db()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_worker(stop=stop)
+    finally:
+        shutdown_executors()
+        logger.info("Analysis worker stopped.")
+
+
+# Run with: python -m app.worker
+if __name__ == "__main__":
+    asyncio.run(main())
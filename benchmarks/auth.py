@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import time
+from benchmarks.common import percentiles, quiet, report
+
+# verify_token cost per request against a local JWKS endpoint: fetching the JWKS on
+# every request (the old behaviour), RS256 verification with the JWKS cached, the
+# networkless JWT_KEY path, and a hit in the short-lived verified-token cache.
+
+
+async def _measure(name: str, tokens: list, setup) -> dict:
+    from app.utils import auth
+
+    setup()
+    auth._get_verified_tokens.cache_clear()
+    await auth.verify_token(tokens[0])
+    samples = []
+    start = time.perf_counter()
+    for token in tokens:
+        began = time.perf_counter()
+        await auth.verify_token(token)
+        samples.append(time.perf_counter() - began)
+    seconds = time.perf_counter() - start
+    return {"path": name, "verifications_per_s": round(len(tokens) / seconds), **percentiles(samples)}
+
+
+async def run(args) -> list:
+    from app.utils import auth
+    from tests.fakes import FakeClerk
+
+    quiet()
+    with FakeClerk() as clerk:
+        kid = clerk.published[-1]
+        fresh = [clerk.token(sub=f"user_{i}") for i in range(args.requests)]
+        same = [fresh[0]] * args.requests
+        public_key = clerk.keys[kid].public_key()
+
+        def use_jwks(ttl: int):
+            def setup():
+                cache = auth.JWKSCache(clerk.url, "sk_test", ttl=ttl, min_refresh_interval=0)
+                auth._get_jwks_cache = lambda: cache
+                auth._static_key = None
+            return setup
+
+        def use_static_key():
+            auth._static_key = public_key
+
+        return [
+            await _measure("JWKS fetched per request", fresh[:args.fetch_requests], use_jwks(ttl=-1)),
+            await _measure("JWKS cached, RS256 verify", fresh, use_jwks(ttl=3600)),
+            await _measure("JWT_KEY, RS256 verify", fresh, use_static_key),
+            await _measure("verified-token cache hit", same, use_static_key),
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--fetch-requests", type=int, default=200)
+    args = parser.parse_args()
+    report("Token verification", asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
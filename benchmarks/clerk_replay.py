@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import random
+import time
+from benchmarks.common import quiet, report
+
+# Replays a Clerk webhook history (10k events by default: creates, several updates and
+# some deletes per user, shuffled and partly duplicated the way Svix redelivers) through
+# the same steps as the /clerk route after signature checks: svix-id claim, then
+# apply_event. Reports events/sec and Mongo round-trips and operations per mode, using
+# an in-memory users collection that counts them. A stale event hits the unique index
+# twice, once more on the retry that rules out a lost insert race. A second pass replays
+# the same history and should cost no Mongo operations at all.
+
+
+def history(events: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    items, user = [], 0
+    while len(items) < events:
+        clerk_id, version = f"user_{user}", 1_700_000_000_000 + user
+        items.append(("user.created", clerk_id, version))
+        for _ in range(rng.randint(1, 6)):
+            version += rng.randint(1, 10_000)
+            items.append(("user.updated", clerk_id, version))
+        if rng.random() < 0.2:
+            items.append(("user.deleted", clerk_id, version + 1))
+        user += 1
+    items = items[:events]
+
+    deliveries = []
+    for index, (event_type, clerk_id, version) in enumerate(items):
+        data = {"id": clerk_id}
+        if event_type != "user.deleted":
+            data.update({
+                "updated_at": version,
+                "first_name": "Jane",
+                "primary_email_address_id": "email_1",
+                "email_addresses": [{"id": "email_1", "email_address": f"{clerk_id}@example.com"}],
+            })
+        deliveries.append((f"msg_{index}", {"type": event_type, "timestamp": version, "data": data}))
+    # Out of order, with ~5% redelivered
+    deliveries += rng.sample(deliveries, len(deliveries) // 20)
+    rng.shuffle(deliveries)
+    return deliveries
+
+
+async def deliver(deliveries: list, concurrency: int) -> dict:
+    from app.services import clerk_sync
+
+    semaphore = asyncio.Semaphore(concurrency)
+    outcome = {"applied": 0, "duplicate": 0}
+
+    async def one(svix_id: str, event: dict):
+        async with semaphore:
+            if not await clerk_sync.claim_event(svix_id):
+                outcome["duplicate"] += 1
+                return
+            await clerk_sync.apply_event(event)
+            outcome["applied"] += 1
+
+    await asyncio.gather(*(one(svix_id, event) for svix_id, event in deliveries))
+    return outcome
+
+
+def run(mode: str, deliveries: list, concurrency: int) -> list:
+    from app.services import clerk_sync
+    from app.services.config import get_settings
+    from tests.fakes import FakeUsersCollection, fake_redis
+
+    get_settings().CLERK_WEBHOOK_BATCH = mode == "batched"
+    clerk_sync._bulk_writer = None
+    users = FakeUsersCollection()
+    clerk_sync.get_collection = lambda name: users
+
+    rows = []
+    with fake_redis():
+        for label in ("first delivery", "full replay"):
+            bulk_writes, operations, stale = users.bulk_writes, users.operations, users.stale
+            start = time.perf_counter()
+            outcome = asyncio.run(deliver(deliveries, concurrency))
+            seconds = time.perf_counter() - start
+            rows.append({
+                "mode": mode,
+                "pass": label,
+                "deliveries": len(deliveries),
+                "events_per_s": round(len(deliveries) / seconds),
+                "applied": outcome["applied"],
+                "deduplicated": outcome["duplicate"],
+                "mongo_round_trips": users.bulk_writes - bulk_writes,
+                "mongo_ops": users.operations - operations,
+                "duplicate_keys": users.stale - stale,
+                "tombstones": sum(1 for doc in users.documents.values() if doc.get("deleted_at")),
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=64, help="Webhook deliveries in flight")
+    args = parser.parse_args()
+    quiet()
+
+    deliveries = history(args.events)
+    rows = run("per event", deliveries, args.concurrency) + run("batched", deliveries, args.concurrency)
+    report(f"Clerk webhook replay, {args.events} events", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import resource
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from tests.fakes import use_offline_env
+
+# Benchmarks run against the same stand-ins as the tests, so they need no services:
+#   python -m benchmarks.<name> [--help]
+use_offline_env()
+
+
+def percentiles(samples: list) -> dict:
+    # Milliseconds; samples are seconds
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pick(0.50), 2),
+        "p95_ms": round(pick(0.95), 2),
+        "p99_ms": round(pick(0.99), 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+@contextmanager
+def timer(result: dict, key: str = "seconds"):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        result[key] = time.perf_counter() - start
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def report(title: str, rows: list) -> None:
+    # rows are dicts with the same keys; printed as a plain aligned table
+    print(f"\n{title}")
+    if not rows:
+        print("  (no results)")
+        return
+    columns = list(rows[0])
+    widths = {c: max(len(str(c)), *(len(str(row.get(c, ""))) for row in rows)) for c in columns}
+    print("  " + "  ".join(str(c).ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  " + "  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def quiet() -> None:
+    # The app logs every stage at INFO; keep benchmark output to the results
+    import logging
+
+    for name in ("", "uvicorn.error", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
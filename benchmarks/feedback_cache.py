@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import random
+import time
+from benchmarks.common import percentiles, quiet, report
+
+# Load test for /resume-feedback: --clients pollers each read resume ids drawn from a
+# skewed (Zipf-like) distribution, the way results pages poll. Runs the same load with
+# the in-process tier on and off, and with browsers revalidating via If-None-Match.
+# Redis is fakeredis unless --redis-url points at a scratch Redis.
+
+
+class NoLocalCache(dict):
+    def __setitem__(self, key, value):
+        pass
+
+
+async def _seed(redis_bytes, resumes: int) -> None:
+    from app.services import serializer
+    from tests.fakes import feedback
+
+    async with redis_bytes.pipeline(transaction=False) as pipe:
+        for i in range(resumes):
+            pipe.set(f"resume:r{i}", serializer.dumps({
+                "clerk_id": f"user_{i}", "resume_url": f"https://res.example.com/{i}.pdf",
+                "image_url": f"https://res.example.com/{i}.png", "feedback": feedback(),
+            }))
+        await pipe.execute()
+
+
+async def _poll(client, ids: list, requests: int, revalidate: bool, samples: list, statuses: dict) -> None:
+    etags = {}
+    for _ in range(requests):
+        resume_id = random.choice(ids)
+        headers = {"If-None-Match": etags[resume_id]} if revalidate and resume_id in etags else {}
+        start = time.perf_counter()
+        response = await client.get(f"/api/resume/resume-feedback/{resume_id}", headers=headers)
+        samples.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 200:
+            etags[resume_id] = response.headers["etag"]
+
+
+async def run(args) -> list:
+    import httpx
+    from cachetools import TTLCache
+    from contextlib import nullcontext
+    from app.server import app
+    from app.routers import resume
+    from app.services import feedback_cache
+    from app.services.cache import async_redis_bytes_client
+    from tests.fakes import fake_redis
+
+    async def no_db():
+        return None
+
+    quiet()
+    app.dependency_overrides[resume.ensure_db_initialized] = no_db
+    # Zipf-like popularity: a few results pages get most of the polls
+    ids = [f"r{int(random.paretovariate(1.2)) % args.resumes}" for _ in range(10_000)]
+
+    rows = []
+    with (nullcontext() if args.redis_url else fake_redis()):
+        await _seed(async_redis_bytes_client.resolve(), args.resumes)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, local, revalidate in (
+                ("redis only", NoLocalCache(), False),
+                ("memory + redis", TTLCache(maxsize=args.cache_size, ttl=3600), False),
+                ("memory + redis, If-None-Match", TTLCache(maxsize=args.cache_size, ttl=3600), True),
+            ):
+                feedback_cache._get_local = lambda local=local: local
+                for key in feedback_cache.stats:
+                    feedback_cache.stats[key] = 0
+                samples, statuses = [], {}
+                start = time.perf_counter()
+                await asyncio.gather(*(
+                    _poll(client, ids, args.requests, revalidate, samples, statuses) for _ in range(args.clients)
+                ))
+                seconds = time.perf_counter() - start
+                stats = feedback_cache.get_feedback_cache_stats()
+                rows.append({
+                    "scenario": name,
+                    "req_per_s": round(len(samples) / seconds),
+                    "memory_hit_rate": stats["memory_hit_rate"],
+                    "redis_hits": stats["redis_hits"],
+                    "not_modified": statuses.get(304, 0),
+                    **percentiles(samples),
+                })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client")
+    parser.add_argument("--resumes", type=int, default=1_000)
+    parser.add_argument("--cache-size", type=int, default=2048)
+    parser.add_argument("--redis-url", help="Scratch Redis to run against instead of fakeredis")
+    args = parser.parse_args()
+    if args.redis_url:
+        import os
+        os.environ["REDIS_URL"] = args.redis_url
+    report("/resume-feedback polling", asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
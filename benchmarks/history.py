@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.common import percentiles, quiet, report
+
+# Review history listing on a seeded collection (1M reviews by default). Compares the
+# keyset-paginated, projected /history endpoint with skip/limit paging over full
+# documents at increasing depths for one heavy user. Needs a real MongoDB:
+#   MONGO_URI=mongodb://localhost:27017 python -m benchmarks.history --db bench_history
+# The target database's resume_reviews collection is dropped and reseeded unless --reuse.
+
+
+async def seed(collection, reviews: int, users: int, heavy_reviews: int) -> None:
+    from tests.fakes import feedback
+
+    body = feedback()
+    now = datetime.utcnow()
+    batch, docs = 10_000, []
+    for i in range(reviews):
+        clerk_id = "user_heavy" if i < heavy_reviews else f"user_{random.randrange(users)}"
+        docs.append({
+            "resume_id": f"r{i}",
+            "clerk_id": clerk_id,
+            "resume_url": f"https://res.example.com/upload/{i}.pdf",
+            "image_url": f"https://res.example.com/upload/pg_1,f_png/{i}.pdf",
+            "job_title": f"Engineer {i % 97}",
+            "job_description": "Backend engineer with Python and PostgreSQL. " * 20,
+            "feedback": body,
+            "created_at": now - timedelta(seconds=reviews - i),
+        })
+        if len(docs) == batch:
+            await collection.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        await collection.insert_many(docs, ordered=False)
+
+
+async def keyset_pages(clerk_id: str, pages: int, limit: int) -> list:
+    from app.routers.resume import get_review_history
+
+    samples, cursor = [], None
+    for _ in range(pages):
+        start = time.perf_counter()
+        page = await get_review_history(user_details={"user_id": clerk_id}, cursor=cursor, limit=limit)
+        samples.append(time.perf_counter() - start)
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    return samples
+
+
+async def skip_page(collection, clerk_id: str, depth: int, limit: int) -> float:
+    # Offset paging over whole documents, as a list built on find().skip() would do it
+    start = time.perf_counter()
+    await collection.find({"clerk_id": clerk_id}).sort([("created_at", -1), ("_id", -1)])\
+        .skip(depth).limit(limit).to_list(limit)
+    return time.perf_counter() - start
+
+
+async def run(args) -> list:
+    from beanie import init_beanie
+    from app.models.review import ResumeReview
+    from app.models.user import User
+    from app.utils.db import init_db, get_collection
+
+    quiet()
+    await init_db()
+    collection = get_collection(ResumeReview.Settings.name)
+    if not args.reuse:
+        await collection.drop()
+        # init_beanie recreates the declared indexes on the dropped collection
+        await init_beanie(database=collection.database, document_models=[User, ResumeReview])
+        start = time.perf_counter()
+        await seed(collection, args.reviews, args.users, args.heavy)
+        print(f"Seeded {args.reviews} reviews in {time.perf_counter() - start:.0f} s")
+
+    plan = await collection.find({"clerk_id": "user_heavy"}).sort([("created_at", -1), ("_id", -1)])\
+        .limit(args.limit).explain()
+    print("Winning plan:", plan["queryPlanner"]["winningPlan"].get("inputStage", {}).get("stage"))
+
+    rows = [{"path": "keyset + projection", "depth": f"{args.pages} pages",
+             **percentiles(await keyset_pages("user_heavy", args.pages, args.limit))}]
+    typical = await keyset_pages(f"user_{random.randrange(args.users)}", 1, args.limit)
+    rows.append({"path": "keyset + projection", "depth": "typical user", **percentiles(typical)})
+    for depth in (0, args.heavy // 10, args.heavy // 2, args.heavy - args.limit):
+        samples = [await skip_page(collection, "user_heavy", depth, args.limit) for _ in range(args.repeat)]
+        rows.append({"path": "skip + full documents", "depth": depth, **percentiles(samples)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="resume_reviewer_bench")
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--heavy", type=int, default=20_000, help="Reviews owned by the one heavy user")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reuse", action="store_true", help="Keep the existing seeded collection")
+    args = parser.parse_args()
+    os.environ["DB_NAME"] = args.db
+    report(f"Review history at {args.reviews} reviews", asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
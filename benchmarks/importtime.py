@@ -0,0 +1,82 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from benchmarks.common import report
+
+# Cold import of the API under python -X importtime, in a fresh interpreter with an
+# empty environment and no .env, as a serverless cold start sees it. Reports the total
+# for the target module and where the time goes, by top-level package (self time, so
+# nothing is counted twice) and by the slowest individual modules.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importtime(module: str) -> list:
+    # -> [(module, self_us, cumulative_us)] in import order
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd,
+            env={"PATH": os.environ.get("PATH", ""), "PYTHONPATH": ROOT},
+            capture_output=True,
+            text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    runs = [importtime(args.module) for _ in range(args.runs)]
+    totals = [next(cumulative for name, _, cumulative in run if name == args.module) / 1000 for run in runs]
+
+    # Per-package and per-module self time, median across runs
+    by_package, by_module = defaultdict(list), defaultdict(list)
+    for run in runs:
+        packages = defaultdict(int)
+        for name, self_us, _ in run:
+            packages[name.split(".")[0]] += self_us
+            by_module[name].append(self_us)
+        for package, self_us in packages.items():
+            by_package[package].append(self_us)
+
+    total_ms = statistics.median(totals)
+    package_rows = sorted(
+        ({"package": package, "self_ms": round(statistics.median(samples) / 1000, 1)} for package, samples in by_package.items()),
+        key=lambda row: -row["self_ms"],
+    )[:args.top]
+    for row in package_rows:
+        row["share"] = f"{row['self_ms'] / total_ms:.0%}"
+    module_rows = sorted(
+        ({"module": name, "self_ms": round(statistics.median(samples) / 1000, 1)} for name, samples in by_module.items()),
+        key=lambda row: -row["self_ms"],
+    )[:args.top]
+
+    report(f"import {args.module}, {args.runs} cold runs", [{
+        "median_ms": round(total_ms, 1),
+        "min_ms": round(min(totals), 1),
+        "max_ms": round(max(totals), 1),
+        "modules": len(runs[0]),
+    }])
+    report("Self time by top-level package (median)", package_rows)
+    report("Slowest modules (median self time)", module_rows)
+
+
+if __name__ == "__main__":
+    main()
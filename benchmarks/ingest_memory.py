@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import io
+import multiprocessing
+import time
+from benchmarks.common import peak_rss_mb, report
+
+# Memory used to ingest (and optionally extract) large and malicious uploads. Each case
+# runs in a fresh process so peak RSS belongs to that input alone; tracemalloc adds the
+# Python-level peak, which shows whether an oversized upload was ever held in full.
+MB = 1024 * 1024
+
+
+def _padded_pdf(size: int) -> bytes:
+    # A valid resume with a comment block pushing it to the requested size
+    from tests.fakes import resume_pdf
+
+    pdf = resume_pdf(2)
+    return pdf[:9] + b"%" + b"0" * max(0, size - len(pdf) - 2) + b"\n" + pdf[9:]
+
+
+def _cases(limit: int) -> dict:
+    # name -> (factory, declared size or None). Factories run in the child, so the
+    # parent never holds the big inputs.
+    from tests.fakes import make_pdf, resume_pdf, RESUME_LINES
+
+    return {
+        "resume-2p": (lambda: resume_pdf(2), True),
+        "at-limit": (lambda: _padded_pdf(limit - 1024), True),
+        "10x-limit-streamed": (lambda: _padded_pdf(10 * limit), False),
+        "10x-limit-declared": (lambda: _padded_pdf(10 * limit), True),
+        "encrypted": (lambda: resume_pdf(2).replace(b"trailer\n<< ", b"trailer\n<< /Encrypt 9 0 R "), True),
+        "linearized-100k-pages": (
+            lambda: b"%PDF-1.4\n99 0 obj\n<< /Linearized 1 /N 100000 >>\nendobj\n" + resume_pdf(1)[9:], True
+        ),
+        "page-bomb-2000p": (lambda: make_pdf([RESUME_LINES[:1]] * 2000), True),
+        "binary": (lambda: b"\x89PNG\r\n\x1a\n" + b"\x00" * (limit // 2), True),
+    }
+
+
+def _measure(name: str, extract: bool) -> dict:
+    import tracemalloc
+    from fastapi import UploadFile
+    from app.services import ingest
+    from app.services.config import settings
+    from app.services.extraction import PdfLimitError, extract_text
+
+    factory, declare = _cases(settings.PDF_MAX_BYTES)[name]
+    data = factory()
+    baseline = peak_rss_mb()
+    upload = UploadFile(file=io.BytesIO(data), size=len(data) if declare else None, filename=f"{name}.pdf")
+    del data
+
+    tracemalloc.start()
+    outcome, start = "ok", time.perf_counter()
+    try:
+        ingested = asyncio.run(ingest.ingest_upload(upload))
+        if extract and ingested.content_type == "application/pdf":
+            extract_text(ingested.data)
+    except ingest.UploadRejected as e:
+        outcome = str(e.status_code)
+    except PdfLimitError:
+        outcome = "pdf-limit"
+    seconds = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "case": name,
+        "input_mb": round(upload.file.getbuffer().nbytes / MB, 3),
+        "outcome": outcome,
+        "ms": round(seconds * 1000, 1),
+        "traced_peak_mb": round(traced_peak / MB, 2),
+        "rss_before_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    from app.services.config import settings
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--case", action="append", choices=sorted(_cases(settings.PDF_MAX_BYTES)))
+    parser.add_argument("--no-extract", action="store_true", help="Stop after ingestion")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for name in args.case or list(_cases(settings.PDF_MAX_BYTES)):
+        with context.Pool(1) as pool:
+            rows.append(pool.apply(_measure, (name, not args.no_extract)))
+    report(f"Ingestion memory (PDF_MAX_BYTES={settings.PDF_MAX_BYTES // MB} MiB)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import time
+from benchmarks.common import percentiles, quiet, report
+
+# What the metrics and tracing layer costs, with it off and on: the per-call price of
+# stage(), counters and histograms, and GET /health latency through the request-id and
+# HTTP metrics middleware. With opentelemetry-sdk installed, "tracing" records real
+# spans (no exporter); otherwise it measures the no-op API.
+
+MODES = {
+    "off": {"METRICS_ENABLED": False, "TRACING_ENABLED": False},
+    "metrics": {"METRICS_ENABLED": True, "TRACING_ENABLED": False},
+    "metrics+tracing": {"METRICS_ENABLED": True, "TRACING_ENABLED": True},
+}
+
+
+def _use_mode(mode: str) -> None:
+    from app.services.config import get_settings
+
+    for name, value in MODES[mode].items():
+        setattr(get_settings(), name, value)
+
+
+def _install_tracer() -> str:
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+    except ImportError:
+        return "no-op API" if _has_api() else "not installed"
+    trace.set_tracer_provider(TracerProvider())
+    return "sdk"
+
+
+def _has_api() -> bool:
+    try:
+        import opentelemetry  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def _stage_cost(iterations: int) -> float:
+    from app.services.metrics import stage
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with stage("bench"):
+            pass
+    return time.perf_counter() - start
+
+
+def _micro(mode: str, iterations: int) -> dict:
+    from app.services.metrics import CACHE_REQUESTS, STAGE_SECONDS
+
+    _use_mode(mode)
+    stage_seconds = asyncio.run(_stage_cost(iterations))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        CACHE_REQUESTS.inc("bench", "hit")
+    counter_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        STAGE_SECONDS.observe((i % 100) / 1000, "bench")
+    histogram_seconds = time.perf_counter() - start
+
+    per_call = lambda seconds: round(seconds / iterations * 1e9)
+    return {
+        "mode": mode,
+        "stage_ns": per_call(stage_seconds),
+        "counter_ns": per_call(counter_seconds),
+        "histogram_ns": per_call(histogram_seconds),
+    }
+
+
+async def _requests(mode: str, count: int) -> dict:
+    import httpx
+    from app.server import app
+
+    _use_mode(mode)
+    transport = httpx.ASGITransport(app=app)
+    samples = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(50):
+            await client.get("/health")
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get("/health")
+            response.raise_for_status()
+            samples.append(time.perf_counter() - start)
+    return {"mode": mode, **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    quiet()
+    tracer = _install_tracer()
+    report(f"Per-call cost, {args.iterations} calls (tracing: {tracer})", [_micro(mode, args.iterations) for mode in MODES])
+    report(
+        f"GET /health latency, {args.requests} requests",
+        [asyncio.run(_requests(mode, args.requests)) for mode in MODES],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import time
+from benchmarks.common import percentiles, quiet, report
+
+# /user-resumes listing: the old SCAN over every resume:* key with one GET each,
+# filtered by clerk_id in Python, against the per-user sorted set plus one MGET.
+# Runs on fakeredis by default; --redis-url points it at a real (scratch!) Redis.
+# SCAN uses COUNT 1000 (redis-py defaults to 10), which favours the old path.
+
+
+def _entry(clerk_id: str, index: int) -> dict:
+    from tests.fakes import feedback
+
+    return {
+        "clerk_id": clerk_id,
+        "job_title": f"Engineer {index}",
+        "job_description_hash": "0" * 64,
+        "resume_url": f"https://res.example.com/upload/{index}.pdf",
+        "image_url": f"https://res.example.com/upload/pg_1,f_png/{index}.pdf",
+        "feedback": feedback(),
+    }
+
+
+async def seed(redis_bytes, resumes: int, users: int) -> None:
+    from app.services import serializer
+    from app.services.cache import user_resumes_key
+
+    now = time.time()
+    batch = 5_000
+    for start in range(0, resumes, batch):
+        async with redis_bytes.pipeline(transaction=False) as pipe:
+            for i in range(start, min(start + batch, resumes)):
+                clerk_id = f"user_{i % users}"
+                pipe.setex(f"resume:r{i}", 86400, serializer.dumps(_entry(clerk_id, i)))
+                pipe.zadd(user_resumes_key(clerk_id), {f"r{i}": now + i})
+            await pipe.execute()
+
+
+async def scan_listing(redis_bytes, clerk_id: str, count: int) -> list:
+    # The listing as it was: every key in the keyspace, one round trip per key
+    from app.services import serializer
+
+    resumes = []
+    async for key in redis_bytes.scan_iter("resume:*", count=count):
+        data = await redis_bytes.get(key)
+        if data:
+            resume = serializer.loads(data)
+            if resume.get("clerk_id") == clerk_id:
+                resumes.append(resume)
+    return resumes
+
+
+async def run(args) -> list:
+    from contextlib import nullcontext
+    from app.routers.resume import get_user_resumes
+    from app.services.cache import async_redis_bytes_client
+    from tests.fakes import fake_redis
+
+    quiet()
+    with (nullcontext() if args.redis_url else fake_redis()):
+        redis_bytes = async_redis_bytes_client.resolve()
+        await seed(redis_bytes, args.resumes, args.users)
+
+        rows = []
+        for name, listing in (
+            ("scan + GET per key", lambda user: scan_listing(redis_bytes, user, args.scan_count)),
+            ("zset + MGET", lambda user: get_user_resumes(user_details={"user_id": user}, offset=0, limit=args.limit)),
+        ):
+            samples = []
+            for i in range(args.repeat):
+                start = time.perf_counter()
+                found = await listing(f"user_{i % args.users}")
+                samples.append(time.perf_counter() - start)
+            rows.append({"path": name, "resumes": args.resumes, "returned": len(found), **percentiles(samples)})
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scan-count", type=int, default=1000)
+    parser.add_argument("--redis-url", help="Scratch Redis to run against instead of fakeredis")
+    args = parser.parse_args()
+    if args.redis_url:
+        import os
+        os.environ["REDIS_URL"] = args.redis_url
+    report("/user-resumes listing", asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.common import percentiles, quiet, report, use_offline_env
+
+# Event-loop responsiveness under load: GET / latency on its own, then while N full
+# /api/resume/analyze requests run (real PDF extraction, a fake Gemini that takes
+# --llm-seconds and a blocking fake Cloudinary upload). Flat latency means nothing
+# on the analyze path blocks the loop.
+use_offline_env(RATE_LIMITS="default=1000000/minute,analyze=1000000/minute", LLM_DAILY_TOKEN_QUOTA=0)
+
+
+class BlockingUploader:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def upload(self, data, public_id: str, **kwargs):
+        time.sleep(self.seconds)
+        return {"secure_url": f"https://res.example.com/upload/{public_id}.pdf", "public_id": public_id}
+
+    def destroy(self, public_id: str, **kwargs):
+        return {"result": "ok"}
+
+
+async def _probe(client, duration: float, interval: float) -> list:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/")
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def _analyze(client, index: int, pdf: bytes) -> int:
+    from tests.fakes import JOB_DESCRIPTION
+
+    response = await client.post(
+        "/api/resume/analyze",
+        data={"jobTitle": f"Backend Engineer {index}", "jobDescription": JOB_DESCRIPTION},
+        files={"resume": ("resume.pdf", pdf, "application/pdf")},
+    )
+    return response.status_code
+
+
+async def run(args) -> list:
+    import httpx
+    from app.server import app
+    from app.routers import resume
+    from app.services import pipeline, storage
+    from app.utils.auth import get_current_user
+    from tests.fakes import FakeModel, fake_redis, feedback, installed_llm, resume_pdf
+
+    quiet()
+
+    async def no_mongo(*args, **kwargs):
+        return None
+
+    async def no_db():
+        return None
+
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "user_load"}
+    app.dependency_overrides[resume.ensure_db_initialized] = no_db
+    pipeline._save_to_mongo = no_mongo
+    storage._uploader = lambda: BlockingUploader(args.upload_seconds)
+    pdf = resume_pdf(args.pages)
+
+    rows = []
+    model = FakeModel(json.dumps(feedback()), delay=args.llm_seconds)
+    with fake_redis(), installed_llm(model, max_concurrency=args.analyses):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            idle = await _probe(client, args.duration, args.interval)
+            rows.append({"scenario": "idle", **percentiles(idle)})
+
+            start = time.perf_counter()
+            analyses = asyncio.gather(*(_analyze(client, i, pdf) for i in range(args.analyses)))
+            busy = await _probe(client, args.duration, args.interval)
+            statuses = await analyses
+            rows.append({"scenario": f"{args.analyses} analyses in flight", **percentiles(busy)})
+            print(f"{statuses.count(200)}/{len(statuses)} analyses succeeded in {time.perf_counter() - start:.1f} s")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analyses", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--llm-seconds", type=float, default=2.0)
+    parser.add_argument("--upload-seconds", type=float, default=0.5)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=0.01)
+    args = parser.parse_args()
+    report("GET / latency", asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
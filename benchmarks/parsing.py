@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from benchmarks.common import quiet, report
+
+# Cost of turning model output into validated Feedback, per response shape: the one-pass
+# fast path, the fallback for fenced or chatty output, and section repair (with an
+# instant stand-in for the repair call, so only parsing is timed). The two-step
+# json.loads + model_validate row is the baseline the fast path replaced.
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "llm_responses"
+
+
+async def _time_parse(text: str, iterations: int) -> float:
+    from app.services.generator import ResumeReviewGenerator
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await ResumeReviewGenerator.parse_feedback(text, "Review this resume.", "resume text")
+    return time.perf_counter() - start
+
+
+def _baseline(text: str, iterations: int) -> float:
+    from app.models.user import Feedback
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        Feedback.model_validate(json.loads(text)).model_dump()
+    return time.perf_counter() - start
+
+
+def main():
+    from app.services.generator import ResumeReviewGenerator
+    from tests.fakes import feedback
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+    quiet()
+    # Every repair row would log a warning per iteration
+    logging.getLogger("uvicorn.error").setLevel(logging.ERROR)
+
+    async def instant_repair(prompt: str, resume_text: str, schema=None) -> str:
+        section = prompt.rsplit('value of the "', 1)[1].split('"', 1)[0]
+        return json.dumps(feedback()[section])
+
+    ResumeReviewGenerator.call_gemini = instant_repair
+
+    rows = []
+    bare = (CORPUS / "ok_bare.json").read_text()
+    seconds = _baseline(bare, args.iterations)
+    rows.append({"response": "ok_bare.json (json.loads + validate)", "bytes": len(bare),
+                 "us_per_parse": round(seconds / args.iterations * 1e6, 1),
+                 "parses_per_s": round(args.iterations / seconds)})
+    for path in sorted(CORPUS.glob("ok_*")) + sorted(CORPUS.glob("repair_*")):
+        text = path.read_text()
+        seconds = asyncio.run(_time_parse(text, args.iterations))
+        rows.append({
+            "response": path.name,
+            "bytes": len(text),
+            "us_per_parse": round(seconds / args.iterations * 1e6, 1),
+            "parses_per_s": round(args.iterations / seconds),
+        })
+    report(f"Feedback parsing, {args.iterations} iterations each", rows)
+
+
+if __name__ == "__main__":
+    main()
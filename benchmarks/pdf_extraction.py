@@ -0,0 +1,76 @@
+import argparse
+import glob
+import multiprocessing
+import time
+from benchmarks.common import peak_rss_mb, report
+
+# Pages/sec and peak RSS per extraction backend over a PDF corpus. Each backend runs
+# in a fresh process so its peak RSS isn't masked by the one before it. The default
+# corpus is generated (1-20 page resumes); --corpus takes a directory of real PDFs.
+
+
+def synthetic_corpus(sizes=(1, 2, 5, 10, 20), lines: int = 45) -> list:
+    from tests.fakes import RESUME_LINES, make_pdf
+
+    corpus = []
+    for pages in sizes:
+        body = [(RESUME_LINES * (lines // len(RESUME_LINES) + 1))[:lines] for _ in range(pages)]
+        corpus.append((f"synthetic-{pages}p.pdf", make_pdf(body)))
+    return corpus
+
+
+def load_corpus(directory: str) -> list:
+    corpus = []
+    for path in sorted(glob.glob(f"{directory}/*.pdf")):
+        with open(path, "rb") as f:
+            corpus.append((path, f.read()))
+    return corpus
+
+
+def _measure(backend: str, corpus: list, repeat: int) -> dict:
+    # Runs in the child: straight to the backend, bypassing the page cache and pool
+    from app.services import extraction
+
+    count_pages, read_pages = extraction.BACKENDS[backend]
+    baseline = peak_rss_mb()
+    pages = chars = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, data in corpus:
+            page_count = count_pages(data)
+            text = read_pages(data, 0, page_count)
+            pages += page_count
+            chars += sum(len(page) for page in text)
+    seconds = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "documents": len(corpus) * repeat,
+        "pages": pages,
+        "pages_per_s": round(pages / seconds, 1),
+        "ms_per_doc": round(seconds * 1000 / (len(corpus) * repeat), 2),
+        "chars": chars,
+        "rss_before_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    from app.services.extraction import BACKENDS
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="Directory of PDFs (default: generated resumes)")
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for backend in args.backend or sorted(BACKENDS):
+        with context.Pool(1) as pool:
+            rows.append(pool.apply(_measure, (backend, corpus, args.repeat)))
+    report(f"PDF extraction over {len(corpus)} documents", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+from benchmarks.common import report
+
+# Keyword/ATS scoring throughput: pairs per second for single calls and for batches of
+# many resumes against one JD (batch-resumes) and one resume against many JDs
+# (batch-jobs). Every resume gets a unique line so extract_keywords' cache only helps
+# where the app would hit it too: a JD repeated across the batch.
+
+
+def _corpus(count: int) -> list:
+    from tests.fakes import RESUME_LINES
+
+    return [
+        "\n".join(RESUME_LINES * (1 + i % 4)) + f"\nProject {i}: service-{i} on cluster-{i % 7}"
+        for i in range(count)
+    ]
+
+
+def _jobs(count: int) -> list:
+    from tests.fakes import JOB_DESCRIPTION
+
+    return [f"{JOB_DESCRIPTION} Team {i} also uses tool-{i} and Terraform." for i in range(count)]
+
+
+def _run(label: str, resumes: list, jobs: list, batch: int) -> dict:
+    from app.services.scoring import extract_keywords, score_pairs
+
+    extract_keywords.cache_clear()
+    start = time.perf_counter()
+    for offset in range(0, len(resumes), batch):
+        score_pairs(resumes[offset:offset + batch], jobs[offset:offset + batch])
+    seconds = time.perf_counter() - start
+    return {
+        "mode": label,
+        "batch": batch,
+        "pairs": len(resumes),
+        "pairs_per_s": round(len(resumes) / seconds),
+        "us_per_pair": round(seconds / len(resumes) * 1e6, 1),
+    }
+
+
+def main():
+    from tests.fakes import JOB_DESCRIPTION, RESUME_LINES
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=5_000)
+    args = parser.parse_args()
+
+    resumes = _corpus(args.pairs)
+    jobs = _jobs(args.pairs)
+    rows = [_run("single pair", resumes, jobs, 1)]
+    for batch in (10, 50, 500):
+        rows.append(_run("resumes x one JD", resumes, [JOB_DESCRIPTION] * args.pairs, batch))
+    for batch in (10, 50, 500):
+        rows.append(_run("one resume x JDs", ["\n".join(RESUME_LINES)] * args.pairs, jobs, batch))
+    report("Keyword scoring throughput", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import random
+import tempfile
+import time
+from benchmarks.common import percentiles, report
+
+# Recall and latency of the memory-mapped index against brute-force NumPy over the same
+# vectors, for the full index (recruiters) and for a search restricted to one user's few
+# documents. Documents are generated from the skills vocabulary so they embed like
+# resumes; --dim and --size match production settings when needed. The target is a
+# p95 under 50 ms at 1M documents; each row says whether it was met. Exact search reads
+# every vector once (512 MB at 1M x 128 float32), so on a single core it is bound by
+# memory bandwidth and misses the target at 1M.
+TARGET_MS = 50
+
+
+def _documents(count: int, seed: int = 7) -> list:
+    from app.services.scoring import SKILLS
+
+    vocabulary = sorted(SKILLS)
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(vocabulary, rng.randint(8, 40))) + f" project-{i}" for i in range(count)]
+
+
+def _recall(found: list, true_scores: dict, k: int) -> float:
+    # Ties at the k-th score can legitimately go either way, so a hit is any result
+    # scoring at least as well as brute force's k-th best
+    ranked = sorted(true_scores.values(), reverse=True)
+    if not ranked:
+        return 1.0
+    threshold = ranked[min(k, len(ranked)) - 1] - 1e-6
+    return sum(true_scores[doc_id] >= threshold for doc_id in found) / min(k, len(ranked))
+
+
+def _run(size: int, dim: int, k: int, queries: int, own: int) -> list:
+    import numpy as np
+    from app.services.search_index import VectorIndex, embed
+
+    documents = _documents(size)
+    vectors = np.stack([embed(text, dim) for text in documents])
+    ids = [f"doc-{row}" for row in range(size)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(directory, "bench", dim)
+        start = time.perf_counter()
+        for doc_id, vector in zip(ids, vectors):
+            index.add(doc_id, vector)
+        build_seconds = time.perf_counter() - start
+
+        rng = random.Random(11)
+        results = {"index": ([], []), "brute force": ([], []), "index, own docs": ([], [])}
+        for query_text in _documents(queries, seed=13):
+            query = embed(query_text, dim)
+
+            start = time.perf_counter()
+            scores = vectors @ query
+            top = np.argsort(-scores, kind="stable")[:k]
+            results["brute force"][0].append(time.perf_counter() - start)
+            results["brute force"][1].append(1.0)
+            true_scores = dict(zip(ids, scores.tolist()))
+
+            start = time.perf_counter()
+            found = [doc_id for doc_id, _ in index.search(query, k)]
+            results["index"][0].append(time.perf_counter() - start)
+            results["index"][1].append(_recall(found, true_scores, k))
+
+            within = set(rng.sample(ids, min(own, size)))
+            start = time.perf_counter()
+            found = [doc_id for doc_id, _ in index.search(query, k, within)]
+            results["index, own docs"][0].append(time.perf_counter() - start)
+            results["index, own docs"][1].append(_recall(found, {doc_id: true_scores[doc_id] for doc_id in within}, k))
+
+    rows = []
+    for method, (latencies, recalls) in results.items():
+        stats = percentiles(latencies)
+        rows.append({
+            "size": size,
+            "method": method,
+            f"recall@{k}": round(sum(recalls) / len(recalls), 4),
+            "p50_ms": stats["p50_ms"],
+            "p95_ms": stats["p95_ms"],
+            "p99_ms": stats["p99_ms"],
+            f"p95<{TARGET_MS}ms": "met" if stats["p95_ms"] < TARGET_MS else "MISSED",
+            "build_s": round(build_seconds, 1) if method == "index" else "",
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, action="append", help="Documents to index (repeatable)")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--own", type=int, default=20, help="Documents one non-recruiter owns")
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.size or [10_000, 100_000]:
+        rows.extend(_run(size, args.dim, args.k, args.queries, args.own))
+    report(f"Semantic search, dim={args.dim}", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import time
+from benchmarks.common import report
+
+# Bytes per cached review and encode/decode time: the old pretty-printed JSON with the
+# job description embedded, against the versioned serializer storing the description
+# once under its hash. orjson is measured too when installed, as a candidate codec.
+
+
+def _cache_entries(count: int, jd_words: int) -> tuple:
+    from app.services.cache import job_description_key
+    from tests.fakes import JOB_DESCRIPTION, feedback
+
+    job_description = " ".join((JOB_DESCRIPTION.split() * (jd_words // 30 + 1))[:jd_words])
+    body = feedback()
+    body["ATS"]["tips"] = body["ATS"]["tips"] * 6
+    old, new = [], []
+    for i in range(count):
+        entry = {
+            "clerk_id": f"user_{i}",
+            "job_title": "Backend Engineer",
+            "resume_url": f"https://res.cloudinary.com/demo/upload/resumes/{i}.pdf",
+            "image_url": f"https://res.cloudinary.com/demo/upload/pg_1,f_png/resumes/{i}.pdf",
+            "feedback": body,
+        }
+        old.append({**entry, "job_description": job_description})
+        new.append({**entry, "job_description_hash": job_description_key(job_description)[0]})
+    return old, new, job_description
+
+
+def _time(fn, items: list, repeat: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [fn(item) for item in items]
+    return results, (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+
+def _row(name: str, dumps, loads, entries: list, repeat: int, shared_bytes: int = 0) -> dict:
+    encoded, encode_us = _time(dumps, entries, repeat)
+    _, decode_us = _time(loads, encoded, repeat)
+    per_entry = sum(len(data) for data in encoded) / len(encoded)
+    return {
+        "format": name,
+        "bytes_per_entry": round(per_entry + shared_bytes / len(entries)),
+        "encode_us": round(encode_us, 1),
+        "decode_us": round(decode_us, 1),
+    }
+
+
+def main():
+    from app.services import serializer
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=2_000)
+    parser.add_argument("--reviews-per-jd", type=int, default=20, help="Reviews sharing one job description")
+    parser.add_argument("--jd-words", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    old, new, job_description = _cache_entries(args.entries, args.jd_words)
+    # The deduplicated description is written once per distinct JD, not per review
+    jd_bytes = len(serializer.dumps({"text": job_description})) * (args.entries // args.reviews_per_jd)
+
+    rows = [
+        _row("json.dumps(indent=4), JD inline (before)",
+             lambda o: json.dumps(o, indent=4).encode(), json.loads, old, args.repeat),
+        _row("json.dumps, JD inline", lambda o: json.dumps(o).encode(), json.loads, old, args.repeat),
+        _row("serializer, JD inline", serializer.dumps, serializer.loads, old, args.repeat),
+        _row("serializer, JD by hash (current)", serializer.dumps, serializer.loads, new, args.repeat, jd_bytes),
+    ]
+    try:
+        import orjson
+        import zlib
+        rows.append(_row(
+            "orjson + zlib, JD by hash", lambda o: zlib.compress(orjson.dumps(o), 6),
+            lambda b: orjson.loads(zlib.decompress(b)), new, args.repeat, jd_bytes,
+        ))
+    except ImportError:
+        pass
+    report(f"Cached review payloads ({args.entries} entries, {args.reviews_per_jd} reviews per JD)", rows)
+
+
+if __name__ == "__main__":
+    main()
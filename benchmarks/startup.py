@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from benchmarks.common import percentiles, report
+
+# Cold start of the API, each sample in a fresh interpreter: importing app.server,
+# running the lifespan (one Motor client + init_beanie) and serving the first request.
+# Then the per-request cost of the routers' ensure_db_initialized once warm, against
+# the old behaviour of building a client and re-running init_beanie on every request.
+# Without a reachable MONGO_URI the database rows report the failure instead.
+
+
+async def _legacy_init():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from beanie import init_beanie
+    from app.models.user import User
+    from app.models.review import ResumeReview
+    from app.services.config import settings
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    await init_beanie(database=client[settings.DB_NAME], document_models=[User, ResumeReview])
+
+
+async def _child(requests: int) -> dict:
+    start = time.perf_counter()
+    import httpx
+    from app.server import app
+    from app.routers.resume import ensure_db_initialized
+    from benchmarks.common import quiet
+
+    quiet()
+    result = {"import_s": time.perf_counter() - start}
+
+    began = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        result["lifespan_s"] = time.perf_counter() - began
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            began = time.perf_counter()
+            (await client.get("/health")).raise_for_status()
+            result["first_request_s"] = time.perf_counter() - began
+        result["ready_s"] = time.perf_counter() - start
+
+        try:
+            from app.utils.db import db_health
+            await db_health()
+        except Exception as e:
+            result["db_error"] = repr(e)[:80]
+            return result
+
+        for name, init in (("warm", ensure_db_initialized), ("legacy", _legacy_init)):
+            samples = []
+            for _ in range(requests):
+                began = time.perf_counter()
+                await init()
+                samples.append(time.perf_counter() - began)
+            result[name] = samples
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.requests))))
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child", "--requests", str(args.requests)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    report("Cold start (fresh interpreter per run)", [
+        {"phase": phase.removesuffix("_s"), **percentiles([run[phase] for run in runs])}
+        for phase in ("import_s", "lifespan_s", "first_request_s", "ready_s")
+    ])
+    if "db_error" in runs[0]:
+        print(f"\nDatabase unavailable, per-request init not measured: {runs[0]['db_error']}")
+        return
+    report("Per-request DB init", [
+        {"path": "ensure_db_initialized (shared client)", **percentiles(sum((run["warm"] for run in runs), []))},
+        {"path": "new client + init_beanie (before)", **percentiles(sum((run["legacy"] for run in runs), []))},
+    ])
+
+
+if __name__ == "__main__":
+    main()
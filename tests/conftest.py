@@ -0,0 +1,21 @@
+import pytest
+from tests.fakes import use_offline_env, fake_redis
+
+# Settings are read lazily, so the environment only has to be in place before first use
+use_offline_env()
+
+
+@pytest.fixture
+def redis():
+    with fake_redis() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    # Module-level singletons bind to the event loop of the test that created them
+    from app.services import executors, llm
+
+    yield
+    executors._analyze_semaphore = None
+    llm._client = None
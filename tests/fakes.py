@@ -0,0 +1,415 @@
+import asyncio
+import json
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+# Shared stand-ins for tests and benchmarks: a complete offline environment, an
+# in-process Redis, a scriptable Gemini model and HTTP server, local Clerk signing
+# keys and small generated PDFs.
+
+OFFLINE_ENV = {
+    "GEMINI_API_KEY": "test-key",
+    "REDIS_URL": "redis://127.0.0.1:1/0",
+    "CLERK_SECRET_KEY": "sk_test",
+    "JWT_SECRET_KEY": "test-secret",
+    "MONGO_URI": "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=100",
+    "DB_NAME": "resume_reviewer_test",
+    "CLOUDINARY_CLOUD_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+    "SEARCH_INDEX_ENABLED": "false",
+}
+
+
+def use_offline_env(**overrides) -> None:
+    # Real variables win, so a benchmark can still be pointed at live services
+    for name, value in {**OFFLINE_ENV, **overrides}.items():
+        os.environ.setdefault(name, str(value))
+
+
+# ---------- Redis ----------
+@contextmanager
+def fake_redis(server=None):
+    # Both lazy clients share one FakeServer, like the text and bytes clients share Redis
+    import fakeredis
+    from app.services import cache
+
+    server = server or fakeredis.FakeServer()
+    text = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    raw = fakeredis.aioredis.FakeRedis(server=server)
+    cache.async_redis_client.use(text)
+    cache.async_redis_bytes_client.use(raw)
+    try:
+        yield text
+    finally:
+        cache.async_redis_client.use(None)
+        cache.async_redis_bytes_client.use(None)
+
+
+# ---------- LLM ----------
+def feedback(score: float = 72) -> dict:
+    section = {"score": score, "tips": [{"type": "good", "tip": "Clear layout", "explanation": "Easy to scan"}]}
+    return {
+        "overallScore": score,
+        "ATS": section,
+        "toneAndStyle": section,
+        "content": section,
+        "structure": section,
+        "skills": section,
+        "recommendation": {"roles": ["Backend Engineer"], "responsibilities": ["Own the API"]},
+    }
+
+
+def usage(prompt_tokens: int = 1200, output_tokens: int = 300, cached_tokens: int = 0):
+    return SimpleNamespace(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=output_tokens,
+        cached_content_token_count=cached_tokens,
+    )
+
+
+class FakeStream:
+    def __init__(self, chunks, delay: float):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield SimpleNamespace(text=chunk)
+
+
+class FakeModel:
+    # Stands in for genai.GenerativeModel. Each call takes the next scripted outcome:
+    # a string is the response text, an exception is raised; the last one repeats.
+
+    def __init__(self, *outcomes, delay: float = 0.0, chunk_size: int = 64, cached_tokens: int = 0):
+        self.outcomes = list(outcomes) or [json.dumps(feedback())]
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.cached_tokens = cached_tokens
+        self.calls = []
+
+    def _next(self):
+        return self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+
+    async def generate_content_async(self, contents, stream: bool = False, **kwargs):
+        self.calls.append(contents)
+        outcome = self._next()
+        if stream:
+            if isinstance(outcome, BaseException):
+                raise outcome
+            text = outcome if isinstance(outcome, str) else "".join(outcome)
+            chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+            return FakeStream(chunks, self.delay)
+        await asyncio.sleep(self.delay)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return SimpleNamespace(text=outcome, usage_metadata=usage(cached_tokens=self.cached_tokens))
+
+
+class FakeCacheBackend:
+    # Stands in for the genai caching backend of PrefixCache. Each create or refresh takes
+    # the next scripted outcome: None succeeds, an exception is raised; the last one repeats.
+
+    def __init__(self, *outcomes, tokens: int = 2048):
+        self.outcomes = list(outcomes) or [None]
+        self.token_count = tokens
+        self.created = []
+        self.refreshed = []
+        self.models = {}
+
+    def _next(self):
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, BaseException):
+            raise outcome
+
+    def create(self, prefix: str, ttl: float):
+        self._next()
+        handle = f"cachedContents/{len(self.created)}"
+        self.created.append((prefix, ttl))
+        return handle
+
+    def refresh(self, handle, ttl: float) -> None:
+        self._next()
+        self.refreshed.append((handle, ttl))
+
+    def model(self, handle):
+        return self.models.setdefault(handle, FakeModel(cached_tokens=self.token_count))
+
+    def tokens(self, handle) -> int:
+        return self.token_count
+
+
+def make_llm_client(model: FakeModel, **overrides):
+    # A real LLMClient (breaker, semaphore, retries, prefix resolution) around a fake model
+    from app.services.llm import LLMClient, CircuitBreaker
+
+    options = {
+        "model_name": "gemini-test",
+        "api_key": "test-key",
+        "timeout": 5.0,
+        "max_concurrency": 4,
+        "max_retries": 0,
+        "breaker": CircuitBreaker(failure_threshold=2, reset_timeout=60.0),
+        **overrides,
+    }
+    client = LLMClient(**options)
+    client.model = model
+    return client
+
+
+@contextmanager
+def installed_llm(model: FakeModel, **overrides):
+    # get_llm_client() hands out this client until the block exits
+    from app.services import llm
+
+    client = make_llm_client(model, **overrides)
+    previous, llm._client = llm._client, client
+    try:
+        yield client
+    finally:
+        llm._client = previous
+
+
+class FakeGeminiServer:
+    # A local HTTP endpoint speaking enough of the Gemini REST API for generate and
+    # stream calls, for tests that go through the real SDK (GEMINI_API_ENDPOINT).
+    # Each request takes the next scripted (status, text) pair; the last one repeats.
+
+    def __init__(self, *responses):
+        self.responses = list(responses) or [(200, json.dumps(feedback()))]
+        self.requests = []
+
+    def _next(self):
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+    @staticmethod
+    def chunk(text: str) -> dict:
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}],
+            "usageMetadata": {"promptTokenCount": 1200, "candidatesTokenCount": 300, "totalTokenCount": 1500},
+        }
+
+    def __enter__(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("content-length") or 0))
+                server.requests.append((self.path, json.loads(body or b"{}")))
+                status, text = server._next()
+                if status != 200:
+                    payload = {"error": {"code": status, "message": text}}
+                elif "streamGenerateContent" in self.path:
+                    # REST streaming is one JSON array, one element per chunk
+                    payload = [server.chunk(text[i:i + 16]) for i in range(0, len(text), 16)]
+                else:
+                    payload = server.chunk(text)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self.endpoint = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# ---------- Auth ----------
+class FakeClerk:
+    # Local RSA signing keys, a JWKS endpoint serving the public halves and a token
+    # minter. Keys can be rotated while the endpoint runs.
+
+    def __init__(self):
+        self.keys = {}
+        self.published = []
+        self.fetches = 0
+        self.rotate()
+
+    def rotate(self, publish: bool = True) -> str:
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        kid = f"key-{len(self.keys) + 1}"
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        if publish:
+            self.published.append(kid)
+        return kid
+
+    def jwks(self) -> dict:
+        import jwt
+
+        keys = []
+        for kid in self.published:
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.keys[kid].public_key()))
+            keys.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        return {"keys": keys}
+
+    def token(self, kid: str = None, sub: str = "user_1", expires_in: int = 60, **claims) -> str:
+        import time
+        import jwt
+
+        kid = kid or self.published[-1]
+        now = int(time.time())
+        payload = {"sub": sub, "iat": now, "nbf": now, "exp": now + expires_in, **claims}
+        return jwt.encode(payload, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    def __enter__(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        clerk = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                clerk.fetches += 1
+                data = json.dumps(clerk.jwks()).encode()
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1/jwks"
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+# ---------- Mongo ----------
+class FakeUsersCollection:
+    # In-memory stand-in for the users collection: enough of bulk_write for the Clerk
+    # sync operations (equality and $not/$gt filters, $set/$unset/$setOnInsert, upserts)
+    # with the unique clerk_id index, counting round-trips and operations.
+
+    def __init__(self):
+        self.documents = {}
+        self.bulk_writes = 0
+        self.operations = 0
+        self.stale = 0
+
+    @staticmethod
+    def _matches(document: dict, query: dict) -> bool:
+        for field, condition in query.items():
+            value = document.get(field)
+            if isinstance(condition, dict) and "$not" in condition:
+                bound = condition["$not"]["$gt"]
+                if value is not None and value > bound:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def _apply(self, operation) -> None:
+        query, update = operation._filter, operation._doc
+        clerk_id = query["clerk_id"]
+        document = self.documents.get(clerk_id)
+        if document is not None and not self._matches(document, query):
+            # The upsert would insert a second clerk_id and hit the unique index
+            raise KeyError(clerk_id)
+        inserting = document is None
+        document = document if document is not None else {"clerk_id": clerk_id}
+        document.update(update.get("$set", {}))
+        for field in update.get("$unset", {}):
+            document.pop(field, None)
+        if inserting:
+            document.update(update.get("$setOnInsert", {}))
+        self.documents[clerk_id] = document
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        from pymongo.errors import BulkWriteError
+
+        self.bulk_writes += 1
+        errors = []
+        for index, operation in enumerate(operations):
+            self.operations += 1
+            try:
+                self._apply(operation)
+            except KeyError:
+                self.stale += 1
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key", "op": {"q": operation._filter}})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+# ---------- PDFs ----------
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def make_pdf(pages: list) -> bytes:
+    # Minimal PDF 1.4 writer: one Helvetica text stream per page, lines top to bottom
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"{_pdf_string(line)} Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+RESUME_LINES = [
+    "Jane Doe - Senior Backend Engineer",
+    "Python, FastAPI, PostgreSQL, Redis, Docker, Kubernetes, AWS",
+    "Built REST APIs serving 2M requests per day with FastAPI and Redis caching",
+    "Led migration of a monolith to microservices on Kubernetes",
+    "Mentored four engineers and ran the on-call rotation",
+    "Designed CI/CD pipelines with GitHub Actions and Terraform",
+]
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer with Python, FastAPI and PostgreSQL experience. "
+    "You will design REST APIs, run services on Kubernetes and AWS, and mentor engineers. "
+    "Experience with Redis, Kafka and CI/CD is a plus."
+)
+
+
+def resume_pdf(pages: int = 2) -> bytes:
+    return make_pdf([RESUME_LINES * 4 for _ in range(pages)])
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import time
+import pytest
+from tests.fakes import FakeModel, JOB_DESCRIPTION, feedback, installed_llm, resume_pdf
+
+
+class SlowUploader:
+    def upload(self, data, public_id: str, **kwargs):
+        time.sleep(0.3)
+        return {"secure_url": f"https://res.example.com/upload/{public_id}.pdf", "public_id": public_id}
+
+    def destroy(self, public_id: str, **kwargs):
+        return {"result": "ok"}
+
+
+@pytest.fixture
+def analyze_app(redis, monkeypatch):
+    from app.server import app
+    from app.routers import resume
+    from app.services import pipeline, storage
+    from app.utils.auth import get_current_user
+
+    async def noop(*args, **kwargs):
+        return None
+
+    async def no_db():
+        return None
+
+    monkeypatch.setattr(pipeline, "_save_to_mongo", noop)
+    monkeypatch.setattr(storage, "_uploader", lambda: SlowUploader())
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: {"user_id": "user_1"})
+    monkeypatch.setitem(app.dependency_overrides, resume.ensure_db_initialized, no_db)
+    return app
+
+
+def test_get_stays_responsive_while_analyses_run(analyze_app):
+    import httpx
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=analyze_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analyses = asyncio.gather(*(
+                client.post(
+                    "/api/resume/analyze",
+                    data={"jobTitle": f"Engineer {i}", "jobDescription": JOB_DESCRIPTION},
+                    files={"resume": ("resume.pdf", resume_pdf(), "application/pdf")},
+                )
+                for i in range(4)
+            ))
+            await asyncio.sleep(0.05)
+            latencies = []
+            for _ in range(10):
+                start = time.perf_counter()
+                assert (await client.get("/")).status_code == 200
+                latencies.append(time.perf_counter() - start)
+            return latencies, await analyses
+
+    with installed_llm(FakeModel(json.dumps(feedback()), delay=0.5)):
+        latencies, responses = asyncio.run(scenario())
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert all("resume_url" in r.json() for r in responses)
+    # A blocked loop would hold these for the whole 0.5 s LLM call or 0.3 s upload
+    assert max(latencies) < 0.25
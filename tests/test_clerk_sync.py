@@ -0,0 +1,151 @@
+import asyncio
+import random
+import pytest
+from app.services import clerk_sync
+from app.services.config import get_settings
+from tests.fakes import FakeUsersCollection
+
+
+def event(event_type: str, clerk_id: str = "user_1", version: int = 1000, email: str = None) -> dict:
+    if event_type == "user.deleted":
+        return {"type": event_type, "timestamp": version, "data": {"id": clerk_id, "deleted": True}}
+    email = email or f"{clerk_id}+{version}@example.com"
+    return {
+        "type": event_type,
+        "timestamp": version + 5,
+        "data": {
+            "id": clerk_id,
+            "updated_at": version,
+            "first_name": "Jane",
+            "primary_email_address_id": "email_1",
+            "email_addresses": [{"id": "email_1", "email_address": email}],
+        },
+    }
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = FakeUsersCollection()
+    monkeypatch.setattr(clerk_sync, "get_collection", lambda name: collection)
+    monkeypatch.setattr(clerk_sync, "_bulk_writer", None)
+    return collection
+
+
+def apply_all(events: list) -> None:
+    async def run():
+        for item in events:
+            await clerk_sync.apply_event(item)
+
+    asyncio.run(run())
+
+
+def test_replayed_update_after_delete_does_not_resurrect(users):
+    apply_all([event("user.created", version=1000), event("user.updated", version=2000), event("user.deleted", version=3000)])
+    apply_all([event("user.updated", version=2000), event("user.created", version=1000)])
+
+    user = users.documents["user_1"]
+    assert user["deleted_at"] is not None
+    assert "email" not in user and "first_name" not in user
+    assert user["clerk_updated_at"] == 3000
+
+
+def test_out_of_order_update_keeps_the_newer_profile(users):
+    apply_all([event("user.updated", version=2000), event("user.updated", version=1500)])
+
+    assert users.documents["user_1"]["email"] == "user_1+2000@example.com"
+
+
+def test_newer_update_after_delete_applies(users):
+    apply_all([event("user.deleted", version=3000), event("user.updated", version=4000)])
+
+    user = users.documents["user_1"]
+    assert user["email"] == "user_1+4000@example.com"
+    assert "deleted_at" not in user
+
+
+def test_batched_events_in_any_order_reach_the_in_order_state(users, monkeypatch):
+    monkeypatch.setattr(get_settings(), "CLERK_WEBHOOK_BATCH", True)
+    history = []
+    for user in range(20):
+        history += [event("user.created", f"user_{user}", 1000), event("user.updated", f"user_{user}", 2000)]
+        if user % 3 == 0:
+            history.append(event("user.deleted", f"user_{user}", 3000))
+
+    expected = FakeUsersCollection()
+    monkeypatch.setattr(clerk_sync, "get_collection", lambda name: expected)
+    apply_all(history)
+
+    monkeypatch.setattr(clerk_sync, "get_collection", lambda name: users)
+    shuffled = history + history[:15]
+    random.Random(3).shuffle(shuffled)
+
+    async def deliver_concurrently():
+        await asyncio.gather(*(clerk_sync.apply_event(item) for item in shuffled))
+
+    asyncio.run(deliver_concurrently())
+
+    strip = lambda docs: {key: {f: v for f, v in doc.items() if f not in ("updated_at", "created_at", "deleted_at")}
+                          for key, doc in docs.items()}
+    assert strip(users.documents) == strip(expected.documents)
+    assert users.bulk_writes < len(shuffled)
+
+
+class RacingUsers(FakeUsersCollection):
+    # Each upsert looks the user up, yields, then writes, like two servers racing on the
+    # unique index: an insert for a user created in between fails with a duplicate key
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        from pymongo.errors import BulkWriteError
+
+        clerk_id = operations[0]._filter["clerk_id"]
+        existed = clerk_id in self.documents
+        await asyncio.sleep(0.01)
+        if not existed and clerk_id in self.documents:
+            self.bulk_writes += 1
+            self.operations += 1
+            raise BulkWriteError({"writeErrors": [
+                {"index": 0, "code": 11000, "errmsg": "E11000 duplicate key", "op": {"q": operations[0]._filter}},
+            ]})
+        return await super().bulk_write(operations, ordered)
+
+
+@pytest.mark.parametrize("order", [(1000, 2000), (2000, 1000)])
+def test_concurrent_first_writes_keep_the_newer_event(monkeypatch, order):
+    users = RacingUsers()
+    monkeypatch.setattr(clerk_sync, "get_collection", lambda name: users)
+
+    async def deliver_concurrently():
+        await asyncio.gather(*(clerk_sync.apply_event(event("user.created", version=version)) for version in order))
+
+    asyncio.run(deliver_concurrently())
+
+    user = users.documents["user_1"]
+    assert user["clerk_updated_at"] == 2000
+    assert user["email"] == "user_1+2000@example.com"
+
+
+def test_other_write_errors_still_fail_the_event(users, monkeypatch):
+    from pymongo.errors import BulkWriteError
+
+    async def failing(operations, ordered=True):
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "Document failed validation"}]})
+
+    monkeypatch.setattr(users, "bulk_write", failing)
+    with pytest.raises(RuntimeError, match="validation"):
+        apply_all([event("user.updated")])
+
+
+def test_invalid_events_are_rejected():
+    with pytest.raises(clerk_sync.InvalidEvent):
+        clerk_sync.user_operation({"type": "user.updated", "data": {}})
+    with pytest.raises(clerk_sync.InvalidEvent):
+        clerk_sync.user_operation({"type": "user.updated", "data": {"id": "user_1"}})
+
+
+def test_svix_ids_are_claimed_once(redis):
+    async def run():
+        first = await clerk_sync.claim_event("msg_1")
+        second = await clerk_sync.claim_event("msg_1")
+        await clerk_sync.release_event("msg_1")
+        return first, second, await clerk_sync.claim_event("msg_1")
+
+    assert asyncio.run(run()) == (True, False, True)
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from app.models.user import Feedback
+from app.services import feedback_cache, serializer
+from tests.fakes import feedback
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    feedback_cache._get_local().clear()
+    for name in feedback_cache.stats:
+        feedback_cache.stats[name] = 0
+    yield
+    feedback_cache._get_local().clear()
+
+
+@pytest.fixture
+def http(redis, monkeypatch):
+    import httpx
+    from app.server import app
+    from app.routers import resume
+
+    async def no_db():
+        return None
+
+    monkeypatch.setitem(app.dependency_overrides, resume.ensure_db_initialized, no_db)
+
+    def get(path: str, **kwargs):
+        async def send():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(path, **kwargs)
+        return asyncio.run(send())
+
+    return get
+
+
+def _store(redis, resume_id: str) -> None:
+    payload = {"resume_url": "https://res.example.com/r.pdf", "image_url": "https://res.example.com/r.png",
+               "feedback": feedback(), "clerk_id": "user_1"}
+    asyncio.run(redis.set(f"resume:{resume_id}", serializer.dumps(payload)))
+
+
+def test_redis_then_memory_hits(redis):
+    _store(redis, "r1")
+
+    first = asyncio.run(feedback_cache.get_feedback("r1"))
+    second = asyncio.run(feedback_cache.get_feedback("r1"))
+
+    assert first is second
+    assert feedback_cache.stats["redis_hits"] == 1 and feedback_cache.stats["memory_hits"] == 1
+    assert feedback_cache.get_feedback_cache_stats()["hit_rate"] == 1.0
+
+
+def test_mongo_fallback_when_redis_copy_expired(redis, monkeypatch):
+    review = SimpleNamespace(
+        image_url="https://res.example.com/r.png", resume_url="https://res.example.com/r.pdf",
+        feedback=Feedback(**feedback()),
+    )
+
+    class Reviews:
+        resume_id = "r2"
+
+        @staticmethod
+        async def find_one(query):
+            return review if query else None
+
+    monkeypatch.setattr(feedback_cache, "ResumeReview", Reviews)
+    entry = asyncio.run(feedback_cache.get_feedback("r2"))
+
+    assert entry is not None and feedback_cache.stats["mongo_hits"] == 1
+    assert b'"overallScore":72' in entry.body
+
+
+def test_endpoint_etag_and_304(http, redis):
+    _store(redis, "r3")
+
+    response = http("/api/resume/resume-feedback/r3")
+    assert response.status_code == 200
+    assert response.json()["feedback"] == feedback()
+    etag = response.headers["etag"]
+    assert "immutable" in response.headers["cache-control"]
+
+    revalidated = http("/api/resume/resume-feedback/r3", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag and not revalidated.content
+
+
+def test_endpoint_404_for_unknown_resume(http, monkeypatch):
+    class Reviews:
+        resume_id = None
+
+        @staticmethod
+        async def find_one(query):
+            return None
+
+    monkeypatch.setattr(feedback_cache, "ResumeReview", Reviews)
+    assert http("/api/resume/resume-feedback/missing").status_code == 404
+    assert feedback_cache.stats["misses"] == 1
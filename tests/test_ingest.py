@@ -0,0 +1,103 @@
+import asyncio
+import io
+import pytest
+from fastapi import UploadFile
+from app.services import ingest
+from app.services.config import get_settings
+from tests.fakes import RESUME_LINES, make_pdf, resume_pdf
+
+
+def ingest_bytes(data: bytes, declared_size: int = None, filename: str = "resume.pdf"):
+    upload = UploadFile(file=io.BytesIO(data), size=declared_size, filename=filename)
+    return asyncio.run(ingest.ingest_upload(upload))
+
+
+def rejected(data: bytes, **kwargs) -> ingest.UploadRejected:
+    with pytest.raises(ingest.UploadRejected) as e:
+        ingest_bytes(data, **kwargs)
+    return e.value
+
+
+def encrypted_pdf() -> bytes:
+    return resume_pdf(1).replace(b"trailer\n<< ", b"trailer\n<< /Encrypt 9 0 R ")
+
+
+def linearized_pdf(pages: int) -> bytes:
+    # Only the linearization dictionary matters to ingestion, not a valid hint table
+    head = f"%PDF-1.4\n99 0 obj\n<< /Linearized 1 /L 4096 /H [ 0 0 ] /O 4 /E 0 /N {pages} /T 0 >>\nendobj\n"
+    return head.encode("latin-1") + resume_pdf(1)[len(b"%PDF-1.4\n"):]
+
+
+def test_pdf_is_sniffed_from_the_bytes():
+    upload = ingest_bytes(resume_pdf(2), filename="resume.txt")
+    assert upload.content_type == "application/pdf"
+    assert upload.size == len(resume_pdf(2))
+
+
+def test_plain_text_is_accepted():
+    text = "\n".join(RESUME_LINES).encode("utf-8")
+    assert ingest_bytes(text, filename="resume.txt").content_type == "text/plain"
+
+
+def test_multibyte_character_split_across_chunks_is_text():
+    # "é" is two bytes; put its first byte last in the first chunk
+    data = b"a" * (ingest.CHUNK_SIZE - 1) + "é résumé".encode("utf-8")
+    assert ingest_bytes(data).content_type == "text/plain"
+
+
+@pytest.mark.parametrize("data", [b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, b"\xff\xfe\xfd" * 100])
+def test_binary_files_are_unsupported(data):
+    assert rejected(data).status_code == 415
+
+
+def test_empty_upload():
+    assert rejected(b"").status_code == 400
+
+
+def test_declared_size_over_the_limit_is_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(get_settings(), "PDF_MAX_BYTES", 1024)
+    stream = io.BytesIO(resume_pdf(1))
+    upload = UploadFile(file=stream, size=10 * 1024 * 1024, filename="resume.pdf")
+
+    with pytest.raises(ingest.UploadRejected) as e:
+        asyncio.run(ingest.ingest_upload(upload))
+    assert e.value.status_code == 413
+    assert stream.tell() == 0
+
+
+def test_streamed_size_over_the_limit_stops_reading(monkeypatch):
+    monkeypatch.setattr(get_settings(), "PDF_MAX_BYTES", 2 * ingest.CHUNK_SIZE)
+    stream = io.BytesIO(b"%PDF-1.4\n" + b"0" * (10 * ingest.CHUNK_SIZE))
+    upload = UploadFile(file=stream, size=None, filename="resume.pdf")
+
+    with pytest.raises(ingest.UploadRejected) as e:
+        asyncio.run(ingest.ingest_upload(upload))
+    assert e.value.status_code == 413
+    assert stream.tell() <= 3 * ingest.CHUNK_SIZE
+
+
+def test_encrypted_pdf_is_rejected():
+    assert rejected(encrypted_pdf()).status_code == 422
+
+
+def test_linearized_page_count_is_enforced(monkeypatch):
+    monkeypatch.setattr(get_settings(), "PDF_MAX_PAGES", 20)
+    assert rejected(linearized_pdf(500)).status_code == 413
+    assert ingest_bytes(linearized_pdf(3)).content_type == "application/pdf"
+
+
+def test_oversized_request_is_rejected_from_content_length(monkeypatch):
+    import httpx
+    from app.server import app
+
+    monkeypatch.setattr(get_settings(), "PDF_MAX_BYTES", 1024)
+
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/api/resume/analyze",
+                files={"resume": ("resume.pdf", make_pdf([RESUME_LINES] * 2) + b"0" * 2 * 1024 * 1024)},
+            )
+
+    assert asyncio.run(send()).status_code == 413
@@ -0,0 +1,165 @@
+import asyncio
+import time
+import pytest
+from app.services import jobs
+from app.services.config import get_settings
+from app.services.pipeline import ReviewError
+
+
+@pytest.fixture
+def fast_jobs(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(settings, "JOB_RETRY_MAX_DELAY", 0.02)
+    monkeypatch.setattr(settings, "JOB_POLL_TIMEOUT", 1)
+    monkeypatch.setattr(settings, "JOB_REQUEUE_INTERVAL", 0.05)
+    return settings
+
+
+class Analyzer:
+    # Each call takes the next scripted outcome: None succeeds, an exception is raised;
+    # the last one repeats
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes) or [None]
+        self.calls = []
+
+    async def __call__(self, clerk_id, job_title, job_description, resume_bytes, content_type, filename, resume_id=None):
+        self.calls.append((clerk_id, resume_bytes, resume_id))
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if outcome is not None:
+            raise outcome
+        return {"id": resume_id}
+
+
+def _enqueue(redis) -> str:
+    return asyncio.run(jobs.enqueue_analysis("user_1", "Engineer", "Build APIs", b"%PDF-1.7 resume", "application/pdf",
+                                             "resume.pdf", redis=redis))
+
+
+async def _run_until(redis, analyze_fn, done, timeout: float = 5.0, concurrency: int = 2) -> None:
+    # Runs a worker until done() holds, then stops it and waits for a clean shutdown
+    stop = asyncio.Event()
+    worker = asyncio.create_task(jobs.run_worker(concurrency, redis=redis, stop=stop, analyze_fn=analyze_fn))
+    try:
+        deadline = time.monotonic() + timeout
+        while not await done():
+            assert time.monotonic() < deadline, "worker did not finish in time"
+            await asyncio.sleep(0.01)
+    finally:
+        stop.set()
+        await asyncio.wait_for(worker, timeout=timeout)
+
+
+def _status(redis, job_id: str):
+    async def check():
+        job = await jobs.get_job(job_id, redis=redis)
+        return job["status"] in (jobs.JobStatus.DONE, jobs.JobStatus.FAILED)
+    return check
+
+
+def test_enqueued_job_is_processed_to_done(redis, fast_jobs):
+    job_id = _enqueue(redis)
+    analyzer = Analyzer()
+
+    asyncio.run(_run_until(redis, analyzer, _status(redis, job_id)))
+
+    job = asyncio.run(jobs.get_job(job_id, redis=redis))
+    assert job["status"] == jobs.JobStatus.DONE and job["attempts"] == 1
+    assert job["feedback_url"] == f"/api/resume/resume-feedback/{job_id}"
+    assert analyzer.calls == [("user_1", b"%PDF-1.7 resume", job_id)]
+    assert asyncio.run(redis.hget(jobs._job_key(job_id), "file")) is None
+    assert asyncio.run(redis.llen(jobs.JOB_PROCESSING)) == 0
+
+
+def test_failed_attempt_is_retried_through_the_delayed_set(redis, fast_jobs):
+    job_id = _enqueue(redis)
+    analyzer = Analyzer(ReviewError("model overloaded"), None)
+
+    async def first_attempt():
+        await redis.lmove(jobs.JOB_QUEUE, jobs.JOB_PROCESSING, "LEFT", "RIGHT")
+        await jobs.process_job(job_id, redis=redis, analyze_fn=analyzer)
+        return await jobs.get_job(job_id, redis=redis), await redis.zscore(jobs.JOB_DELAYED, job_id)
+
+    job, due_at = asyncio.run(first_attempt())
+    assert job["status"] == jobs.JobStatus.QUEUED and job["error"] == "model overloaded"
+    assert time.time() < due_at <= time.time() + 0.02
+    assert asyncio.run(redis.llen(jobs.JOB_QUEUE)) == 0
+
+    # Not due yet, then promoted once the backoff has passed
+    asyncio.run(redis.zadd(jobs.JOB_DELAYED, {job_id: time.time() + 60}))
+    asyncio.run(jobs._promote_delayed(redis))
+    assert asyncio.run(redis.llen(jobs.JOB_QUEUE)) == 0
+    asyncio.run(redis.zadd(jobs.JOB_DELAYED, {job_id: time.time() - 1}))
+    asyncio.run(jobs._promote_delayed(redis))
+    assert asyncio.run(redis.lrange(jobs.JOB_QUEUE, 0, -1)) == [job_id]
+    assert asyncio.run(redis.zcard(jobs.JOB_DELAYED)) == 0
+
+
+def test_worker_retries_with_backoff_until_done(redis, fast_jobs):
+    job_id = _enqueue(redis)
+    analyzer = Analyzer(ReviewError("model overloaded"), None)
+
+    asyncio.run(_run_until(redis, analyzer, _status(redis, job_id)))
+
+    job = asyncio.run(jobs.get_job(job_id, redis=redis))
+    assert job["status"] == jobs.JobStatus.DONE and job["attempts"] == 2
+    assert len(analyzer.calls) == 2
+
+
+def test_job_fails_after_the_last_attempt(redis, fast_jobs):
+    job_id = _enqueue(redis)
+    analyzer = Analyzer(ReviewError("model overloaded"))
+
+    asyncio.run(_run_until(redis, analyzer, _status(redis, job_id)))
+
+    job = asyncio.run(jobs.get_job(job_id, redis=redis))
+    assert job["status"] == jobs.JobStatus.FAILED and job["error"] == "model overloaded"
+    assert job["attempts"] == len(analyzer.calls) == fast_jobs.JOB_MAX_ATTEMPTS
+    assert asyncio.run(redis.hget(jobs._job_key(job_id), "file")) is None
+    assert asyncio.run(redis.zcard(jobs.JOB_DELAYED)) == 0
+
+
+def test_stale_processing_jobs_are_requeued(redis, fast_jobs, monkeypatch):
+    monkeypatch.setattr(fast_jobs, "JOB_STALE_SECONDS", 60)
+    stale, fresh = _enqueue(redis), _enqueue(redis)
+
+    async def crash_mid_job():
+        # A worker took both jobs and died; one started long ago, one just now
+        for _ in range(2):
+            await redis.lmove(jobs.JOB_QUEUE, jobs.JOB_PROCESSING, "LEFT", "RIGHT")
+        await redis.hset(jobs._job_key(stale), mapping={"status": jobs.JobStatus.RUNNING, "updated_at": time.time() - 120})
+        await redis.hset(jobs._job_key(fresh), mapping={"status": jobs.JobStatus.RUNNING, "updated_at": time.time()})
+        await jobs._requeue_stale(redis)
+
+    asyncio.run(crash_mid_job())
+
+    assert asyncio.run(redis.lrange(jobs.JOB_QUEUE, 0, -1)) == [stale]
+    assert asyncio.run(redis.lrange(jobs.JOB_PROCESSING, 0, -1)) == [fresh]
+    assert asyncio.run(jobs.get_job(stale, redis=redis))["status"] == jobs.JobStatus.QUEUED
+
+
+def test_running_worker_recovers_jobs_that_go_stale_later(redis, fast_jobs, monkeypatch):
+    monkeypatch.setattr(fast_jobs, "JOB_STALE_SECONDS", 0.2)
+    job_id = _enqueue(redis)
+    asyncio.run(redis.lmove(jobs.JOB_QUEUE, jobs.JOB_PROCESSING, "LEFT", "RIGHT"))
+    asyncio.run(redis.hset(jobs._job_key(job_id), mapping={"status": jobs.JobStatus.RUNNING, "updated_at": time.time()}))
+
+    # Not stale when the worker starts, so only the periodic pass can pick it up
+    asyncio.run(_run_until(redis, Analyzer(), _status(redis, job_id)))
+
+    assert asyncio.run(jobs.get_job(job_id, redis=redis))["status"] == jobs.JobStatus.DONE
+
+
+def test_idle_worker_stops_promptly(redis, fast_jobs):
+    import threading
+
+    async def scenario():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.2, stop.set)
+        await jobs.run_worker(4, redis=redis, stop=stop, analyze_fn=Analyzer())
+
+    # In a thread, so a worker that spins without yielding fails the test instead of hanging it
+    thread = threading.Thread(target=asyncio.run, args=(scenario(),), daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive(), "idle worker never yielded to see stop"
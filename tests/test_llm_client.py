@@ -0,0 +1,299 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from app.services.llm import CircuitBreaker, LLMUnavailableError, PrefixCache
+from tests.fakes import FakeCacheBackend, FakeGeminiServer, FakeModel, make_llm_client
+
+
+def _half_open(client) -> None:
+    client.breaker.failures = client.breaker.failure_threshold
+    client.breaker.opened_at = time.monotonic() - client.breaker.reset_timeout - 1
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_breaker_opens_and_fails_fast():
+    model = FakeModel(RuntimeError("boom"))
+    client = make_llm_client(model)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await client.generate("hi")
+        with pytest.raises(LLMUnavailableError):
+            await client.generate("hi")
+
+    asyncio.run(scenario())
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert len(model.calls) == 2 and client.rejected == 1
+
+
+def test_retryable_errors_are_retried():
+    client = make_llm_client(FakeModel(asyncio.TimeoutError(), "ok"), max_retries=2)
+    client._backoff = lambda attempt: 0
+
+    response = asyncio.run(client.generate("hi"))
+    assert response.text == "ok"
+    assert client.retries == 1 and client.breaker.failures == 0
+
+
+def test_half_open_lets_one_probe_through():
+    model = FakeModel("ok", delay=0.05)
+    client = make_llm_client(model)
+    _half_open(client)
+
+    async def scenario():
+        return await asyncio.gather(*(client.generate("hi") for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    assert sum(isinstance(r, LLMUnavailableError) for r in results) == 2
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_probe_cancelled_mid_call_frees_the_slot():
+    client = make_llm_client(FakeModel("ok", delay=10))
+    _half_open(client)
+
+    async def scenario():
+        probe = asyncio.create_task(client.generate("hi"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(scenario())
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.breaker.allow()
+
+
+def test_probe_cancelled_waiting_on_semaphore_frees_the_slot():
+    client = make_llm_client(FakeModel("ok", delay=10), max_concurrency=1)
+
+    async def scenario():
+        # A call admitted while closed holds the only slot; the probe queues behind it
+        holder = asyncio.create_task(client.generate("first"))
+        await asyncio.sleep(0.01)
+        _half_open(client)
+        probe = asyncio.create_task(client.generate("probe"))
+        await asyncio.sleep(0.01)
+        assert client.breaker._trial_in_flight
+        probe.cancel()
+        holder.cancel()
+        await asyncio.gather(probe, holder, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert not client.breaker._trial_in_flight
+    assert client.in_flight == 0
+
+
+def test_abandoned_stream_probe_frees_the_slot():
+    client = make_llm_client(FakeModel("x" * 1000, chunk_size=10))
+    _half_open(client)
+
+    async def scenario():
+        stream = client.stream("hi")
+        assert await stream.__anext__() == "x" * 10
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert not client.breaker._trial_in_flight
+    assert client.in_flight == 0
+
+
+def test_failed_stream_opens_the_breaker():
+    client = make_llm_client(FakeModel(RuntimeError("boom")))
+
+    async def consume():
+        return [chunk async for chunk in client.stream("hi")]
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(consume())
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+# ---------- Prompt prefix cache ----------
+@pytest.fixture
+def clock(monkeypatch):
+    # PrefixCache reads time.monotonic through the llm module; drive it by hand
+    from app.services import llm
+
+    now = [1000.0]
+    monkeypatch.setattr(llm, "time", SimpleNamespace(monotonic=lambda: now[0], perf_counter=time.perf_counter))
+    return now
+
+
+def _prefix_cache(backend, ttl: float = 600.0, refresh_margin: float = 60.0, retry_after: float = 300.0):
+    return PrefixCache(backend, ttl=ttl, refresh_margin=refresh_margin, retry_after=retry_after)
+
+
+def test_prefix_cache_creates_once_and_refreshes_before_expiry(clock):
+    backend = FakeCacheBackend()
+    cache = _prefix_cache(backend)
+
+    first = asyncio.run(cache.model_for("INSTRUCTIONS"))
+    clock[0] += 500
+    second = asyncio.run(cache.model_for("INSTRUCTIONS"))
+    clock[0] += 80
+    third = asyncio.run(cache.model_for("INSTRUCTIONS"))
+
+    assert first is second is third is backend.models["cachedContents/0"]
+    assert backend.created == [("INSTRUCTIONS", 600.0)]
+    assert backend.refreshed == [("cachedContents/0", 600.0)]
+    assert cache.metrics() == {"active": True, "tokens": 2048, "created": 1, "refreshed": 1, "errors": 0}
+
+
+def test_prefix_cache_recreates_for_a_new_prefix_or_after_expiry(clock):
+    backend = FakeCacheBackend()
+    cache = _prefix_cache(backend)
+
+    asyncio.run(cache.model_for("v1"))
+    asyncio.run(cache.model_for("v2"))
+    clock[0] += 700
+    asyncio.run(cache.model_for("v2"))
+
+    assert [prefix for prefix, _ in backend.created] == ["v1", "v2", "v2"]
+    assert backend.refreshed == []
+
+
+def test_prefix_cache_failure_disables_it_until_retry_after(clock):
+    backend = FakeCacheBackend(RuntimeError("prefix below minimum size"), None)
+    cache = _prefix_cache(backend)
+
+    assert asyncio.run(cache.model_for("INSTRUCTIONS")) is None
+    clock[0] += 299
+    assert asyncio.run(cache.model_for("INSTRUCTIONS")) is None
+    assert backend.created == [] and cache.errors == 1
+
+    clock[0] += 2
+    assert asyncio.run(cache.model_for("INSTRUCTIONS")) is backend.models["cachedContents/0"]
+    assert cache.metrics()["active"] and cache.created == 1
+
+
+def test_prefix_cache_failed_refresh_falls_back_inline(clock):
+    backend = FakeCacheBackend(None, RuntimeError("quota"), None)
+    cache = _prefix_cache(backend)
+
+    asyncio.run(cache.model_for("INSTRUCTIONS"))
+    clock[0] += 550
+    assert asyncio.run(cache.model_for("INSTRUCTIONS")) is None
+    assert not cache.metrics()["active"]
+
+    # The handle was dropped, so the retry registers the prefix again
+    clock[0] += 300
+    assert asyncio.run(cache.model_for("INSTRUCTIONS")) is not None
+    assert len(backend.created) == 2 and backend.refreshed == []
+
+
+def test_client_sends_only_the_request_through_the_cached_prefix(clock):
+    backend = FakeCacheBackend()
+    inline = FakeModel("inline")
+    client = make_llm_client(inline, prefix_cache=_prefix_cache(backend))
+
+    response = asyncio.run(client.generate("resume text", prefix="INSTRUCTIONS"))
+
+    assert backend.models["cachedContents/0"].calls == ["resume text"]
+    assert inline.calls == [] and response.usage_metadata.cached_content_token_count == 2048
+
+    # Without a prefix the plain model is used
+    asyncio.run(client.generate("hi"))
+    assert inline.calls == ["hi"]
+
+
+def test_client_falls_back_inline_when_caching_is_unavailable(clock):
+    backend = FakeCacheBackend(RuntimeError("caching not supported"))
+    inline = FakeModel("inline")
+    client = make_llm_client(inline, prefix_cache=_prefix_cache(backend))
+
+    async def scenario():
+        await client.generate("resume text", prefix="INSTRUCTIONS")
+        return [chunk async for chunk in client.stream("more text", prefix="INSTRUCTIONS")]
+
+    assert "".join(asyncio.run(scenario())) == "inline"
+    assert inline.calls == ["INSTRUCTIONS\n\nresume text", "INSTRUCTIONS\n\nmore text"]
+    assert backend.models == {}
+
+
+def test_error_on_the_cached_model_invalidates_the_prefix(clock):
+    backend = FakeCacheBackend()
+    prefix_cache = _prefix_cache(backend)
+    client = make_llm_client(FakeModel("inline"), prefix_cache=prefix_cache)
+    asyncio.run(prefix_cache.model_for("INSTRUCTIONS"))
+    backend.models["cachedContents/0"].outcomes = [RuntimeError("cached content not found")]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.generate("resume text", prefix="INSTRUCTIONS"))
+    assert not prefix_cache.metrics()["active"]
+
+    # The next request registers the prefix again and goes through the new cache
+    response = asyncio.run(client.generate("resume text", prefix="INSTRUCTIONS"))
+    assert len(backend.created) == 2
+    assert backend.models["cachedContents/1"].calls == ["resume text"]
+    assert response.text == backend.models["cachedContents/1"].outcomes[0]
+
+
+# ---------- Through the real SDK against a local server ----------
+def _server_client(server, **overrides):
+    from app.services.llm import LLMClient
+
+    options = {
+        "model_name": "gemini-test",
+        "api_key": "test-key",
+        "timeout": 5.0,
+        "max_concurrency": 4,
+        "max_retries": 2,
+        "breaker": CircuitBreaker(failure_threshold=3, reset_timeout=60.0),
+        "api_endpoint": server.endpoint,
+        **overrides,
+    }
+    client = LLMClient(**options)
+    client._backoff = lambda attempt: 0
+    return client
+
+
+def test_generate_against_fake_server_sends_prefix_inline():
+    with FakeGeminiServer((500, "internal"), (200, '{"ok": true}')) as server:
+        client = _server_client(server)
+        response = asyncio.run(client.generate("resume text", prefix="INSTRUCTIONS"))
+
+    assert response.text == '{"ok": true}'
+    assert response.usage_metadata.prompt_token_count == 1200
+    assert client.retries == 1 and client.breaker.state == CircuitBreaker.CLOSED
+    path, body = server.requests[-1]
+    assert ":generateContent" in path
+    assert body["contents"][0]["parts"][0]["text"] == "INSTRUCTIONS\n\nresume text"
+
+
+def test_fake_server_errors_open_the_breaker():
+    with FakeGeminiServer((400, "bad request")) as server:
+        client = _server_client(server)
+
+        async def scenario():
+            for _ in range(3):
+                with pytest.raises(Exception) as error:
+                    await client.generate("hi")
+                assert not isinstance(error.value, LLMUnavailableError)
+            with pytest.raises(LLMUnavailableError):
+                await client.generate("hi")
+
+        asyncio.run(scenario())
+
+    # Client errors aren't retried, and the open breaker never reached the server
+    assert len(server.requests) == 3
+    assert client.metrics()["breaker_state"] == CircuitBreaker.OPEN
+
+
+def test_stream_against_fake_server():
+    text = '{"overallScore": 80, "summary": "' + "x" * 100 + '"}'
+    with FakeGeminiServer((200, text)) as server:
+        client = _server_client(server)
+
+        async def consume():
+            return [chunk async for chunk in client.stream("hi")]
+
+        chunks = asyncio.run(consume())
+
+    assert len(chunks) > 1 and "".join(chunks) == text
+    assert ":streamGenerateContent" in server.requests[0][0]
+    assert client.in_flight == 0 and client.breaker.failures == 0
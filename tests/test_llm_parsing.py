@@ -0,0 +1,93 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Optional
+import pytest
+from pydantic import BaseModel, ValidationError
+from app.models.user import Feedback
+from app.services.generator import ResumeReviewGenerator
+from app.services.llm_schema import FEEDBACK_SCHEMA, RECOMMENDATION_SCHEMA, gemini_schema
+from tests.fakes import feedback
+
+# Recorded shapes of bad model output. ok_* parse without another call, repair_* re-ask
+# for the listed sections only, error_* can't be salvaged.
+CORPUS = Path(__file__).parent / "fixtures" / "llm_responses"
+REPAIRS = {
+    "repair_skills_wrong_type.json": ["skills"],
+    "repair_structure_missing.json": ["structure"],
+    "repair_content_bad_tip.json": ["content"],
+    "repair_overall_score_word.txt": ["overallScore"],
+}
+
+
+def corpus(prefix: str) -> list:
+    return sorted(path.name for path in CORPUS.glob(f"{prefix}_*"))
+
+
+@pytest.fixture
+def repairs(monkeypatch):
+    # Stands in for the section repair call: answers with that section of a good review
+    calls = []
+
+    async def call_gemini(prompt: str, resume_text: str, schema: Optional[dict] = None) -> str:
+        section = prompt.rsplit('value of the "', 1)[1].split('"', 1)[0]
+        calls.append((section, schema))
+        return json.dumps(feedback()[section])
+
+    monkeypatch.setattr(ResumeReviewGenerator, "call_gemini", call_gemini)
+    return calls
+
+
+def parse(name: str) -> dict:
+    text = (CORPUS / name).read_text()
+    return asyncio.run(ResumeReviewGenerator.parse_feedback(text, "Review this resume.", "resume text"))
+
+
+@pytest.mark.parametrize("name", corpus("ok"))
+def test_salvageable_responses_parse_without_another_call(name, repairs):
+    result = parse(name)
+
+    assert Feedback.model_validate(result)
+    assert result["overallScore"] == 72
+    assert repairs == []
+
+
+@pytest.mark.parametrize("name", corpus("repair"))
+def test_invalid_sections_are_repaired_one_by_one(name, repairs):
+    result = parse(name)
+
+    assert [section for section, _ in repairs] == REPAIRS[name]
+    for section, schema in repairs:
+        assert schema == FEEDBACK_SCHEMA["properties"][section]
+        assert result[section] == feedback()[section]
+
+
+@pytest.mark.parametrize("name", corpus("error"))
+def test_unparseable_responses_raise(name, repairs):
+    with pytest.raises(ValueError, match="not valid JSON"):
+        parse(name)
+    assert repairs == []
+
+
+def test_failed_repair_surfaces_the_validation_error(monkeypatch):
+    async def call_gemini(prompt: str, resume_text: str, schema: Optional[dict] = None) -> str:
+        return json.dumps({"score": "n/a"})
+
+    monkeypatch.setattr(ResumeReviewGenerator, "call_gemini", call_gemini)
+    with pytest.raises(ValidationError):
+        parse("repair_skills_wrong_type.json")
+
+
+def test_corpus_is_complete():
+    assert set(REPAIRS) == set(corpus("repair"))
+
+
+def test_recommendation_schema_is_keyed_on_the_field_name():
+    assert FEEDBACK_SCHEMA["properties"]["recommendation"] == RECOMMENDATION_SCHEMA
+
+    class WithMetadata(BaseModel):
+        recommendation: Optional[dict] = None
+        metadata: dict
+
+    with pytest.raises(ValueError, match="metadata"):
+        gemini_schema(WithMetadata)
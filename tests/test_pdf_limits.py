@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+import pytest
+from tests.fakes import JOB_DESCRIPTION, make_pdf
+
+
+class Uploader:
+    def upload(self, data, public_id: str, **kwargs):
+        time.sleep(0.2)
+        return {"secure_url": f"https://res.example.com/upload/{public_id}.pdf", "public_id": public_id}
+
+    def destroy(self, public_id: str, **kwargs):
+        return {"result": "ok"}
+
+
+@pytest.fixture
+def client(redis, monkeypatch):
+    import httpx
+    from app.server import app
+    from app.routers import resume
+    from app.services import storage
+    from app.utils.auth import get_current_user
+
+    async def no_db():
+        return None
+
+    monkeypatch.setattr(storage, "_uploader", lambda: Uploader())
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: {"user_id": "user_1"})
+    monkeypatch.setitem(app.dependency_overrides, resume.ensure_db_initialized, no_db)
+
+    def post(path: str, **kwargs):
+        async def send():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await http.post(path, **kwargs)
+        return asyncio.run(send())
+
+    return post
+
+
+def _too_long() -> bytes:
+    # Not linearized, so only extraction sees the page count
+    from app.services.config import settings
+
+    return make_pdf([[f"Page {i}"] for i in range(settings.PDF_MAX_PAGES + 1)])
+
+
+@pytest.mark.parametrize("mode", ["sync", "quick"])
+def test_analyze_maps_pdf_limit_to_413(client, mode):
+    response = client(
+        f"/api/resume/analyze?mode={mode}",
+        data={"jobTitle": "Engineer", "jobDescription": JOB_DESCRIPTION},
+        files={"resume": ("long.pdf", _too_long(), "application/pdf")},
+    )
+    assert response.status_code == 413
+    assert "pages" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("mode", ["llm", "quick"])
+def test_batch_jobs_maps_pdf_limit_to_413(client, mode):
+    jobs = [{"jobTitle": "Engineer", "jobDescription": JOB_DESCRIPTION}]
+    response = client(
+        f"/api/resume/analyze/batch?mode={mode}",
+        data={"jobs": json.dumps(jobs)},
+        files={"resume": ("long.pdf", _too_long(), "application/pdf")},
+    )
+    assert response.status_code == 413
+
+
+def test_stream_reports_pdf_limit_status(client):
+    response = client(
+        "/api/resume/analyze/stream",
+        data={"jobTitle": "Engineer", "jobDescription": JOB_DESCRIPTION},
+        files={"resume": ("long.pdf", _too_long(), "application/pdf")},
+    )
+    error = [line for line in response.text.splitlines() if line.startswith("data: ")][-1]
+    assert json.loads(error[len("data: "):])["status"] == 413
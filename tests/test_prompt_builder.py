@@ -0,0 +1,93 @@
+import pytest
+from app.services.extraction import extract_text, strip_page_furniture
+from app.services.prompt_builder import compact_job_description, compact_resume, count_tokens
+from tests.fakes import JOB_DESCRIPTION, RESUME_LINES, make_pdf
+
+RESUME = "\n".join([
+    "Jane Doe", "Experience",
+    "Software Engineer", "Acme - 2021-2024", "Built billing APIs in Python",
+    "Software Engineer", "Globex - 2018-2021", "Ran the data platform on AWS",
+    "Software Engineer", "Initech - 2015-2018", "Shipped the mobile backend",
+    "Skills", "Python, Go, PostgreSQL",
+    "Hobbies", "Chess, climbing, " * 40,
+])
+
+
+def _pages(count: int) -> list:
+    # Each page: running header, body with a title that repeats on every page, footer
+    return [
+        "\n".join([
+            "Jane Doe - Resume", f"Employer {i}", RESUME_LINES[i % len(RESUME_LINES)],
+            "Software Engineer", *RESUME_LINES, f"Role {i} highlights", f"Page {i + 1} of {count}",
+        ])
+        for i in range(count)
+    ]
+
+
+def test_headers_and_footers_stripped_after_first_page():
+    stripped = strip_page_furniture(_pages(3))
+
+    assert stripped[0].startswith("Jane Doe - Resume")
+    assert all("Jane Doe - Resume" not in page for page in stripped[1:])
+    assert all("Page" not in page.splitlines()[-1] for page in stripped)
+    # Body lines that repeat on every page are not page furniture
+    assert all("Software Engineer" in page for page in stripped)
+    assert all(RESUME_LINES[3] in page for page in stripped)
+
+
+def test_furniture_stripped_from_extracted_pdf():
+    pdf = make_pdf([page.split("\n") for page in _pages(4)])
+    text = extract_text(pdf)
+
+    assert text.count("Jane Doe - Resume") == 1
+    assert "Page 3 of 4" not in text
+    assert text.count("Software Engineer") == 4
+
+
+def test_single_page_keeps_everything_but_page_numbers():
+    assert strip_page_furniture(["Jane Doe\nSoftware Engineer\n1"]) == ["Jane Doe\nSoftware Engineer"]
+
+
+def test_repeated_job_titles_survive_compaction():
+    compacted = compact_resume(RESUME, budget=10_000)
+    assert compacted.count("Software Engineer") == 3
+
+
+def test_compaction_is_deterministic():
+    assert len({compact_resume(RESUME, 60) for _ in range(5)}) == 1
+    assert len({compact_job_description(JOB_DESCRIPTION * 20, 80) for _ in range(5)}) == 1
+
+
+@pytest.mark.parametrize("budget", [20, 60, 150, 1_000])
+def test_compaction_stays_under_budget(budget):
+    assert count_tokens(compact_resume(RESUME * 10, budget)) <= budget
+    assert count_tokens(compact_job_description(JOB_DESCRIPTION * 50, budget)) <= budget
+
+
+def test_low_value_sections_dropped_before_truncating():
+    compacted = compact_resume(RESUME, budget=count_tokens(RESUME) - 10)
+    assert "Chess" not in compacted
+    assert "Python, Go, PostgreSQL" in compacted
+
+
+def test_full_prompt_fits_the_budget():
+    from app.services.config import settings
+    from app.services.generator import ResumeReviewGenerator, PROMPT_PREFIX
+
+    prompt = ResumeReviewGenerator.generate_prompt("Backend Engineer", JOB_DESCRIPTION)
+    resume, stats = ResumeReviewGenerator.fit_to_budget(prompt, RESUME * 200, JOB_DESCRIPTION)
+
+    assert stats.prompt_tokens <= settings.PROMPT_TOKEN_BUDGET
+    assert count_tokens(PROMPT_PREFIX) + count_tokens(prompt) + count_tokens(resume) == stats.prompt_tokens
+    assert stats.tokens_saved > 0
+
+
+@pytest.mark.parametrize("setting", ["PROMPT_TOKEN_BUDGET", "PROMPT_JD_TOKEN_BUDGET", "PROMPT_MIN_RESUME_TOKENS"])
+def test_budget_settings_change_the_cache_key(setting, monkeypatch):
+    from app.services.config import get_settings
+    from app.services.generator import ResumeReviewGenerator
+
+    before = ResumeReviewGenerator.cache_key("resume", "Engineer", JOB_DESCRIPTION)
+    monkeypatch.setattr(get_settings(), setting, getattr(get_settings(), setting) + 100)
+
+    assert ResumeReviewGenerator.cache_key("resume", "Engineer", JOB_DESCRIPTION) != before
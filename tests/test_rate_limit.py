@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import threading
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.services import cache, rate_limit
+from app.services.config import get_settings
+
+PROCESSES = 4
+CALLS_PER_PROCESS = 25
+LIMIT = 30
+
+
+@pytest.fixture
+def trusted(monkeypatch):
+    def set_proxies(*proxies):
+        monkeypatch.setattr(get_settings(), "TRUSTED_PROXIES", list(proxies))
+        rate_limit._trusted_proxies.cache_clear()
+
+    yield set_proxies
+    rate_limit._trusted_proxies.cache_clear()
+
+
+def request(peer: str, forwarded: str = None):
+    headers = {"x-forwarded-for": forwarded} if forwarded else {}
+    return SimpleNamespace(client=SimpleNamespace(host=peer), headers=headers)
+
+
+def test_forwarded_for_ignored_from_untrusted_peer(trusted):
+    trusted()
+    assert rate_limit._client_ip(request("203.0.113.7", "1.2.3.4")) == "203.0.113.7"
+
+
+def test_forwarded_for_uses_rightmost_untrusted_hop(trusted):
+    trusted("10.0.0.0/8")
+    # The left-most entry is whatever the client sent; only the hop our proxy saw counts
+    forwarded = "1.2.3.4, 198.51.100.9, 10.0.0.5"
+    assert rate_limit._client_ip(request("10.0.0.2", forwarded)) == "198.51.100.9"
+
+
+def test_all_trusted_hops_fall_back_to_the_first_one(trusted):
+    trusted("10.0.0.0/8")
+    assert rate_limit._client_ip(request("10.0.0.2", "10.0.0.9, garbage")) == "garbage"
+    assert rate_limit._client_ip(request("10.0.0.2", "10.1.0.1, 10.0.0.9")) == "10.1.0.1"
+    assert rate_limit._client_ip(request("10.0.0.2")) == "10.0.0.2"
+
+
+def test_quota_is_charged_and_enforced(redis, monkeypatch):
+    monkeypatch.setattr(get_settings(), "LLM_DAILY_TOKEN_QUOTA", 5000)
+    monkeypatch.setattr(get_settings(), "LLM_OUTPUT_TOKEN_ESTIMATE", 1000)
+
+    async def run():
+        rate_limit.quota_owner.set("user_1")
+        await rate_limit.charge_quota(1500)
+        await rate_limit.charge_quota(1500)
+        with pytest.raises(rate_limit.QuotaExceededError):
+            await rate_limit.charge_quota(1500)
+
+    asyncio.run(run())
+
+
+def test_quota_fails_open_when_redis_is_down():
+    # The offline REDIS_URL points at a closed port
+    async def run():
+        rate_limit.quota_owner.set("user_1")
+        await rate_limit.charge_quota(1500)
+        await rate_limit.check_rate_limit("analyze", "user:user_1")
+
+    try:
+        asyncio.run(run())
+    finally:
+        cache.async_redis_client.use(None)
+
+
+def _count_allowed(_) -> int:
+    # Runs in a fresh process with its own settings, client and script registration
+    async def run():
+        allowed = 0
+        for _ in range(CALLS_PER_PROCESS):
+            try:
+                await rate_limit.check_rate_limit("shared", "user:user_1")
+                allowed += 1
+            except HTTPException as e:
+                assert e.status_code == 429
+        return allowed
+
+    return asyncio.run(run())
+
+
+def test_window_is_exact_across_processes(monkeypatch):
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        import redis
+
+        url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+        # fakeredis' TCP server drops the connection after a NOSCRIPT reply, so load the
+        # script up front instead of relying on redis-py's EVALSHA fallback
+        redis.Redis.from_url(url).script_load(rate_limit.SLIDING_WINDOW_LUA)
+        # Spawned workers inherit the environment and read settings from it
+        monkeypatch.setenv("REDIS_URL", url)
+        monkeypatch.setenv("RATE_LIMITS", f"default={LIMIT}/minute")
+        with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+            allowed = pool.map(_count_allowed, range(PROCESSES))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sum(allowed) == LIMIT
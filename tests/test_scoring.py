@@ -0,0 +1,48 @@
+from app.services.scoring import extract_keywords, score_pairs, score_resume
+from tests.fakes import JOB_DESCRIPTION, RESUME_LINES
+
+RESUME = "\n".join(RESUME_LINES)
+OTHER_RESUMES = [
+    "Data analyst: SQL, Excel, Tableau and Python for reporting dashboards",
+    "\n".join(RESUME_LINES * 6) + "\nAlso: Java, Spring Boot, Kafka, Cassandra, GraphQL",
+    "Nurse with ten years of patient care and ward management",
+]
+OTHER_JOBS = [
+    "Frontend engineer: React, TypeScript, GraphQL and Figma",
+    "Data scientist with Python, pandas, scikit-learn, statistics and SQL",
+    JOB_DESCRIPTION + " Kafka and Cassandra at scale.",
+]
+
+
+def test_pair_scores_the_same_alone_and_in_any_batch():
+    alone = score_resume(RESUME, JOB_DESCRIPTION)
+
+    resumes = [RESUME, *OTHER_RESUMES]
+    jobs = [JOB_DESCRIPTION, *OTHER_JOBS]
+    for shift in range(len(resumes)):
+        batch = score_pairs(resumes[shift:] + resumes[:shift], jobs[shift:] + jobs[:shift])
+        assert batch[(len(resumes) - shift) % len(resumes)] == alone
+
+    # One resume against many jobs, and many resumes against one job
+    assert score_pairs([RESUME] * 4, [JOB_DESCRIPTION, *OTHER_JOBS])[0] == alone
+    assert score_pairs([*OTHER_RESUMES, RESUME], [JOB_DESCRIPTION] * 4)[-1] == alone
+
+
+def test_scores_rank_relevant_resumes_first():
+    results = score_pairs([RESUME, *OTHER_RESUMES], [JOB_DESCRIPTION] * 4)
+    scores = [result.score for result in results]
+
+    assert all(0 <= score <= 100 for score in scores)
+    assert scores[0] > scores[1] > scores[3]
+
+
+def test_skills_are_listed_before_generic_keywords():
+    result = score_resume("Python and FastAPI; enjoys design", JOB_DESCRIPTION)
+
+    assert result.matched[:2] == ["python", "fastapi"]
+    assert "kubernetes" in result.missing
+    assert result.missing.index("kubernetes") < result.missing.index("hiring")
+
+
+def test_skill_phrases_are_kept_together():
+    assert extract_keywords("Machine learning and CI/CD with Node.js") == ("machine learning", "ci/cd", "node.js")
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime
+import pytest
+from app.models.review import ResumeReviewSummary
+from app.routers import search
+from app.services import search_index, serializer
+from app.services.cache import job_description_key
+from app.services.config import get_settings
+from tests.fakes import JOB_DESCRIPTION, RESUME_LINES
+
+ALICE_JD = "Data analyst with SQL, Excel, Tableau and Python for dashboards"
+REVIEWS = {
+    "alice": [("r-alice-1", ALICE_JD)],
+    "bob": [("r-bob-1", JOB_DESCRIPTION), ("r-bob-2", JOB_DESCRIPTION)],
+    "recruiter": [],
+}
+RESUMES = {
+    "r-alice-1": "Data analyst: SQL, Excel and Tableau reporting",
+    "r-bob-1": "\n".join(RESUME_LINES),
+    "r-bob-2": "Frontend developer: React, TypeScript and Figma",
+}
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "SEARCH_INDEX_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "SEARCH_INDEX_DIR", str(tmp_path))
+    search_index._indexes.clear()
+    yield tmp_path
+    search_index._indexes.clear()
+
+
+@pytest.fixture
+def as_user(redis, index_dir, monkeypatch):
+    from app.server import app
+    from app.utils.auth import get_current_user
+
+    for resume_id, text in RESUMES.items():
+        search_index.index_document(search_index.RESUMES, resume_id, text)
+    for description in (ALICE_JD, JOB_DESCRIPTION):
+        digest, key = job_description_key(description)
+        search_index.index_document(search_index.JOBS, digest, description)
+        asyncio.run(redis.set(key, serializer.dumps({"text": description})))
+
+    async def is_recruiter(clerk_id: str) -> bool:
+        return clerk_id == "recruiter"
+
+    async def own_reviews(clerk_id: str) -> list:
+        return REVIEWS[clerk_id]
+
+    async def review_summaries(resume_ids: list) -> list:
+        return [
+            ResumeReviewSummary(
+                _id=f"oid-{resume_id}", resume_id=resume_id, resume_url=f"https://res.example.com/{resume_id}.pdf",
+                job_title="Engineer", overall_score=70, created_at=datetime(2026, 1, 1),
+            )
+            for resume_id in resume_ids
+        ]
+
+    async def no_db():
+        return None
+
+    monkeypatch.setattr(search, "_is_recruiter", is_recruiter)
+    monkeypatch.setattr(search, "_own_reviews", own_reviews)
+    monkeypatch.setattr(search, "_review_summaries", review_summaries)
+    monkeypatch.setitem(app.dependency_overrides, search.ensure_db_initialized, no_db)
+
+    def post(clerk_id: str, path: str, **kwargs):
+        import httpx
+
+        app.dependency_overrides[get_current_user] = lambda: {"user_id": clerk_id}
+
+        async def send():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(path, **kwargs)
+        return asyncio.run(send())
+
+    yield post
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_users_only_find_their_own_resumes(as_user):
+    response = as_user("alice", "/api/search/resumes", data={"jobDescription": JOB_DESCRIPTION})
+
+    assert response.status_code == 200
+    assert [match["resume_id"] for match in response.json()] == ["r-alice-1"]
+
+
+def test_recruiters_search_every_resume(as_user):
+    response = as_user("recruiter", "/api/search/resumes", data={"jobDescription": JOB_DESCRIPTION})
+
+    results = response.json()
+    assert sorted(match["resume_id"] for match in results) == sorted(RESUMES)
+    assert results[0]["resume_id"] == "r-bob-1"
+
+
+def test_users_only_find_their_own_job_descriptions(as_user):
+    resume = ("resume.txt", "\n".join(RESUME_LINES).encode(), "text/plain")
+
+    alice = as_user("alice", "/api/search/jobs", files={"resume": resume}).json()
+    recruiter = as_user("recruiter", "/api/search/jobs", files={"resume": resume}).json()
+
+    assert [match["job_description"] for match in alice] == [ALICE_JD]
+    assert {match["job_description"] for match in recruiter} == {ALICE_JD, JOB_DESCRIPTION}
+    assert recruiter[0]["job_description"] == JOB_DESCRIPTION
+
+
+def test_scope_lookup_failure_is_not_an_open_search(as_user, monkeypatch):
+    async def mongo_down(clerk_id: str) -> bool:
+        raise ConnectionError("no mongo")
+
+    monkeypatch.setattr(search, "_is_recruiter", mongo_down)
+    response = as_user("alice", "/api/search/resumes", data={"jobDescription": JOB_DESCRIPTION})
+
+    assert response.status_code == 503
+
+
+def test_restricted_search_matches_brute_force(index_dir):
+    import numpy as np
+
+    index = search_index.VectorIndex(str(index_dir), "brute", dim=64)
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((500, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for row, vector in enumerate(vectors):
+        index.add(f"doc-{row}", vector)
+
+    query = vectors[3]
+    within = {f"doc-{row}" for row in range(0, 500, 7)} | {"not-indexed"}
+    rows = np.array(sorted(int(doc_id[4:]) for doc_id in within if doc_id.startswith("doc-")))
+    expected = rows[np.argsort(-(vectors[rows] @ query), kind="stable")[:10]]
+
+    assert [doc_id for doc_id, _ in index.search(query, 10, within)] == [f"doc-{row}" for row in expected]
+    assert index.search(query, 10, set()) == []
+
+
+def test_result_count_is_capped_by_settings(as_user, monkeypatch):
+    monkeypatch.setattr(get_settings(), "SEARCH_MAX_RESULTS", 5)
+
+    over = as_user("alice", "/api/search/resumes?k=6", data={"jobDescription": JOB_DESCRIPTION})
+    within = as_user("alice", "/api/search/resumes?k=5", data={"jobDescription": JOB_DESCRIPTION})
+
+    assert over.status_code == 422
+    assert within.status_code == 200
+
+
+def test_search_is_unavailable_unless_enabled(as_user, monkeypatch):
+    monkeypatch.setattr(get_settings(), "SEARCH_INDEX_ENABLED", False)
+
+    response = as_user("recruiter", "/api/search/resumes", data={"jobDescription": JOB_DESCRIPTION})
+
+    assert response.status_code == 503
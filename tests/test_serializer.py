@@ -0,0 +1,37 @@
+import json
+import pytest
+from app.services import serializer
+from tests.fakes import feedback
+
+
+def test_small_payloads_stay_plain_json():
+    data = serializer.dumps({"a": 1})
+    assert data[:1] == serializer.VERSION_JSON
+    assert serializer.loads(data) == {"a": 1}
+
+
+def test_large_payloads_are_compressed():
+    payload = {"feedback": feedback(), "notes": "Python and PostgreSQL " * 200}
+    data = serializer.dumps(payload)
+
+    assert data[:1] == serializer.VERSION_ZLIB
+    assert len(data) < len(json.dumps(payload)) / 4
+    assert serializer.loads(data) == payload
+
+
+def test_unicode_round_trips():
+    payload = {"name": "Zoë Łukasz 山田", "tip": "Use “smart quotes” — sparingly" * 100}
+    assert serializer.loads(serializer.dumps(payload)) == payload
+
+
+@pytest.mark.parametrize("legacy", [
+    json.dumps({"feedback": {"overallScore": 70}}),
+    json.dumps({"feedback": {"overallScore": 70}}, indent=4).encode("utf-8"),
+])
+def test_legacy_json_entries_stay_readable(legacy):
+    assert serializer.loads(legacy) == {"feedback": {"overallScore": 70}}
+
+
+def test_unknown_version_is_rejected():
+    with pytest.raises(ValueError):
+        serializer.loads(b"\x7f{}")
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import pytest
+from app.services import singleflight
+from app.services.config import get_settings
+from tests.fakes import FakeModel, JOB_DESCRIPTION, RESUME_LINES, feedback, installed_llm
+
+CALLERS = 10
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    singleflight.stats.update({name: 0 for name in singleflight.stats})
+    yield
+    singleflight._inflight.clear()
+
+
+def test_identical_uploads_make_one_llm_call(redis):
+    from app.services.generator import ResumeReviewGenerator
+
+    resume_text = "\n".join(RESUME_LINES)
+
+    async def scenario():
+        return await asyncio.gather(*(
+            ResumeReviewGenerator.review_text(resume_text, "Backend Engineer", JOB_DESCRIPTION)
+            for _ in range(CALLERS)
+        ))
+
+    model = FakeModel(json.dumps(feedback()), delay=0.2)
+    with installed_llm(model):
+        results = asyncio.run(scenario())
+
+    assert len(model.calls) == 1
+    assert all(result == results[0] for result in results)
+    assert singleflight.stats["leaders"] == 1
+    assert singleflight.stats["coalesced_local"] == CALLERS - 1
+
+
+def test_leader_is_elected_across_processes(redis, monkeypatch):
+    # _run_once is the cross-process layer: concurrent calls to it behave like separate
+    # workers that only share Redis
+    monkeypatch.setattr(get_settings(), "SINGLEFLIGHT_POLL_INTERVAL", 0.05)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.3)
+        await redis.set("result", "done")
+        return {"result": "done"}
+
+    async def read_result():
+        value = await redis.get("result")
+        return {"result": value} if value else None
+
+    async def scenario():
+        return await asyncio.gather(*(singleflight._run_once("key", fn, read_result) for _ in range(4)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert results == [{"result": "done"}] * 4
+    assert singleflight.stats["coalesced_remote"] == 3
+
+
+def test_lock_is_renewed_while_the_leader_runs(redis, monkeypatch):
+    # The call outlives several lock TTLs; nobody else may take over in the meantime
+    monkeypatch.setattr(get_settings(), "SINGLEFLIGHT_LOCK_TTL", 0.3)
+    monkeypatch.setattr(get_settings(), "SINGLEFLIGHT_POLL_INTERVAL", 0.05)
+    calls, finished = [], []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(1.0)
+        finished.append(1)
+        return {"result": "done"}
+
+    async def read_result():
+        return {"result": "done"} if finished else None
+
+    async def scenario():
+        leader = asyncio.create_task(singleflight._run_once("key", fn, read_result))
+        await asyncio.sleep(0.1)
+        follower = asyncio.create_task(singleflight._run_once("key", fn, read_result))
+        return await asyncio.gather(leader, follower)
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert results == [{"result": "done"}] * 2
+    assert singleflight.stats["locks_lost"] == 0
+    assert not asyncio.run(redis.exists("singleflight:key"))
+
+
+def test_wait_timeout_covers_the_llm_deadline(monkeypatch):
+    monkeypatch.setattr(get_settings(), "LLM_TIMEOUT", 60.0)
+    monkeypatch.setattr(get_settings(), "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(get_settings(), "SINGLEFLIGHT_WAIT_TIMEOUT", 90.0)
+
+    # 3 attempts of 60s plus 0.5s + 1s of backoff, twice for the repair call
+    assert singleflight._wait_timeout() == 2 * 181.5
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from app.services import cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# A cold import takes well under a second here; the budget leaves room for slow CI
+# machines but still catches an SDK or client creeping back into import time
+COLD_IMPORT_BUDGET_MS = 3000
+HEAVY_MODULES = ("google.generativeai", "redis", "numpy", "pypdfium2", "pdfplumber", "cloudinary",
+                 "clerk_backend_api", "svix")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.server
+elapsed_ms = (time.perf_counter() - start) * 1000
+from app.services.config import get_settings
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "settings_loaded": get_settings.cache_info().currsize,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def test_cold_import_needs_no_env_and_stays_in_budget(tmp_path):
+    # Empty environment and no .env in the working directory, like a fresh serverless instance
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE % (HEAVY_MODULES,)],
+        cwd=tmp_path,
+        env={"PATH": os.environ.get("PATH", ""), "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["settings_loaded"] == 0
+    assert probe["heavy"] == []
+    assert probe["elapsed_ms"] < COLD_IMPORT_BUDGET_MS
+
+
+def test_review_cache_degrades_when_redis_is_down():
+    # The offline REDIS_URL points at a closed port; the lazily built client fails on use
+    cache.async_redis_client.use(None)
+    try:
+        async def run():
+            await cache.set_cached_review("r1", {"overallScore": 70})
+            return await cache.get_cached_review("r1")
+
+        assert asyncio.run(run()) is None
+    finally:
+        cache.async_redis_client.use(None)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import pytest
+from app.services.generator import IncrementalJSONParser, ResumeReviewGenerator
+from tests.fakes import FakeModel, JOB_DESCRIPTION, feedback, installed_llm, resume_pdf
+
+SECTIONS = ["overallScore", "ATS", "toneAndStyle", "content", "structure", "skills", "recommendation"]
+
+
+def _chunks(text: str, size: int) -> list:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 10_000])
+def test_parser_emits_each_member_once(size):
+    body = feedback()
+    body["ATS"]["tips"][0]["tip"] = 'Use "quotes", {braces} and [brackets], too \\ ok'
+    text = "```json\n" + json.dumps(body, indent=2) + "\n```"
+
+    parser = IncrementalJSONParser()
+    seen = []
+    for chunk in _chunks(text, size):
+        for name, value in parser.feed(chunk).items():
+            seen.append(name)
+            assert value == body[name]
+
+    assert seen == SECTIONS
+    assert parser.finished
+    assert parser.result() == body
+
+
+def test_parser_emits_sections_before_the_object_closes():
+    text = json.dumps(feedback())
+    parser = IncrementalJSONParser()
+    emitted = parser.feed(text[:text.index('"content"')])
+    assert set(emitted) == {"overallScore", "ATS", "toneAndStyle"}
+    assert not parser.finished
+
+
+def test_review_stream_with_fake_stream_fn(redis):
+    text = json.dumps(feedback())
+
+    async def fake_stream(prompt: str, resume_text: str):
+        assert "Backend Engineer" in prompt and resume_text
+        for chunk in _chunks(text, 13):
+            await asyncio.sleep(0)
+            yield chunk
+
+    async def collect():
+        events = []
+        async for event, data in ResumeReviewGenerator.review_resume_stream(
+            resume_pdf(), "application/pdf", "Backend Engineer", JOB_DESCRIPTION, stream_fn=fake_stream
+        ):
+            events.append((event, data))
+        return events
+
+    events = asyncio.run(collect())
+    assert events[0][0] == "extracted" and events[0][1]["characters"] > 0
+    assert [data["name"] for event, data in events if event == "section"] == SECTIONS
+    assert events[-1] == ("feedback", feedback())
+
+    # The finished review is cached; a replay never reaches the stream
+    async def fail(prompt, resume_text):
+        raise AssertionError("cache miss")
+        yield
+
+    async def replay():
+        return [e async for e, _ in ResumeReviewGenerator.review_resume_stream(
+            resume_pdf(), "application/pdf", "Backend Engineer", JOB_DESCRIPTION, stream_fn=fail
+        )]
+
+    assert asyncio.run(replay())[-1] == "feedback"
+
+
+def test_analyze_stream_endpoint_over_fake_gemini(redis, monkeypatch):
+    import httpx
+    from app.server import app
+    from app.routers import resume
+    from app.services import pipeline, storage
+    from app.utils.auth import get_current_user
+
+    class Uploader:
+        def upload(self, data, public_id: str, **kwargs):
+            return {"secure_url": f"https://res.example.com/upload/{public_id}.pdf", "public_id": public_id}
+
+    async def noop(*args, **kwargs):
+        return None
+
+    async def no_db():
+        return None
+
+    monkeypatch.setattr(pipeline, "_save_to_mongo", noop)
+    monkeypatch.setattr(storage, "_uploader", lambda: Uploader())
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: {"user_id": "user_1"})
+    monkeypatch.setitem(app.dependency_overrides, resume.ensure_db_initialized, no_db)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/resume/analyze/stream",
+                data={"jobTitle": "Backend Engineer", "jobDescription": JOB_DESCRIPTION},
+                files={"resume": ("resume.pdf", resume_pdf(), "application/pdf")},
+            )
+            return response.text
+
+    with installed_llm(FakeModel(json.dumps(feedback()), chunk_size=20)) as client:
+        body = asyncio.run(scenario())
+
+    events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+    # The upload runs alongside extraction, so it may be reported first
+    assert events.index("extracted") < events.index("section")
+    assert events.count("section") == len(SECTIONS)
+    assert "upload" in events
+    assert events[-1] == "complete"
+    complete = json.loads(body.rstrip().splitlines()[-1].split(": ", 1)[1])
+    assert complete["feedback"] == feedback()
+    assert client.calls == 1 and client.breaker.state == "closed"
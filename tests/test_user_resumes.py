@@ -0,0 +1,114 @@
+import asyncio
+from app.models.user import Feedback
+from tests.fakes import feedback
+
+
+def test_listing_pages_newest_first_and_prunes_expired(redis, monkeypatch):
+    from app.routers.resume import get_user_resumes
+    from app.services import pipeline
+    from app.services.cache import user_resumes_key
+
+    async def noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(pipeline, "_save_to_mongo", noop)
+
+    async def scenario():
+        for i in range(5):
+            await pipeline.save_review(
+                f"r{i}", "user_1", f"Engineer {i}", "Build APIs", f"https://res.example.com/upload/{i}.pdf",
+                Feedback(**feedback()),
+            )
+            await asyncio.sleep(0.01)
+        await pipeline.save_review(
+            "other", "user_2", "Designer", "Draw", "https://res.example.com/upload/x.pdf", Feedback(**feedback())
+        )
+        await redis.delete("resume:r3")
+
+        first = await get_user_resumes(user_details={"user_id": "user_1"}, offset=0, limit=2)
+        second = await get_user_resumes(user_details={"user_id": "user_1"}, offset=2, limit=2)
+        remaining = await redis.zrevrange(user_resumes_key("user_1"), 0, -1)
+        return first, second, remaining
+
+    first, second, remaining = asyncio.run(scenario())
+
+    # r3 expired: it is pruned and the first page refilled, so no review is skipped
+    assert [r["resume_id"] for r in first] == ["r4", "r2"]
+    assert [r["resume_id"] for r in second] == ["r1", "r0"]
+    assert remaining == ["r4", "r2", "r1", "r0"]
+    assert first[0]["job_title"] == "Engineer 4"
+
+
+class FakeHistory:
+    # Stands in for ResumeReview: one user's reviews, newest first, with the query chain
+    # the listing uses (find().sort().skip().limit().to_list())
+    clerk_id = "clerk_id"
+
+    def __init__(self):
+        self.reviews = []
+        self.queries = []
+
+    def find(self, *args):
+        self._skip, self._limit = 0, None
+        return self
+
+    def sort(self, *args):
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    async def to_list(self):
+        self.queries.append((self._skip, self._limit))
+        newest_first = self.reviews[::-1]
+        return newest_first[self._skip:self._skip + self._limit]
+
+
+def test_pages_across_the_redis_boundary_come_from_one_source(redis, monkeypatch):
+    from types import SimpleNamespace
+    from app.routers import resume
+    from app.routers.resume import get_user_resumes
+    from app.services import pipeline
+
+    history = FakeHistory()
+    monkeypatch.setattr(resume, "ResumeReview", history)
+
+    def record(resume_id: str, job_title: str):
+        history.reviews.append(SimpleNamespace(
+            resume_id=resume_id, resume_url=f"https://res.example.com/upload/{resume_id}.pdf",
+            image_url=None, job_title=job_title, feedback=Feedback(**feedback()),
+        ))
+
+    async def save_to_mongo(resume_id, clerk_id, job_title, *args):
+        record(resume_id, job_title)
+
+    monkeypatch.setattr(pipeline, "_save_to_mongo", save_to_mongo)
+
+    async def scenario():
+        # r0-r4 are older than a day and only in MongoDB; r5-r9 are also in the Redis index
+        for i in range(5):
+            record(f"r{i}", f"Engineer {i}")
+        for i in range(5, 10):
+            await pipeline.save_review(
+                f"r{i}", "user_1", f"Engineer {i}", "Build APIs", f"https://res.example.com/upload/r{i}.pdf",
+                Feedback(**feedback()),
+            )
+            await asyncio.sleep(0.01)
+
+        pages = []
+        for offset in range(0, 12, 3):
+            pages.append(await get_user_resumes(user_details={"user_id": "user_1"}, offset=offset, limit=3))
+        return pages
+
+    pages = asyncio.run(scenario())
+
+    assert [[r["resume_id"] for r in page] for page in pages] == [
+        ["r9", "r8", "r7"], ["r6", "r5", "r4"], ["r3", "r2", "r1"], ["r0"],
+    ]
+    # Only the first page fits inside the Redis index; the page straddling it is read whole from MongoDB
+    assert history.queries == [(3, 3), (6, 3), (9, 3)]